@@ -1,20 +1,35 @@
 import pygame
-import random
 import sys
 import math
+import argparse
+import threading
+import os
+from engine import ConnectFourEngine
+
+# The online client is shared with Tic Tac Toe
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Multiplayer"))
+from client import ServerConnection
+from protocol import parse_address
 
 # Initialize Pygame
 pygame.init()
 
+# Posted by the AI worker thread when it has picked a column
+AI_MOVE_EVENT = pygame.USEREVENT + 1
+
+# Messages from the match server, posted by the connection's reader thread
+SERVER_EVENT = pygame.USEREVENT + 2
+
 class ConnectFourGame:
-    def __init__(self):
+    def __init__(self, rows=6, cols=7, connect=4):
         # Game constants
-        self.ROWS = 6
-        self.COLS = 7
-        self.CELL_SIZE = 80
+        self.ROWS = rows
+        self.COLS = cols
+        self.CONNECT = connect
+        self.CELL_SIZE = min(80, 960 // cols, 640 // rows)  # Shrink cells so big boards fit on screen
         self.BOARD_WIDTH = self.COLS * self.CELL_SIZE
         self.BOARD_HEIGHT = self.ROWS * self.CELL_SIZE
-        self.WINDOW_WIDTH = self.BOARD_WIDTH + 40  # Padding
+        self.WINDOW_WIDTH = max(self.BOARD_WIDTH + 40, 600)  # Padding, and room for the buttons
         self.WINDOW_HEIGHT = self.BOARD_HEIGHT + 200  # Extra space for UI
         
         # Colors
@@ -33,7 +48,8 @@ class ConnectFourGame:
         
         # Initialize display
         self.screen = pygame.display.set_mode((self.WINDOW_WIDTH, self.WINDOW_HEIGHT))
-        pygame.display.set_caption("🔴🟡 Connect Four - Pygame Edition")
+        title = "Connect Four" if connect == 4 else f"Connect {connect} ({rows}x{cols})"
+        pygame.display.set_caption(f"🔴🟡 {title} - Pygame Edition")
         self.clock = pygame.time.Clock()
         
         # Initialize fonts
@@ -41,10 +57,32 @@ class ConnectFourGame:
         self.font_medium = pygame.font.Font(None, 32)
         self.font_small = pygame.font.Font(None, 24)
         
+        # Retained-mode rendering: cached surfaces plus the state of what is on screen
+        self.active_fps = 60
+        self.idle_fps = 10  # Nothing is moving, so only poll for input
+        self.screen_rect = self.screen.get_rect()
+        self.status_rect = pygame.Rect(0, self.WINDOW_HEIGHT - 100, self.WINDOW_WIDTH, 100)
+        self.text_cache = {}
+        self.build_static_surfaces()
+        self.drawn = None  # Frame state last drawn; None forces a full redraw
+        
         # Animation state (initialize before reset_game)
         self.dropping_piece = None
         self.drop_animation = {'active': False, 'col': 0, 'target_row': 0, 'current_y': 0, 'player': 1}
         
+        # Headless rules and AI (initialize before reset_game)
+        self.engine = ConnectFourEngine(self.ROWS, self.COLS, self.CONNECT)
+        
+        # Background AI search state (initialize before reset_game)
+        self.ai_thinking = False
+        self.ai_search_id = 0
+        self.ai_cancel = threading.Event()
+        self.ai_lock = threading.Lock()  # One search at a time on the shared engine
+        self.ai_move_delay_ms = 500  # Small delay for better UX
+        
+        # Online play against another window through the match server
+        self.online = None  # ServerConnection while connected
+        
         # Game state
         self.reset_game()
         self.running = True
@@ -98,13 +136,21 @@ class ConnectFourGame:
         
     def reset_game(self):
         """Reset game to initial state"""
+        self.cancel_ai_search()
         self.board = [[0 for _ in range(self.COLS)] for _ in range(self.ROWS)]
+        # A cancelled search may still be finishing; let it stop before clearing its cache
+        with self.ai_lock:
+            self.engine.reset()
         self.current_player = 1  # 1 = Red, 2 = Yellow
         self.game_over = False
         self.winner = None
         self.winning_positions = []
         self.moves_count = 0
         self.drop_animation['active'] = False
+        self.online_player = None  # 1 or 2 once an online match has started
+        self.online_status = None  # Replaces the status line while not in an online match
+        self.move_sent = False  # Our online move is waiting for the server to confirm it
+        self.server_moves = []  # Confirmed moves waiting for the previous piece to land
         
     def handle_events(self):
         """Handle pygame events"""
@@ -112,6 +158,20 @@ class ConnectFourGame:
             if event.type == pygame.QUIT:
                 self.running = False
                 
+            elif event.type == AI_MOVE_EVENT:
+                # Results of searches cancelled by a restart are ignored
+                if event.search_id == self.ai_search_id:
+                    self.ai_thinking = False
+                    if event.col is not None:
+                        self.make_move(event.col)
+                        
+            elif event.type == SERVER_EVENT:
+                self.handle_server_message(event.message)
+                
+            elif event.type == pygame.VIDEOEXPOSE:
+                # The window contents were lost, so repaint all of it
+                self.drawn = None
+                
             elif event.type == pygame.MOUSEMOTION:
                 self.mouse_pos = event.pos
                 
@@ -128,9 +188,10 @@ class ConnectFourGame:
                     self.new_game()
                 elif event.key == pygame.K_h:
                     self.show_hint()
-                elif event.key >= pygame.K_1 and event.key <= pygame.K_7:
+                elif event.key >= pygame.K_1 and event.key <= pygame.K_9:
                     col = event.key - pygame.K_1
-                    self.make_move(col)
+                    if col < self.COLS:
+                        self.play_column(col)
                     
     def handle_click(self, pos):
         """Handle mouse clicks"""
@@ -146,7 +207,7 @@ class ConnectFourGame:
             if pos[1] >= board_start_y:
                 col = (pos[0] - 20) // self.CELL_SIZE
                 if 0 <= col < self.COLS:
-                    self.make_move(col)
+                    self.play_column(col)
                     
     def handle_button_click(self, action):
         """Handle button clicks"""
@@ -163,41 +224,57 @@ class ConnectFourGame:
             
     def new_game(self):
         """Start a completely new game"""
-        self.reset_game()
+        if self.online is not None:
+            self.join_online_match()
+        else:
+            self.reset_game()
         
     def restart_game(self):
         """Restart with same settings"""
-        self.reset_game()
+        if self.online is not None:
+            self.join_online_match()
+        else:
+            self.reset_game()
         
     def toggle_ai(self):
         """Toggle AI mode"""
+        if self.online is not None:
+            return  # The opponent is the other player on the server
         self.ai_enabled = not self.ai_enabled
         self.buttons['ai_toggle']['text'] = f"AI: {'ON' if self.ai_enabled else 'OFF'}"
         
     def cycle_difficulty(self):
         """Cycle through AI difficulties"""
-        difficulties = ["Easy", "Medium", "Hard"]
+        difficulties = self.engine.difficulties
         current_index = difficulties.index(self.ai_difficulty)
         self.ai_difficulty = difficulties[(current_index + 1) % len(difficulties)]
         self.buttons['difficulty']['text'] = self.ai_difficulty
         
     def is_valid_move(self, col):
         """Check if a move is valid"""
-        return 0 <= col < self.COLS and self.board[0][col] == 0
+        return self.engine.position.can_play(col)
+        
+    def play_column(self, col):
+        """Move for the player at this window: directly, or through the server when online"""
+        if self.online is None:
+            return self.make_move(col)
+            
+        if (self.game_over or self.move_sent or self.server_moves or self.drop_animation['active']
+                or self.current_player != self.online_player or not self.is_valid_move(col)):
+            return False
+        self.online.send({"type": "move", "move": col})
+        self.move_sent = True  # The piece drops once the server echoes the move
+        return True
         
     def make_move(self, col):
         """Make a move in the specified column"""
-        if not self.is_valid_move(col) or self.game_over or self.drop_animation['active']:
+        if (not self.is_valid_move(col) or self.game_over or self.drop_animation['active']
+                or self.ai_thinking):
             return False
             
         # Find the target row
-        target_row = -1
-        for row in range(self.ROWS - 1, -1, -1):
-            if self.board[row][col] == 0:
-                target_row = row
-                break
-                
-        if target_row == -1:
+        target_row = self.get_next_row(col)
+        if target_row is None:
             return False
             
         # Start drop animation
@@ -230,6 +307,7 @@ class ConnectFourGame:
             player = self.drop_animation['player']
             
             self.board[row][col] = player
+            self.engine.position.make_move(col, player)
             self.drop_animation['active'] = False
             self.moves_count += 1
             
@@ -249,116 +327,99 @@ class ConnectFourGame:
                     self.schedule_ai_move()
                     
     def schedule_ai_move(self):
-        """Schedule an AI move after a short delay"""
-        # This would be called in the main loop with a timer
-        # For now, we'll make the move immediately
-        pygame.time.wait(500)  # Small delay for better UX
-        ai_col = self.get_ai_move()
-        if ai_col is not None:
-            self.make_move(ai_col)
+        """Start the AI search on a worker thread; the move comes back as AI_MOVE_EVENT"""
+        self.cancel_ai_search()
+        self.ai_cancel = threading.Event()
+        self.ai_thinking = True
+        
+        worker = threading.Thread(target=self.run_ai_search,
+                                  args=(self.ai_search_id, self.engine.position.copy(), self.ai_cancel),
+                                  daemon=True)
+        worker.start()
+        
+    def run_ai_search(self, search_id, position, cancel):
+        """Worker thread: wait out the move delay, search, then post the result"""
+        if cancel.wait(self.ai_move_delay_ms / 1000):
+            return
             
-    def get_ai_move(self):
-        """Get AI move based on difficulty"""
-        if self.ai_difficulty == "Easy":
-            return self.ai_easy()
-        elif self.ai_difficulty == "Medium":
-            return self.ai_medium()
-        else:  # Hard
-            return self.ai_hard()
+        with self.ai_lock:
+            if cancel.is_set():
+                return
+            ai_col = self.get_ai_move(position, cancel)
+        if not cancel.is_set():
+            pygame.event.post(pygame.event.Event(AI_MOVE_EVENT, search_id=search_id, col=ai_col))
             
-    def ai_easy(self):
-        """Easy AI - random valid moves"""
-        valid_cols = [col for col in range(self.COLS) if self.is_valid_move(col)]
-        return random.choice(valid_cols) if valid_cols else None
-        
-    def ai_medium(self):
-        """Medium AI - basic strategy"""
-        # Check if AI can win
-        for col in range(self.COLS):
-            if self.is_valid_move(col):
-                # Simulate move
-                row = self.get_next_row(col)
-                if self.would_win(row, col, 2):
-                    return col
-                    
-        # Check if need to block player
-        for col in range(self.COLS):
-            if self.is_valid_move(col):
-                row = self.get_next_row(col)
-                if self.would_win(row, col, 1):
-                    return col
-                    
-        # Prefer center columns
-        center_cols = [3, 2, 4, 1, 5, 0, 6]
-        for col in center_cols:
-            if self.is_valid_move(col):
-                return col
-        return None
-        
-    def ai_hard(self):
-        """Hard AI - minimax algorithm"""
-        _, best_col = self.minimax(4, True, float('-inf'), float('inf'))
-        return best_col
-        
-    def minimax(self, depth, maximizing, alpha, beta):
-        """Minimax algorithm with alpha-beta pruning"""
-        if depth == 0 or self.is_terminal():
-            return self.evaluate_position(), None
+    def cancel_ai_search(self):
+        """Abandon any AI search that is still running"""
+        self.ai_cancel.set()
+        self.ai_search_id += 1
+        self.ai_thinking = False
             
-        valid_cols = [col for col in range(self.COLS) if self.is_valid_move(col)]
-        best_col = random.choice(valid_cols) if valid_cols else None
-        
-        if maximizing:
-            max_eval = float('-inf')
-            for col in valid_cols:
-                row = self.get_next_row(col)
-                self.board[row][col] = 2  # AI player
-                
-                eval_score, _ = self.minimax(depth - 1, False, alpha, beta)
-                self.board[row][col] = 0  # Undo move
-                
-                if eval_score > max_eval:
-                    max_eval = eval_score
-                    best_col = col
-                    
-                alpha = max(alpha, eval_score)
-                if beta <= alpha:
-                    break
-                    
-            return max_eval, best_col
-        else:
-            min_eval = float('inf')
-            for col in valid_cols:
-                row = self.get_next_row(col)
-                self.board[row][col] = 1  # Human player
-                
-                eval_score, _ = self.minimax(depth - 1, True, alpha, beta)
-                self.board[row][col] = 0  # Undo move
-                
-                if eval_score < min_eval:
-                    min_eval = eval_score
-                    best_col = col
-                    
-                beta = min(beta, eval_score)
-                if beta <= alpha:
-                    break
-                    
-            return min_eval, best_col
+    def get_ai_move(self, position=None, cancel=None):
+        """Get AI move based on difficulty"""
+        return self.engine.get_ai_move(self.ai_difficulty, position, cancel)
+        
+    def connect_to_server(self, host, port):
+        """Play online against whoever joins the same game on a match server"""
+        self.online = ServerConnection(host, port, self.post_server_message)
+        self.ai_enabled = False
+        self.buttons['ai_toggle']['text'] = "Online"
+        self.join_online_match()
+        
+    def post_server_message(self, message):
+        """Reader thread: hand a server message over to the event loop"""
+        pygame.event.post(pygame.event.Event(SERVER_EVENT, message=message))
+        
+    def join_online_match(self):
+        """Give up the current online match, if any, and queue for the next one"""
+        self.online.send({"type": "leave"})
+        self.reset_game()
+        self.online_status = "Joining..."
+        self.online.send({"type": "join", "game": "connectfour",
+                          "rows": self.ROWS, "cols": self.COLS, "connect": self.CONNECT})
+        
+    def handle_server_message(self, message):
+        """Apply one message from the match server"""
+        kind = message['type']
+        if kind == 'waiting':
+            self.online_status = "Waiting for an opponent..."
+        elif kind == 'start':
+            self.reset_game()
+            self.online_player = message['player']
+        elif kind == 'move':
+            # The server has checked the move; it drops once the previous piece has landed
+            self.move_sent = False
+            self.server_moves.append(message['move'])
+        elif kind == 'over':
+            # Wins and ties show up through the moves themselves
+            if message['reason'] == 'opponent_left' and self.online_player is not None:
+                self.server_moves = []
+                self.game_over = True
+                self.winner = self.online_player
+                self.online_status = "Opponent left - You Win!"
+        elif kind == 'error':
+            print(f"Server: {message['message']}")
+            self.move_sent = False
+        elif kind == 'disconnected':
+            self.online = None
+            self.server_moves = []
+            self.game_over = True
+            self.online_status = "Disconnected from server"
+            
+    def play_server_moves(self):
+        """Start the next confirmed online move once the previous piece has landed"""
+        if self.server_moves and not self.drop_animation['active']:
+            self.make_move(self.server_moves.pop(0))
             
     def get_next_row(self, col):
         """Get next available row in column"""
-        for row in range(self.ROWS - 1, -1, -1):
-            if self.board[row][col] == 0:
-                return row
-        return None
+        if not self.engine.position.can_play(col):
+            return None
+        return self.ROWS - 1 - self.engine.position.heights[col]
         
     def would_win(self, row, col, player):
         """Check if placing piece would result in win"""
-        # Temporarily place piece
-        self.board[row][col] = player
-        result = self.check_winner(row, col, player)
-        self.board[row][col] = 0  # Remove piece
-        return result
+        return self.engine.position.is_winning_move(col, player)
         
     def is_terminal(self):
         """Check if game is in terminal state"""
@@ -366,110 +427,16 @@ class ConnectFourGame:
         
     def is_board_full(self):
         """Check if board is full"""
-        return all(self.board[0][col] != 0 for col in range(self.COLS))
-        
-    def evaluate_position(self):
-        """Evaluate board position for minimax"""
-        score = 0
-        
-        # Center column preference
-        center_col = self.COLS // 2
-        for row in range(self.ROWS):
-            if self.board[row][center_col] == 2:
-                score += 3
-            elif self.board[row][center_col] == 1:
-                score -= 3
-                
-        # Evaluate all possible 4-in-a-row windows
-        score += self.evaluate_windows()
-        
-        return score
-        
-    def evaluate_windows(self):
-        """Evaluate all 4-piece windows"""
-        score = 0
-        
-        # Horizontal
-        for row in range(self.ROWS):
-            for col in range(self.COLS - 3):
-                window = [self.board[row][col + i] for i in range(4)]
-                score += self.score_window(window)
-                
-        # Vertical
-        for row in range(self.ROWS - 3):
-            for col in range(self.COLS):
-                window = [self.board[row + i][col] for i in range(4)]
-                score += self.score_window(window)
-                
-        # Diagonal (positive slope)
-        for row in range(self.ROWS - 3):
-            for col in range(self.COLS - 3):
-                window = [self.board[row + i][col + i] for i in range(4)]
-                score += self.score_window(window)
-                
-        # Diagonal (negative slope)
-        for row in range(3, self.ROWS):
-            for col in range(self.COLS - 3):
-                window = [self.board[row - i][col + i] for i in range(4)]
-                score += self.score_window(window)
-                
-        return score
-        
-    def score_window(self, window):
-        """Score a 4-piece window"""
-        score = 0
-        ai_count = window.count(2)
-        human_count = window.count(1)
-        empty_count = window.count(0)
-        
-        if ai_count == 4:
-            score += 100
-        elif ai_count == 3 and empty_count == 1:
-            score += 10
-        elif ai_count == 2 and empty_count == 2:
-            score += 2
-            
-        if human_count == 3 and empty_count == 1:
-            score -= 80
-        elif human_count == 2 and empty_count == 2:
-            score -= 2
-            
-        return score
+        return self.engine.position.is_full()
         
     def check_winner(self, row, col, player):
         """Check if the current move results in a win"""
-        directions = [
-            (0, 1),   # Horizontal
-            (1, 0),   # Vertical
-            (1, 1),   # Diagonal \
-            (1, -1)   # Diagonal /
-        ]
-        
-        for dr, dc in directions:
-            count = 1  # Count the piece just placed
-            positions = [(row, col)]
+        if not self.engine.position.is_win(player):
+            return False
             
-            # Check positive direction
-            r, c = row + dr, col + dc
-            while (0 <= r < self.ROWS and 0 <= c < self.COLS and 
-                   self.board[r][c] == player):
-                count += 1
-                positions.append((r, c))
-                r, c = r + dr, c + dc
-                
-            # Check negative direction
-            r, c = row - dr, col - dc
-            while (0 <= r < self.ROWS and 0 <= c < self.COLS and 
-                   self.board[r][c] == player):
-                count += 1
-                positions.append((r, c))
-                r, c = r - dr, c - dc
-                
-            if count >= 4:
-                self.winning_positions = positions
-                return True
-                
-        return False
+        line = self.engine.position.winning_line(col, player)
+        self.winning_positions = [(self.ROWS - 1 - h, c) for h, c in line]
+        return True
         
     def show_hint(self):
         """Show hint for best move"""
@@ -477,116 +444,218 @@ class ConnectFourGame:
             return
             
         # Use medium AI logic for hints
-        best_col = self.ai_medium()
+        best_col = self.engine.ai_medium()
         if best_col is not None:
             # Visual hint could be added here
             print(f"Hint: Try column {best_col + 1}")
             
-    def draw_board(self):
-        """Draw the game board"""
-        board_rect = pygame.Rect(20, 80, self.BOARD_WIDTH, self.BOARD_HEIGHT)
-        pygame.draw.rect(self.screen, self.colors['board'], board_rect)
-        pygame.draw.rect(self.screen, (0, 0, 0), board_rect, 3)
+    def build_static_surfaces(self):
+        """Pre-render the empty board and one sprite per piece"""
+        self.board_surface = pygame.Surface((self.BOARD_WIDTH, self.BOARD_HEIGHT))
+        self.board_surface.fill(self.colors['board'])
+        pygame.draw.rect(self.board_surface, (0, 0, 0), self.board_surface.get_rect(), 3)
+        radius = self.CELL_SIZE // 2 - 8
         
         for row in range(self.ROWS):
             for col in range(self.COLS):
-                x = 20 + col * self.CELL_SIZE + self.CELL_SIZE // 2
-                y = 80 + row * self.CELL_SIZE + self.CELL_SIZE // 2
-                
-                # Draw cell background
-                cell_rect = pygame.Rect(20 + col * self.CELL_SIZE + 5, 
-                                      80 + row * self.CELL_SIZE + 5,
-                                      self.CELL_SIZE - 10, self.CELL_SIZE - 10)
+                center = (col * self.CELL_SIZE + self.CELL_SIZE // 2, row * self.CELL_SIZE + self.CELL_SIZE // 2)
+                pygame.draw.circle(self.board_surface, self.colors['empty'], center, radius)
                 
-                piece = self.board[row][col]
-                
-                if piece == 0:
-                    color = self.colors['empty']
-                elif piece == 1:
-                    color = self.colors['player1']
-                else:
-                    color = self.colors['player2']
-                    
-                # Check if this position is part of winning line
-                if (row, col) in self.winning_positions:
-                    pygame.draw.rect(self.screen, self.colors['highlight'], cell_rect)
-                    pygame.draw.circle(self.screen, color, (x, y), self.CELL_SIZE // 2 - 8)
-                    pygame.draw.circle(self.screen, self.colors['highlight'], (x, y), self.CELL_SIZE // 2 - 8, 3)
-                else:
-                    pygame.draw.circle(self.screen, color, (x, y), self.CELL_SIZE // 2 - 8)
-                    if piece != 0:
-                        pygame.draw.circle(self.screen, (0, 0, 0), (x, y), self.CELL_SIZE // 2 - 8, 2)
-                        
-    def draw_dropping_piece(self):
-        """Draw the animated dropping piece"""
-        if self.drop_animation['active']:
-            col = self.drop_animation['col']
-            y = self.drop_animation['current_y']
-            player = self.drop_animation['player']
-            
-            x = 20 + col * self.CELL_SIZE + self.CELL_SIZE // 2
+        # piece_sprites[player] / winning_sprites[player] cover exactly one cell
+        center = (self.CELL_SIZE // 2, self.CELL_SIZE // 2)
+        self.piece_sprites = {}
+        self.winning_sprites = {}
+        for player in (1, 2):
+            color = self.colors[f'player{player}']
             
-            color = self.colors['player1'] if player == 1 else self.colors['player2']
-            pygame.draw.circle(self.screen, color, (x, int(y + self.CELL_SIZE // 2)), 
-                             self.CELL_SIZE // 2 - 8)
-            pygame.draw.circle(self.screen, (0, 0, 0), (x, int(y + self.CELL_SIZE // 2)), 
-                             self.CELL_SIZE // 2 - 8, 2)
-                             
-    def draw_ui(self):
-        """Draw user interface"""
-        # Background
-        ui_rect = pygame.Rect(0, 0, self.WINDOW_WIDTH, 80)
-        pygame.draw.rect(self.screen, self.colors['ui_bg'], ui_rect)
-        
-        # Draw buttons
-        for button_name, button in self.buttons.items():
-            # Check if mouse is hovering
-            is_hover = button['rect'].collidepoint(self.mouse_pos)
-            button_color = self.colors['button_hover'] if is_hover else self.colors['button']
+            sprite = pygame.Surface((self.CELL_SIZE, self.CELL_SIZE), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, color, center, radius)
+            pygame.draw.circle(sprite, (0, 0, 0), center, radius, 2)
+            self.piece_sprites[player] = sprite
             
-            pygame.draw.rect(self.screen, button_color, button['rect'])
-            pygame.draw.rect(self.screen, (0, 0, 0), button['rect'], 2)
+            sprite = pygame.Surface((self.CELL_SIZE, self.CELL_SIZE), pygame.SRCALPHA)
+            pygame.draw.rect(sprite, self.colors['highlight'], (5, 5, self.CELL_SIZE - 10, self.CELL_SIZE - 10))
+            pygame.draw.circle(sprite, color, center, radius)
+            pygame.draw.circle(sprite, self.colors['highlight'], center, radius, 3)
+            self.winning_sprites[player] = sprite
             
-            # Draw button text
-            text_surface = self.font_small.render(button['text'], True, self.colors['text'])
-            text_rect = text_surface.get_rect(center=button['rect'].center)
-            self.screen.blit(text_surface, text_rect)
+    def render_text(self, font, text, color):
+        """Rendered text surface, cached so unchanged labels are never re-rendered"""
+        key = (font, text, color)
+        if key not in self.text_cache:
+            self.text_cache[key] = font.render(text, True, color)
+        return self.text_cache[key]
+        
+    def cell_rect(self, row, col):
+        """Screen rectangle of a board cell"""
+        return pygame.Rect(20 + col * self.CELL_SIZE, 80 + row * self.CELL_SIZE, self.CELL_SIZE, self.CELL_SIZE)
+        
+    def status_line(self):
+        """Status message and its color"""
+        if self.online_status:
+            return self.online_status, self.colors['text']
+        if self.online_player is not None:
+            return self.online_status_line()
             
-        # Game status
-        status_y = self.WINDOW_HEIGHT - 80
-        
         if self.game_over:
             if self.winner == 0:
-                status_text = "It's a Tie!"
-                color = (200, 200, 200)
+                return "It's a Tie!", (200, 200, 200)
             elif self.winner == 1:
-                status_text = "Red Player Wins!"
-                color = self.colors['player1']
+                return "Red Player Wins!", self.colors['player1']
             else:
-                status_text = f"{'AI' if self.ai_enabled else 'Yellow Player'} Wins!"
-                color = self.colors['player2']
+                return f"{'AI' if self.ai_enabled else 'Yellow Player'} Wins!", self.colors['player2']
+        elif self.ai_thinking:
+            return "AI is thinking...", self.colors['player2']
+        elif self.current_player == 1:
+            return "Red Player's Turn", self.colors['player1']
         else:
-            if self.current_player == 1:
-                status_text = "Red Player's Turn"
-                color = self.colors['player1']
-            else:
-                player_name = "AI" if self.ai_enabled else "Yellow Player"
-                status_text = f"{player_name}'s Turn"
-                color = self.colors['player2']
+            player_name = "AI" if self.ai_enabled else "Yellow Player"
+            return f"{player_name}'s Turn", self.colors['player2']
+            
+    def online_status_line(self):
+        """Status message and its color during an online match"""
+        color = self.colors[f'player{self.online_player}']
+        if self.game_over:
+            if self.winner == 0:
+                return "It's a Tie!", (200, 200, 200)
+            return ("You Win!" if self.winner == self.online_player else "You Lose!"), color
+        elif self.current_player == self.online_player:
+            return f"Your Turn ({'Red' if self.online_player == 1 else 'Yellow'})", color
+        else:
+            return "Opponent's Turn", color
+            
+    def frame_state(self):
+        """Everything that decides what is on screen, grouped by screen region"""
+        winning = set(self.winning_positions)
+        cells = [(self.board[row][col], (row, col) in winning)
+                 for row in range(self.ROWS) for col in range(self.COLS)]
+        
+        drop = None
+        if self.drop_animation['active']:
+            drop = (self.drop_animation['col'], self.drop_animation['current_y'], self.drop_animation['player'])
+            
+        buttons = {name: (button['text'], button['rect'].collidepoint(self.mouse_pos))
+                   for name, button in self.buttons.items()}
+        
+        return {
+            'cells': cells,
+            'drop': drop,
+            'buttons': buttons,
+            'status': (self.status_line(), self.moves_count)
+        }
+        
+    def drop_rect(self, drop):
+        """Screen rectangle covered by the dropping piece"""
+        col, y, _ = drop
+        return pygame.Rect(20 + col * self.CELL_SIZE, int(y), self.CELL_SIZE, self.CELL_SIZE)
+        
+    def dirty_rects(self, old, new):
+        """Screen regions that differ between two frame states"""
+        rects = []
+        
+        for index, (before, after) in enumerate(zip(old['cells'], new['cells'])):
+            if before != after:
+                rects.append(self.cell_rect(*divmod(index, self.COLS)))
+                
+        if old['drop'] != new['drop']:
+            for drop in (old['drop'], new['drop']):
+                if drop is not None:
+                    rects.append(self.drop_rect(drop))
+                    
+        for name, button in self.buttons.items():
+            if old['buttons'][name] != new['buttons'][name]:
+                rects.append(button['rect'])
                 
-        status_surface = self.font_medium.render(status_text, True, color)
+        if old['status'] != new['status']:
+            rects.append(self.status_rect)
+            
+        return [rect.clip(self.screen_rect) for rect in rects if rect.colliderect(self.screen_rect)]
+        
+    def render(self):
+        """Redraw only the parts of the screen that changed since the last frame"""
+        state = self.frame_state()
+        
+        if self.drawn is None:
+            self.draw_region(self.screen_rect, state)
+            pygame.display.flip()
+        else:
+            rects = self.dirty_rects(self.drawn, state)
+            for rect in rects:
+                self.draw_region(rect, state)
+            if rects:
+                pygame.display.update(rects)
+                
+        self.drawn = state
+        
+    def draw_region(self, area, state):
+        """Repaint one screen rectangle from the cached surfaces"""
+        self.screen.set_clip(area)
+        self.screen.fill(self.colors['background'], area)
+        self.draw_board(area, state)
+        self.draw_dropping_piece(area, state)
+        self.draw_ui(area, state)
+        self.screen.set_clip(None)
+        
+    def draw_board(self, area, state):
+        """Draw the board and the pieces on it that overlap `area`"""
+        board_rect = pygame.Rect(20, 80, self.BOARD_WIDTH, self.BOARD_HEIGHT)
+        if not board_rect.colliderect(area):
+            return
+        self.screen.blit(self.board_surface, board_rect)
+        
+        for index, (piece, winning) in enumerate(state['cells']):
+            if piece == 0:
+                continue
+            cell_rect = self.cell_rect(*divmod(index, self.COLS))
+            if cell_rect.colliderect(area):
+                sprite = self.winning_sprites[piece] if winning else self.piece_sprites[piece]
+                self.screen.blit(sprite, cell_rect)
+                
+    def draw_dropping_piece(self, area, state):
+        """Draw the animated dropping piece"""
+        if state['drop'] is None:
+            return
+        rect = self.drop_rect(state['drop'])
+        if rect.colliderect(area):
+            self.screen.blit(self.piece_sprites[state['drop'][2]], rect)
+            
+    def draw_ui(self, area, state):
+        """Draw the buttons and status lines that overlap `area`"""
+        # Background
+        ui_rect = pygame.Rect(0, 0, self.WINDOW_WIDTH, 80)
+        if ui_rect.colliderect(area):
+            pygame.draw.rect(self.screen, self.colors['ui_bg'], ui_rect)
+            
+            for button_name, button in self.buttons.items():
+                text, is_hover = state['buttons'][button_name]
+                button_color = self.colors['button_hover'] if is_hover else self.colors['button']
+                
+                pygame.draw.rect(self.screen, button_color, button['rect'])
+                pygame.draw.rect(self.screen, (0, 0, 0), button['rect'], 2)
+                
+                # Draw button text
+                text_surface = self.render_text(self.font_small, text, self.colors['text'])
+                text_rect = text_surface.get_rect(center=button['rect'].center)
+                self.screen.blit(text_surface, text_rect)
+                
+        if not self.status_rect.colliderect(area):
+            return
+            
+        # Game status
+        status_y = self.WINDOW_HEIGHT - 80
+        (status_text, color), moves_count = state['status']
+        status_surface = self.render_text(self.font_medium, status_text, color)
         status_rect = status_surface.get_rect(center=(self.WINDOW_WIDTH // 2, status_y))
         self.screen.blit(status_surface, status_rect)
         
         # Move counter
-        moves_text = f"Moves: {self.moves_count}"
-        moves_surface = self.font_small.render(moves_text, True, self.colors['text'])
+        moves_surface = self.render_text(self.font_small, f"Moves: {moves_count}", self.colors['text'])
         moves_rect = moves_surface.get_rect(center=(self.WINDOW_WIDTH // 2, status_y + 30))
         self.screen.blit(moves_surface, moves_rect)
         
         # Controls help
-        controls_text = "Click column to drop piece • 1-7 keys • R to restart • ESC to quit"
-        controls_surface = self.font_small.render(controls_text, True, (150, 150, 150))
+        controls_text = f"Click column to drop piece • 1-{min(self.COLS, 9)} keys • R to restart • ESC to quit"
+        controls_surface = self.render_text(self.font_small, controls_text, (150, 150, 150))
         controls_rect = controls_surface.get_rect(center=(self.WINDOW_WIDTH // 2, status_y + 50))
         self.screen.blit(controls_surface, controls_rect)
         
@@ -594,20 +663,35 @@ class ConnectFourGame:
         """Main game loop"""
         while self.running:
             self.handle_events()
+            self.play_server_moves()
             self.update_drop_animation()
+            self.render()
             
-            # Draw everything
-            self.screen.fill(self.colors['background'])
-            self.draw_board()
-            self.draw_dropping_piece()
-            self.draw_ui()
-            
-            pygame.display.flip()
-            self.clock.tick(60)  # 60 FPS
+            # Only animations need the full frame rate; otherwise just poll for input
+            self.clock.tick(self.active_fps if self.drop_animation['active'] else self.idle_fps)
             
+        self.cancel_ai_search()
+        if self.online is not None:
+            self.online.close()
+        with self.ai_lock:
+            self.engine.close()
         pygame.quit()
         sys.exit()
 
 if __name__ == '__main__':
-    game = ConnectFourGame()
+    parser = argparse.ArgumentParser(description="Connect Four and its bigger variants")
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--cols', type=int, default=7)
+    parser.add_argument('--connect', type=int, default=4, help="pieces in a row needed to win")
+    parser.add_argument('--server', metavar="HOST:PORT", help="play online through a match server")
+    args = parser.parse_args()
+    if not 2 <= args.connect <= max(args.rows, args.cols):
+        parser.error(f"cannot connect {args.connect} on a {args.rows}x{args.cols} board")
+
+    game = ConnectFourGame(args.rows, args.cols, args.connect)
+    if args.server:
+        try:
+            game.connect_to_server(*parse_address(args.server))
+        except (ValueError, OSError) as exc:
+            parser.error(f"cannot connect to {args.server}: {exc}")
     game.run()
\ No newline at end of file
@@ -0,0 +1,274 @@
+"""Bitboard position used by the Connect Four AI search
+
+Each column owns ROWS + 1 consecutive bits, bottom cell first.  The spare bit
+on top of every column is never set, which keeps shifted lines from wrapping
+from one column into the next.  With the default 6x7 board everything fits in
+a 64-bit word.
+"""
+
+import random
+
+
+# Zobrist keys per board geometry, shared by every position of that size
+_ZOBRIST_CACHE = {}
+
+
+def zobrist_keys(rows, cols):
+    """Random 64-bit keys indexed as keys[player][bit], fixed per geometry"""
+    geometry = (rows, cols)
+    if geometry not in _ZOBRIST_CACHE:
+        rng = random.Random(rows * 100 + cols)  # Fixed seed keeps hashes reproducible
+        cells = cols * (rows + 1)
+        _ZOBRIST_CACHE[geometry] = [None] + [[rng.getrandbits(64) for _ in range(cells)]
+                                             for _ in range(2)]
+    return _ZOBRIST_CACHE[geometry]
+
+
+def _window_score(own, opp, connect):
+    """Score a window holding `own` friendly and `opp` enemy pieces"""
+    empty = connect - own - opp
+    score = 0
+
+    if own == connect:
+        score += 100
+    elif own == connect - 1 and empty == 1:
+        score += 10
+    elif own == connect - 2 and empty == 2:
+        score += 2
+
+    if opp == connect - 1 and empty == 1:
+        score -= 80
+    elif opp == connect - 2 and empty == 2:
+        score -= 2
+
+    return score
+
+
+# Score tables per connect length: (window_scores, own_gain, opp_gain)
+# window_scores[own][opp] is the score of a single window.  own_gain and
+# opp_gain give the score change when one more piece lands in a window holding
+# (own, opp) pieces, for the player who moved and for the other player.
+_SCORE_CACHE = {}
+
+
+def score_tables(connect):
+    """Window scores and per-move score changes for windows of `connect` cells"""
+    if connect not in _SCORE_CACHE:
+        size = connect + 1
+        window_scores = [[_window_score(own, opp, connect) if own + opp <= connect else 0
+                          for opp in range(size)] for own in range(size)]
+        own_gain = [[window_scores[own + 1][opp] - window_scores[own][opp] if own + opp < connect else 0
+                     for opp in range(size)] for own in range(size)]
+        opp_gain = [[window_scores[own][opp + 1] - window_scores[own][opp] if own + opp < connect else 0
+                     for opp in range(size)] for own in range(size)]
+        _SCORE_CACHE[connect] = (window_scores, own_gain, opp_gain)
+    return _SCORE_CACHE[connect]
+
+
+CENTER_WEIGHT = 3
+
+
+# Window tables per board geometry: (window masks, window indices for every cell)
+_WINDOW_CACHE = {}
+
+
+def window_tables(rows, cols, connect=4):
+    """Every `connect`-cell window as a bitmask, plus the windows each cell belongs to"""
+    geometry = (rows, cols, connect)
+    if geometry not in _WINDOW_CACHE:
+        stride = rows + 1
+        windows = []
+        cell_windows = [[] for _ in range(cols * stride)]
+        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]  # (column step, height step)
+
+        for dc, dh in directions:
+            for col in range(cols):
+                for h in range(rows):
+                    end_col = col + (connect - 1) * dc
+                    end_h = h + (connect - 1) * dh
+                    if not (0 <= end_col < cols and 0 <= end_h < rows):
+                        continue
+                    mask = 0
+                    for i in range(connect):
+                        index = (col + i * dc) * stride + h + i * dh
+                        mask |= 1 << index
+                        cell_windows[index].append(len(windows))
+                    windows.append(mask)
+
+        _WINDOW_CACHE[geometry] = (windows, [tuple(ws) for ws in cell_windows])
+    return _WINDOW_CACHE[geometry]
+
+
+# Line shift sequences per (stride, connect length), one per line direction.
+# ANDing a mask with itself shifted by each amount in turn doubles the length
+# of the runs it covers, leaving bits set only where `connect` in a row start.
+_RUN_CACHE = {}
+
+
+def run_shifts(stride, connect):
+    """Shift sequences that find `connect`-long lines in a piece mask"""
+    key = (stride, connect)
+    if key not in _RUN_CACHE:
+        steps = []
+        length = 1
+        while length * 2 <= connect:
+            steps.append(length)
+            length *= 2
+        if length < connect:
+            steps.append(connect - length)
+        _RUN_CACHE[key] = tuple(tuple(step * shift for step in steps)
+                                for shift in (1, stride, stride - 1, stride + 1))
+    return _RUN_CACHE[key]
+
+
+class BitboardPosition:
+    def __init__(self, rows=6, cols=7, connect=4):
+        if connect < 2 or connect > max(rows, cols):
+            raise ValueError(f"cannot connect {connect} on a {rows}x{cols} board")
+        self.rows = rows
+        self.cols = cols
+        self.connect = connect
+        self.stride = rows + 1
+
+        # masks[1] / masks[2] hold the pieces of each player (index 0 unused)
+        self.masks = [0, 0, 0]
+        self.heights = [0] * cols
+        self.moves_played = 0
+
+        # Zobrist hash of the pieces on the board, updated on every move
+        self.zobrist = zobrist_keys(rows, cols)
+        self.hash = 0
+
+        # Bit of the lowest cell in every column
+        self.bottom = [1 << (col * self.stride) for col in range(cols)]
+        self.center_col = cols // 2
+
+        # Win checks and window scoring are precomputed once per geometry
+        self.win_shifts = run_shifts(self.stride, connect)
+        self.score_tables = score_tables(connect)
+
+        # Running evaluation: pieces per window for each player, and the
+        # resulting score from each player's point of view
+        self.windows, self.cell_windows = window_tables(rows, cols, connect)
+        self.window_counts = [None, [0] * len(self.windows), [0] * len(self.windows)]
+        self.scores = [0, 0, 0]
+
+    def copy(self):
+        """Return an independent copy of this position"""
+        clone = BitboardPosition.__new__(BitboardPosition)
+        clone.__dict__.update(self.__dict__)
+        clone.masks = self.masks[:]
+        clone.heights = self.heights[:]
+        clone.window_counts = [None, self.window_counts[1][:], self.window_counts[2][:]]
+        clone.scores = self.scores[:]
+        return clone
+
+    def cell_bit(self, height, col):
+        """Bit for the cell `height` rows above the bottom of `col`"""
+        return 1 << (col * self.stride + height)
+
+    def can_play(self, col):
+        """Check if a piece can still be dropped into `col`"""
+        return 0 <= col < self.cols and self.heights[col] < self.rows
+
+    def valid_moves(self):
+        """List of playable columns, left to right"""
+        return [col for col in range(self.cols) if self.heights[col] < self.rows]
+
+    def make_move(self, col, player):
+        """Drop a piece for `player` into `col`"""
+        index = col * self.stride + self.heights[col]
+        self.masks[player] |= 1 << index
+        self.hash ^= self.zobrist[player][index]
+        self.heights[col] += 1
+        self.moves_played += 1
+
+        _, own_gain, opp_gain = self.score_tables
+        own_counts = self.window_counts[player]
+        opp_counts = self.window_counts[3 - player]
+        own_delta = opp_delta = 0
+        for window in self.cell_windows[index]:
+            own = own_counts[window]
+            opp = opp_counts[window]
+            own_delta += own_gain[own][opp]
+            opp_delta += opp_gain[opp][own]
+            own_counts[window] = own + 1
+
+        if col == self.center_col:
+            own_delta += CENTER_WEIGHT
+            opp_delta -= CENTER_WEIGHT
+        self.scores[player] += own_delta
+        self.scores[3 - player] += opp_delta
+
+    def unmake_move(self, col):
+        """Take the top piece back out of `col`"""
+        self.heights[col] -= 1
+        self.moves_played -= 1
+        index = col * self.stride + self.heights[col]
+        bit = 1 << index
+        player = 1 if self.masks[1] & bit else 2
+        self.masks[player] &= ~bit
+        self.hash ^= self.zobrist[player][index]
+
+        _, own_gain, opp_gain = self.score_tables
+        own_counts = self.window_counts[player]
+        opp_counts = self.window_counts[3 - player]
+        own_delta = opp_delta = 0
+        for window in self.cell_windows[index]:
+            own = own_counts[window] - 1
+            opp = opp_counts[window]
+            own_delta += own_gain[own][opp]
+            opp_delta += opp_gain[opp][own]
+            own_counts[window] = own
+
+        if col == self.center_col:
+            own_delta += CENTER_WEIGHT
+            opp_delta -= CENTER_WEIGHT
+        self.scores[player] -= own_delta
+        self.scores[3 - player] -= opp_delta
+
+    def is_full(self):
+        """Check if every cell is occupied"""
+        return self.moves_played == self.rows * self.cols
+
+    def has_line(self, mask):
+        """Check a piece mask for `connect` in a row using shift-and-AND"""
+        for shifts in self.win_shifts:
+            run = mask
+            for shift in shifts:
+                run &= run >> shift
+            if run:
+                return True
+        return False
+
+    def is_win(self, player):
+        """Check if `player` already has `connect` in a row"""
+        return self.has_line(self.masks[player])
+
+    def is_winning_move(self, col, player):
+        """Check if dropping a piece for `player` into `col` would win"""
+        if not self.can_play(col):
+            return False
+        return self.has_line(self.masks[player] | (self.bottom[col] << self.heights[col]))
+
+    def winning_line(self, col, player):
+        """Cells (height, col) of the winning line through the top piece of `col`"""
+        mask = self.masks[player]
+        height = self.heights[col] - 1
+
+        for dc, dh in [(1, 0), (0, 1), (1, 1), (1, -1)]:
+            line = [(height, col)]
+            for sign in (1, -1):
+                h, c = height + sign * dh, col + sign * dc
+                while (0 <= h < self.rows and 0 <= c < self.cols and
+                       mask & self.cell_bit(h, c)):
+                    line.append((h, c))
+                    h, c = h + sign * dh, c + sign * dc
+            if len(line) >= self.connect:
+                return line
+
+        return []
+
+    def evaluate(self, player):
+        """Heuristic score of the position from `player`'s point of view"""
+        return self.scores[player]
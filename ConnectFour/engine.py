@@ -0,0 +1,384 @@
+"""Headless Connect Four engine: game state plus every AI difficulty
+
+Nothing here touches pygame, so the engine can be driven by the game
+window, by scripts and by the self-play tournament runner alike.
+"""
+
+import os
+import random
+import time
+
+from bitboard import BitboardPosition
+from transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from solver import Solver, SolveAborted
+from opening_book import OpeningBook, DEFAULT_BOOK_PATH
+
+DIFFICULTIES = ["Easy", "Medium", "Hard", "Perfect"]
+
+
+class SearchAborted(Exception):
+    """Raised inside minimax when the time budget runs out or the search is cancelled"""
+
+
+class ConnectFourEngine:
+    WIN_SCORE = 1000000  # Search score for a forced win
+
+    def __init__(self, rows=6, cols=7, connect=4, seed=None, book_path=DEFAULT_BOOK_PATH):
+        self.rows = rows
+        self.cols = cols
+        self.connect = connect
+
+        # All random choices go through this generator so games can be replayed
+        self.rng = random.Random(seed)
+
+        # Hard search settings
+        self.hard_time_budget_ms = 1000  # Per-move thinking time for Hard
+        self.hard_max_depth = rows * cols
+
+        # Search cache, kept across AI turns and cleared for every new game
+        self.tt_size = 1 << 16
+        self.tt_replacement = "depth"
+        self.transposition_table = TranspositionTable(self.tt_size, self.tt_replacement)
+        self.tt_player = None  # Side the cached scores are measured for
+        self.pv_moves = {}  # Position hash -> move on the previous iteration's principal variation
+        self.search_player = 2
+        self.search_deadline = None
+        self.search_cancel = None
+        self.search_nodes = 0
+        self.last_search_depth = 0
+        self.last_search_report = {}
+        self.last_move_nodes = 0
+
+        # Move ordering for the Hard search; each heuristic can be switched off
+        self.move_ordering = {
+            'center_first': True,     # Prefer columns near the middle
+            'win_block_first': True,  # Block the opponent's immediate wins first
+            'tt_move_first': True,    # Best move stored in the transposition table
+            'killers': True,          # Moves that caused cutoffs at the same ply
+            'history': True           # Moves that caused cutoffs anywhere in the search
+        }
+        self.killer_moves = {}  # Ply -> up to two columns that caused beta cutoffs
+        self.history_scores = [None, [0] * cols, [0] * cols]
+
+        # Perfect play: exact solver, with the opening book memory-mapped when present.
+        # The solver only knows four in a row; other variants top out at Hard.
+        self.perfect_time_budget_ms = 5000
+        # Positions with more empty cells than this are rarely proven within the budget (measured
+        # on 6x7 with a 5 s budget), so outside the book they go straight to the Hard search
+        self.perfect_max_open_cells = 26
+        if connect == 4:
+            self.opening_book = self.load_opening_book(book_path)
+            self.solver = Solver(rows, cols, book=self.opening_book)
+            self.difficulties = DIFFICULTIES
+        else:
+            self.opening_book = None
+            self.solver = None
+            self.difficulties = DIFFICULTIES[:3]
+
+        self.reset()
+
+    def load_opening_book(self, path):
+        """Memory-map the opening book for this board size, if one has been generated"""
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            book = OpeningBook.load(path)
+        except (OSError, ValueError) as e:
+            print(f"Could not load opening book: {e}")
+            return None
+        if (book.rows, book.cols) != (self.rows, self.cols):
+            book.close()
+            return None
+        return book
+
+    def close(self):
+        """Release the opening book"""
+        if self.opening_book is not None:
+            self.opening_book.close()
+
+    # --- Game state ---
+
+    def reset(self):
+        """Start a new game on an empty board"""
+        self.position = BitboardPosition(self.rows, self.cols, self.connect)
+        self.transposition_table.clear()
+        self.tt_player = None
+
+    def current_player(self):
+        """Player to move: Red (1) always starts"""
+        return 1 + self.position.moves_played % 2
+
+    def play(self, col):
+        """Drop a piece for the player to move; returns True if it wins"""
+        player = self.current_player()
+        self.position.make_move(col, player)
+        return self.position.is_win(player)
+
+    def is_over(self):
+        """Check if the last move won or filled the board"""
+        last_player = 2 - self.position.moves_played % 2
+        return self.position.is_win(last_player) or self.position.is_full()
+
+    # --- AI ---
+
+    def get_ai_move(self, difficulty, position=None, cancel=None):
+        """Column chosen for the side to move at the given difficulty"""
+        if position is None:
+            position = self.position
+        self.search_nodes = 0
+        if self.solver is not None:
+            self.solver.nodes = 0
+
+        if difficulty == "Easy":
+            col = self.ai_easy(position)
+        elif difficulty == "Medium":
+            col = self.ai_medium(position)
+        elif difficulty == "Hard" or self.solver is None:
+            col = self.ai_hard(position, cancel)
+        else:  # Perfect
+            col = self.ai_perfect(position, cancel)
+
+        self.last_move_nodes = self.search_nodes
+        if self.solver is not None:
+            self.last_move_nodes += self.solver.nodes
+        return col
+
+    def ai_easy(self, position=None):
+        """Easy AI - random valid moves"""
+        if position is None:
+            position = self.position
+        valid_cols = position.valid_moves()
+        return self.rng.choice(valid_cols) if valid_cols else None
+
+    def ai_medium(self, position=None):
+        """Medium AI - win if possible, otherwise block, otherwise play centrally"""
+        if position is None:
+            position = self.position
+        player = 1 + position.moves_played % 2
+
+        # Check if AI can win
+        for col in range(self.cols):
+            if position.is_winning_move(col, player):
+                return col
+
+        # Check if need to block the opponent
+        for col in range(self.cols):
+            if position.is_winning_move(col, 3 - player):
+                return col
+
+        # Prefer center columns
+        center_cols = sorted(range(self.cols), key=lambda col: abs(col - self.cols // 2))
+        for col in center_cols:
+            if position.can_play(col):
+                return col
+        return None
+
+    def ai_hard(self, position=None, cancel=None):
+        """Hard AI - iterative deepening minimax within a time budget"""
+        if position is None:
+            position = self.position
+        position = position.copy()
+        max_depth = min(self.hard_max_depth, position.rows * position.cols - position.moves_played)
+        deadline = time.perf_counter() + self.hard_time_budget_ms / 1000
+
+        # Cached scores are relative to the searching side
+        self.search_player = 1 + position.moves_played % 2
+        if self.tt_player != self.search_player:
+            self.transposition_table.clear()
+            self.tt_player = self.search_player
+
+        best_col = None
+        start = time.perf_counter()
+        self.search_cancel = cancel
+        self.pv_moves = {}
+        self.search_nodes = 0
+        self.last_search_depth = 0
+        self.killer_moves = {}
+        self.history_scores = [None, [0] * position.cols, [0] * position.cols]
+
+        for depth in range(1, max_depth + 1):
+            # The first iteration ignores the clock so there is a move to return
+            self.search_deadline = deadline if depth > 1 else None
+            try:
+                score, col = self.minimax(position, depth, True, float('-inf'), float('inf'))
+            except SearchAborted:
+                # Keep the move from the last completed iteration
+                break
+
+            best_col = col
+            self.last_search_depth = depth
+            self.pv_moves = self.extract_pv(position, depth)
+
+            # A proven win or loss will not change with more depth
+            if abs(score) >= self.WIN_SCORE or time.perf_counter() >= deadline:
+                break
+
+        self.search_deadline = None
+        self.search_cancel = None
+
+        elapsed = time.perf_counter() - start
+        self.last_search_report = {
+            'depth': self.last_search_depth,
+            'nodes': self.search_nodes,
+            'time_ms': elapsed * 1000,
+            'nodes_per_second': self.search_nodes / elapsed if elapsed > 0 else 0.0,
+            'transposition_table': self.transposition_table.stats()
+        }
+        return best_col
+
+    def ai_perfect(self, position=None, cancel=None):
+        """Perfect AI - exact solver once few enough cells are open (or from the book), Hard before that"""
+        if position is None:
+            position = self.position
+        book = self.opening_book
+        in_book = book is not None and position.moves_played < book.plies
+        open_cells = position.rows * position.cols - position.moves_played
+        if not in_book and open_cells > self.perfect_max_open_cells:
+            # The solve would only time out and fall back anyway
+            return self.ai_hard(position, cancel)
+        try:
+            return self.solver.best_move(position, self.perfect_time_budget_ms, cancel)
+        except SolveAborted:
+            # Position too open to prove in time: fall back to the Hard search
+            if cancel is not None and cancel.is_set():
+                return None
+            return self.ai_hard(position, cancel)
+
+    # --- Hard search internals ---
+
+    def search_should_stop(self):
+        """Check the per-move deadline and the cancel flag of the running search"""
+        if self.search_cancel is not None and self.search_cancel.is_set():
+            return True
+        return self.search_deadline is not None and time.perf_counter() >= self.search_deadline
+
+    def extract_pv(self, position, depth):
+        """Follow best moves through the transposition table from the root"""
+        pv_moves = {}
+        played = []
+        player = self.search_player
+
+        for _ in range(depth):
+            move = self.transposition_table.lookup_move(position.hash)
+            if move is None or not position.can_play(move) or position.hash in pv_moves:
+                break
+            pv_moves[position.hash] = move
+            position.make_move(move, player)
+            played.append(move)
+            player = 3 - player
+
+        for move in reversed(played):
+            position.unmake_move(move)
+        return pv_moves
+
+    def minimax(self, position, depth, maximizing, alpha, beta):
+        """Minimax algorithm with alpha-beta pruning on a bitboard position"""
+        self.search_nodes += 1
+        if self.search_nodes % 1024 == 0 and self.search_should_stop():
+            raise SearchAborted()
+
+        if depth == 0 or position.is_full():
+            return self.evaluate_position(position), None
+
+        # Reuse earlier results for this position when they were searched deep enough
+        key = position.hash
+        entry = self.transposition_table.probe(key)
+        tt_move = entry[4] if entry is not None else None
+        if entry is not None and entry[1] >= depth:
+            tt_score, bound = entry[2], entry[3]
+            if bound == EXACT:
+                return tt_score, tt_move
+            elif bound == LOWER_BOUND:
+                alpha = max(alpha, tt_score)
+            else:
+                beta = min(beta, tt_score)
+            if beta <= alpha:
+                return tt_score, tt_move
+        alpha_orig, beta_orig = alpha, beta
+
+        valid_cols = position.valid_moves()
+        best_col = self.rng.choice(valid_cols) if valid_cols else None
+        # The searching side maximizes, its opponent minimizes
+        player = self.search_player if maximizing else 3 - self.search_player
+
+        # A move that ends the game is scored directly; sooner wins score higher
+        for col in valid_cols:
+            if position.is_winning_move(col, player):
+                win_score = self.WIN_SCORE + depth
+                return (win_score if maximizing else -win_score), col
+
+        valid_cols = self.order_moves(position, valid_cols, player, tt_move, self.pv_moves.get(key))
+
+        if maximizing:
+            best_eval = float('-inf')
+            for col in valid_cols:
+                position.make_move(col, player)
+                eval_score, _ = self.minimax(position, depth - 1, False, alpha, beta)
+                position.unmake_move(col)
+
+                if eval_score > best_eval:
+                    best_eval = eval_score
+                    best_col = col
+
+                alpha = max(alpha, eval_score)
+                if beta <= alpha:
+                    self.record_cutoff(position, col, player, depth)
+                    break
+        else:
+            best_eval = float('inf')
+            for col in valid_cols:
+                position.make_move(col, player)
+                eval_score, _ = self.minimax(position, depth - 1, True, alpha, beta)
+                position.unmake_move(col)
+
+                if eval_score < best_eval:
+                    best_eval = eval_score
+                    best_col = col
+
+                beta = min(beta, eval_score)
+                if beta <= alpha:
+                    self.record_cutoff(position, col, player, depth)
+                    break
+
+        if best_eval <= alpha_orig:
+            bound = UPPER_BOUND
+        elif best_eval >= beta_orig:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.transposition_table.store(key, depth, best_eval, bound, best_col)
+
+        return best_eval, best_col
+
+    def order_moves(self, position, valid_cols, player, tt_move, pv_move):
+        """Sort columns so the moves most likely to cause a cutoff are searched first"""
+        ordering = self.move_ordering
+        opponent = 3 - player
+        killers = self.killer_moves.get(position.moves_played, ()) if ordering['killers'] else ()
+        history = self.history_scores[player]
+        center = position.cols // 2
+
+        def priority(col):
+            return (
+                col == pv_move,  # Previous iteration's principal variation always comes first
+                ordering['tt_move_first'] and col == tt_move,
+                ordering['win_block_first'] and position.is_winning_move(col, opponent),
+                col in killers,
+                history[col] if ordering['history'] else 0,
+                -abs(col - center) if ordering['center_first'] else 0
+            )
+
+        # Stable sort keeps left-to-right order between equal columns
+        return sorted(valid_cols, key=priority, reverse=True)
+
+    def record_cutoff(self, position, col, player, depth):
+        """Remember a move that caused a beta cutoff for the killer and history heuristics"""
+        killers = self.killer_moves.setdefault(position.moves_played, [])
+        if col not in killers:
+            killers.insert(0, col)
+            del killers[2:]
+        self.history_scores[player][col] += depth * depth
+
+    def evaluate_position(self, position):
+        """Evaluate board position for minimax (positive favours the searching side)"""
+        return position.evaluate(self.search_player)
@@ -0,0 +1,158 @@
+"""Opening book of solved Connect Four positions
+
+The book maps the canonical key of every position within the first few
+plies (mirror images share one entry) to its exact solver score.  It is
+built offline and saved as a compact binary file:
+
+    header   magic b'C4OB', version, rows, cols, plies, entry count
+    keys     sorted little-endian uint64, one per entry
+    scores   int8, in the same order as the keys
+
+At startup the file is memory-mapped and searched with a binary search, so
+loading is instant and the book costs no Python objects per entry.
+
+Generate a book with:
+
+    python ConnectFour/opening_book.py --plies 2
+
+No book ships with the game.  Every booked position is solved from scratch
+by the pure-Python solver, so on 6x7 even two plies take hours; deeper books
+are a job for a long offline run.
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+
+from solver import Solver
+
+MAGIC = b'C4OB'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBBI')
+KEY = struct.Struct('<Q')
+
+DEFAULT_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'opening_book.bin')
+
+
+class OpeningBook:
+    def __init__(self, rows=6, cols=7, plies=0, entries=None):
+        self.rows = rows
+        self.cols = cols
+        self.plies = plies
+        self.entries = entries if entries is not None else {}
+
+        # Set when the book is backed by a memory-mapped file
+        self.data = None
+        self.count = 0
+
+    @classmethod
+    def load(cls, path=DEFAULT_BOOK_PATH):
+        """Memory-map a book file written by save()"""
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, rows, cols, plies, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            data.close()
+            raise ValueError(f"{path} is not a Connect Four opening book")
+        if len(data) != HEADER.size + count * (KEY.size + 1):
+            data.close()
+            raise ValueError(f"{path} is truncated")
+
+        book = cls(rows, cols, plies)
+        book.data = data
+        book.count = count
+        return book
+
+    def __len__(self):
+        return self.count if self.data is not None else len(self.entries)
+
+    def lookup(self, key):
+        """Exact score stored for a canonical position key, or None"""
+        if self.data is None:
+            return self.entries.get(key)
+
+        low, high = 0, self.count - 1
+        while low <= high:
+            mid = (low + high) // 2
+            found = KEY.unpack_from(self.data, HEADER.size + mid * KEY.size)[0]
+            if found < key:
+                low = mid + 1
+            elif found > key:
+                high = mid - 1
+            else:
+                offset = HEADER.size + self.count * KEY.size + mid
+                return struct.unpack_from('<b', self.data, offset)[0]
+        return None
+
+    def save(self, path=DEFAULT_BOOK_PATH):
+        """Write the in-memory entries as a binary book file"""
+        keys = sorted(self.entries)
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.rows, self.cols, self.plies, len(keys)))
+            f.write(struct.pack(f'<{len(keys)}Q', *keys))
+            f.write(struct.pack(f'<{len(keys)}b', *(self.entries[key] for key in keys)))
+
+    def close(self):
+        """Release the memory map"""
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+
+
+def generate_book(plies, rows=6, cols=7, progress=None):
+    """Solve every position reachable within `plies` moves and return the book"""
+    book = OpeningBook(rows, cols, plies)
+    solver = Solver(rows, cols, book=book)
+
+    # Collect the positions of every ply first, merging mirror images
+    levels = [{solver.canonical_key(0, 0): (0, 0)}]
+    for ply in range(plies):
+        children = {}
+        for current, mask in levels[-1].values():
+            wins = solver.winning_cells(current, mask)
+            for col in range(cols):
+                if mask & solver.top_masks[col]:
+                    continue
+                move = (mask + solver.bottom[col]) & solver.column_masks[col]
+                if move & wins:
+                    continue  # The game is over, nothing left to book
+                child = (current ^ mask, mask | move)
+                children.setdefault(solver.canonical_key(*child), child)
+        levels.append(children)
+
+    # Solve the deepest ply first so shallower searches can stop at book entries
+    for ply in range(plies, -1, -1):
+        start = time.perf_counter()
+        for key, (current, mask) in levels[ply].items():
+            # Immediate wins are found instantly without the book
+            if not solver.can_win_next(current, mask):
+                book.entries[key] = solver.solve(current, mask, ply)
+        if progress is not None:
+            progress(ply, len(levels[ply]), time.perf_counter() - start)
+
+    return book
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the Connect Four opening book")
+    parser.add_argument('--plies', type=int, default=2, help="number of opening plies to solve")
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--cols', type=int, default=7)
+    parser.add_argument('--output', default=DEFAULT_BOOK_PATH, help="book file to write")
+    args = parser.parse_args(argv)
+
+    def report(ply, count, seconds):
+        print(f"ply {ply}: {count} positions solved in {seconds:.1f}s", flush=True)
+
+    book = generate_book(args.plies, args.rows, args.cols, progress=report)
+    book.save(args.output)
+    print(f"Wrote {len(book)} entries to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
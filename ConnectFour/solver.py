@@ -0,0 +1,216 @@
+"""Exact Connect Four solver (negamax with alpha-beta and a null-window search)
+
+Scores follow the usual convention for solved Connect Four positions:
+0 is a draw, a positive score means the side to move wins and a negative one
+means it loses.  The sooner the win, the larger the score: winning with your
+last remaining piece scores 1, winning with your k-th from last scores k.
+
+Positions are (current, mask) bitboard pairs using the same bit layout as
+BitboardPosition: `current` holds the pieces of the side to move and `mask`
+every piece on the board.  `current + mask` is a unique key for the position.
+"""
+
+import time
+
+
+class SolveAborted(Exception):
+    """Raised when a solve runs past its deadline or is cancelled"""
+
+
+class Solver:
+    def __init__(self, rows=6, cols=7, tt_size=(1 << 19) + 21, book=None):
+        self.rows = rows
+        self.cols = cols
+        self.stride = rows + 1
+        self.cells = rows * cols
+        self.min_score = -(self.cells // 2) + 3
+        self.book = book
+
+        self.bottom = [1 << (col * self.stride) for col in range(cols)]
+        self.bottom_mask = sum(self.bottom)
+        self.board_mask = self.bottom_mask * ((1 << rows) - 1)
+        self.column_masks = [((1 << rows) - 1) << (col * self.stride) for col in range(cols)]
+        self.top_masks = [1 << (rows - 1 + col * self.stride) for col in range(cols)]
+
+        # Explore center columns first: 3, 2, 4, 1, 5, 0, 6 on a 7-wide board
+        self.column_order = sorted(range(cols), key=lambda col: abs(col - (cols - 1) / 2))
+
+        # Upper bounds of previously searched positions, keyed by current + mask
+        self.tt_size = tt_size
+        self.tt_keys = [None] * tt_size
+        self.tt_values = [0] * tt_size
+
+        self.nodes = 0
+        self.deadline = None
+        self.cancel = None
+
+    # --- Bitboard helpers ---
+
+    def winning_cells(self, current, mask):
+        """Empty cells where the owner of `current` would complete four in a row"""
+        stride = self.stride
+
+        # Vertical
+        result = (current << 1) & (current << 2) & (current << 3)
+
+        # Horizontal and both diagonals
+        for shift in (stride, stride - 1, stride + 1):
+            pair = (current << shift) & (current << 2 * shift)
+            result |= pair & (current << 3 * shift)
+            result |= pair & (current >> shift)
+            pair = (current >> shift) & (current >> 2 * shift)
+            result |= pair & (current << shift)
+            result |= pair & (current >> 3 * shift)
+
+        return result & (self.board_mask ^ mask)
+
+    def possible(self, mask):
+        """Cells where a piece can be dropped next"""
+        return (mask + self.bottom_mask) & self.board_mask
+
+    def can_win_next(self, current, mask):
+        """Check if the side to move has an immediate win"""
+        return bool(self.winning_cells(current, mask) & self.possible(mask))
+
+    def non_losing_moves(self, current, mask):
+        """Playable cells that do not hand the opponent an immediate win"""
+        possible = self.possible(mask)
+        opponent_wins = self.winning_cells(current ^ mask, mask)
+        forced = possible & opponent_wins
+        if forced:
+            if forced & (forced - 1):
+                return 0  # Two threats at once cannot both be blocked
+            possible = forced
+        # Never play directly below an opponent's winning cell
+        return possible & ~(opponent_wins >> 1)
+
+    def mirror(self, bits):
+        """Reflect a bitboard left to right"""
+        column = (1 << self.stride) - 1
+        result = 0
+        for col in range(self.cols):
+            result |= ((bits >> (col * self.stride)) & column) << ((self.cols - 1 - col) * self.stride)
+        return result
+
+    def canonical_key(self, current, mask):
+        """Key shared by a position and its mirror image"""
+        key = current + mask
+        mirrored = self.mirror(current) + self.mirror(mask)
+        return min(key, mirrored)
+
+    # --- Search ---
+
+    def negamax(self, current, mask, moves, alpha, beta):
+        """Score of a position where the side to move cannot win immediately"""
+        self.nodes += 1
+        if self.nodes % 4096 == 0:
+            if self.cancel is not None and self.cancel.is_set():
+                raise SolveAborted()
+            if self.deadline is not None and time.perf_counter() >= self.deadline:
+                raise SolveAborted()
+
+        candidates = self.non_losing_moves(current, mask)
+        if candidates == 0:
+            return -((self.cells - moves) // 2)
+
+        if moves >= self.cells - 2:
+            return 0  # Neither side can win with the last two pieces
+
+        # The opponent cannot win on their next move, so this is a lower bound
+        low = -((self.cells - 2 - moves) // 2)
+        if alpha < low:
+            alpha = low
+            if alpha >= beta:
+                return alpha
+
+        # We cannot win immediately, so this is an upper bound
+        high = (self.cells - 1 - moves) // 2
+        key = current + mask
+        slot = key % self.tt_size
+        if self.tt_keys[slot] == key:
+            high = self.tt_values[slot] + self.min_score - 1
+        elif self.book is not None and moves <= self.book.plies:
+            score = self.book.lookup(self.canonical_key(current, mask))
+            if score is not None:
+                return score
+        if beta > high:
+            beta = high
+            if alpha >= beta:
+                return beta
+
+        # Moves creating the most new threats first, center columns breaking ties
+        ordered = []
+        for col in self.column_order:
+            move = candidates & self.column_masks[col]
+            if move:
+                threats = bin(self.winning_cells(current | move, mask | move)).count('1')
+                ordered.append((threats, move))
+        ordered.sort(key=lambda item: item[0], reverse=True)
+
+        for _, move in ordered:
+            # Playing swaps the side to move: the opponent's pieces become `current`
+            score = -self.negamax(current ^ mask, mask | move, moves + 1, -beta, -alpha)
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+
+        self.tt_keys[slot] = key
+        self.tt_values[slot] = alpha - self.min_score + 1
+        return alpha
+
+    def solve(self, current, mask, moves):
+        """Exact score of a position using a series of null-window searches"""
+        if self.can_win_next(current, mask):
+            return (self.cells + 1 - moves) // 2
+
+        low = -((self.cells - moves) // 2)
+        high = (self.cells + 1 - moves) // 2
+        while low < high:
+            med = low + (high - low) // 2
+            # Probe near zero first; it narrows the window fastest
+            if med <= 0 and int(low / 2) < med:
+                med = int(low / 2)
+            elif med >= 0 and int(high / 2) > med:
+                med = int(high / 2)
+            result = self.negamax(current, mask, moves, med, med + 1)
+            if result <= med:
+                high = result
+            else:
+                low = result
+        return low
+
+    def score_moves(self, position, budget_ms=None, cancel=None):
+        """Exact score of every playable column of a BitboardPosition, for the side to move"""
+        self.deadline = time.perf_counter() + budget_ms / 1000 if budget_ms is not None else None
+        self.cancel = cancel
+        self.nodes = 0
+
+        side = 1 if position.moves_played % 2 == 0 else 2  # Red always moves first
+        current = position.masks[side]
+        mask = position.masks[1] | position.masks[2]
+        moves = position.moves_played
+        wins = self.winning_cells(current, mask)
+
+        scores = {}
+        try:
+            for col in self.column_order:
+                if mask & self.top_masks[col]:
+                    continue
+                move = (mask + self.bottom[col]) & self.column_masks[col]
+                if move & wins:
+                    scores[col] = (self.cells + 1 - moves) // 2
+                else:
+                    scores[col] = -self.solve(current ^ mask, mask | move, moves + 1)
+        finally:
+            self.deadline = None
+            self.cancel = None
+        return scores
+
+    def best_move(self, position, budget_ms=None, cancel=None):
+        """Column with the best exact score; raises SolveAborted when out of time"""
+        scores = self.score_moves(position, budget_ms, cancel)
+        if not scores:
+            return None
+        # Ties go to the most central column
+        return max(self.column_order, key=lambda col: scores.get(col, -self.cells))
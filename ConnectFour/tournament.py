@@ -0,0 +1,136 @@
+"""Headless Connect Four self-play tournaments
+
+Plays many games between two AI difficulty levels across a process pool and
+reports results from the first player's point of view:
+
+    python ConnectFour/tournament.py Hard Medium --games 1000 --workers 8
+    python ConnectFour/tournament.py Hard Medium --rows 8 --cols 9 --connect 5
+
+The two sides swap colors every game, so each one plays Red half the time.
+Every game is seeded from --seed and its index, so a run can be reproduced
+exactly (up to the Hard search, which stops on a clock).  Perfect needs the
+standard connect-4 rules and plays like Hard in other variants.
+"""
+
+import argparse
+import collections
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bitboard import BitboardPosition
+from engine import ConnectFourEngine, DIFFICULTIES
+
+GAMES_PER_WORKER = 4  # Games in flight per worker: enough to keep them busy, few enough to bound memory
+
+
+def play_game(game_index, first, second, seed, hard_budget_ms, perfect_budget_ms, rows, cols, connect):
+    """Play one game and return its result and per-side timing"""
+    engines = []
+    for side in range(2):
+        engine = ConnectFourEngine(rows, cols, connect, seed=seed * 1000003 + game_index * 2 + side)
+        engine.hard_time_budget_ms = hard_budget_ms
+        engine.perfect_time_budget_ms = perfect_budget_ms
+        engines.append(engine)
+
+    # Sides swap colors each game: on even games `first` plays Red
+    red = game_index % 2
+    levels = [first, second]
+    stats = [{'moves': 0, 'seconds': 0.0, 'nodes': 0} for _ in range(2)]
+    position = BitboardPosition(rows, cols, connect)
+    winner_side = None
+
+    while True:
+        player = 1 + position.moves_played % 2
+        side = red if player == 1 else 1 - red
+        engine = engines[side]
+
+        start = time.perf_counter()
+        col = engine.get_ai_move(levels[side], position)
+        stats[side]['seconds'] += time.perf_counter() - start
+        stats[side]['moves'] += 1
+        stats[side]['nodes'] += engine.last_move_nodes
+
+        position.make_move(col, player)
+        if position.is_win(player):
+            winner_side = side
+            break
+        if position.is_full():
+            break
+
+    for engine in engines:
+        engine.close()
+
+    if winner_side is None:
+        result = 'draw'
+    else:
+        result = 'win' if winner_side == 0 else 'loss'
+    return {'result': result, 'stats': stats}
+
+
+def run_tournament(first, second, games, workers=None, seed=0, hard_budget_ms=100,
+                   perfect_budget_ms=1000, rows=6, cols=7, connect=4):
+    """Play `games` games in a process pool and aggregate the results"""
+    totals = {'win': 0, 'draw': 0, 'loss': 0}
+    sides = [{'moves': 0, 'seconds': 0.0, 'nodes': 0} for _ in range(2)]
+
+    def collect(game):
+        totals[game['result']] += 1
+        for side in range(2):
+            for field in sides[side]:
+                sides[side][field] += game['stats'][side][field]
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # A bounded window of pending games, so a long run never queues every game at once
+        pending = collections.deque()
+        for index in range(games):
+            pending.append(pool.submit(play_game, index, first, second, seed, hard_budget_ms,
+                                       perfect_budget_ms, rows, cols, connect))
+            if len(pending) >= workers * GAMES_PER_WORKER:
+                collect(pending.popleft().result())
+        while pending:
+            collect(pending.popleft().result())
+
+    return totals, sides
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play Connect Four AI difficulties against each other")
+    parser.add_argument('first', choices=DIFFICULTIES)
+    parser.add_argument('second', choices=DIFFICULTIES)
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--hard-budget-ms', type=int, default=100, help="Hard search time per move")
+    parser.add_argument('--perfect-budget-ms', type=int, default=1000, help="Perfect solver time per move")
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--cols', type=int, default=7)
+    parser.add_argument('--connect', type=int, default=4, help="pieces in a row needed to win")
+    args = parser.parse_args(argv)
+    if args.games < 1:
+        parser.error("--games must be at least 1")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if not 2 <= args.connect <= max(args.rows, args.cols):
+        parser.error(f"cannot connect {args.connect} on a {args.rows}x{args.cols} board")
+
+    start = time.perf_counter()
+    totals, sides = run_tournament(args.first, args.second, args.games, args.workers, args.seed,
+                                   args.hard_budget_ms, args.perfect_budget_ms, args.rows, args.cols,
+                                   args.connect)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.first} vs {args.second}: {args.games} games in {elapsed:.1f}s")
+    for label in ('win', 'draw', 'loss'):
+        print(f"  {label:5} {totals[label]:6d}  {totals[label] / args.games:6.1%}")
+    for level, side in zip((args.first, args.second), sides):
+        latency_ms = side['seconds'] / side['moves'] * 1000 if side['moves'] else 0.0
+        nps = side['nodes'] / side['seconds'] if side['seconds'] > 0 else 0.0
+        print(f"  {level:8} mean move {latency_ms:8.2f} ms  {nps:10.0f} nodes/s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Bounded transposition table for the Connect Four minimax search"""
+
+# Bound types stored with each entry
+EXACT = 0
+LOWER_BOUND = 1  # Search failed high, real score is >= stored score
+UPPER_BOUND = 2  # Search failed low, real score is <= stored score
+
+REPLACEMENT_POLICIES = ("always", "depth")
+
+
+class TranspositionTable:
+    def __init__(self, size=1 << 16, replacement="depth"):
+        if size <= 0:
+            raise ValueError("Transposition table size must be positive")
+        if replacement not in REPLACEMENT_POLICIES:
+            raise ValueError(f"Unknown replacement policy: {replacement}")
+
+        self.size = size
+        self.replacement = replacement
+        self.clear()
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        # Each slot holds (key, depth, score, bound, best_move) or None
+        self.entries = [None] * self.size
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def probe(self, key):
+        """Return the entry stored for `key`, or None"""
+        entry = self.entries[key % self.size]
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] != key:
+            # Slot is taken by a different position
+            self.collisions += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def lookup_move(self, key):
+        """Best move stored for `key` without touching the counters"""
+        entry = self.entries[key % self.size]
+        if entry is None or entry[0] != key:
+            return None
+        return entry[4]
+
+    def store(self, key, depth, score, bound, best_move):
+        """Store a search result, subject to the replacement policy"""
+        index = key % self.size
+        entry = self.entries[index]
+
+        # Depth-preferred: keep a deeper result for a different position
+        if (self.replacement == "depth" and entry is not None and
+                entry[0] != key and entry[1] > depth):
+            return
+
+        if entry is None:
+            self.used += 1
+        self.entries[index] = (key, depth, score, bound, best_move)
+        self.stores += 1
+
+    def stats(self):
+        """Counters for tuning the table size"""
+        probes = self.hits + self.misses
+        return {
+            'size': self.size,
+            'used': self.used,
+            'stores': self.stores,
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'hit_rate': self.hits / probes if probes else 0.0
+        }
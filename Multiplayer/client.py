@@ -0,0 +1,59 @@
+"""Blocking client connection to the match server, for the pygame games
+
+The socket is read on a daemon thread and every message is handed to a
+callback, so a game loop only has to turn the callback into one of its own
+events (pygame.event.post is safe to call from any thread).
+"""
+
+import socket
+import threading
+
+from protocol import MAX_LINE, decode, encode
+
+
+class ServerConnection:
+    def __init__(self, host, port, on_message, timeout=5):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.settimeout(None)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Moves are tiny; send them at once
+        self.on_message = on_message
+        self.send_lock = threading.Lock()
+        self.closed = False
+
+        self.reader = threading.Thread(target=self.read_loop, daemon=True)
+        self.reader.start()
+
+    def send(self, message):
+        """Send one message; a dead connection is reported by the reader thread"""
+        try:
+            with self.send_lock:
+                self.sock.sendall(encode(message))
+        except OSError:
+            pass
+
+    def read_loop(self):
+        """Reader thread: pass every message to the callback until the connection ends"""
+        try:
+            with self.sock.makefile("rb") as stream:
+                while True:
+                    line = stream.readline(MAX_LINE + 1)
+                    if not line:
+                        break
+                    if line.strip():
+                        try:
+                            self.on_message(decode(line))
+                        except ValueError:
+                            pass  # Ignore anything that is not a message
+        except OSError:
+            pass
+        if not self.closed:
+            self.on_message({"type": "disconnected"})
+
+    def close(self):
+        """Hang up without reporting a disconnect"""
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
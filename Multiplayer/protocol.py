@@ -0,0 +1,56 @@
+"""Wire format shared by the match server and the game clients
+
+Every message is one JSON object on its own line, encoded as UTF-8.  The
+"type" field says what it is:
+
+Client to server
+    {"type": "join", "game": "tictactoe", "rows": 3, "cols": 3, "k": 3}
+    {"type": "join", "game": "connectfour", "rows": 6, "cols": 7, "connect": 4}
+    {"type": "move", "move": 4}     cell row * cols + col, or a Connect Four column
+    {"type": "leave"}               give up the current match or stop waiting
+
+Server to client
+    {"type": "waiting"}                                 queued until an opponent joins
+    {"type": "start", "player": 1, "game": ..., ...}   1 moves first, 2 second
+    {"type": "move", "player": 2, "move": 3}           sent to both players
+    {"type": "over", "winner": 1, "reason": "line"}    reason: line, full or opponent_left
+    {"type": "error", "message": "..."}                the request was refused
+"""
+
+import json
+
+DEFAULT_PORT = 8765
+MAX_LINE = 1024  # Longest message either side accepts, in bytes
+
+# Board parameters each game accepts in "join", with their defaults
+GAMES = {
+    "tictactoe": {"rows": 3, "cols": 3, "k": 3},
+    "connectfour": {"rows": 6, "cols": 7, "connect": 4},
+}
+MAX_BOARD_SIDE = 20
+
+
+def encode(message):
+    """One message as a newline-terminated line of compact JSON"""
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def decode(line):
+    """Parse one line into a message dict; ValueError if it is not one"""
+    try:
+        message = json.loads(line)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("message is not valid JSON")
+    if not isinstance(message, dict) or not isinstance(message.get("type"), str):
+        raise ValueError("message must be a JSON object with a \"type\"")
+    return message
+
+
+def parse_address(address):
+    """(host, port) from "host:port", "host" or ":port" """
+    host, _, port = address.rpartition(":") if ":" in address else (address, "", "")
+    if not port:
+        return host or "localhost", DEFAULT_PORT
+    if not port.isdigit() or not 0 < int(port) < 65536:
+        raise ValueError(f"bad port in {address!r}")
+    return host or "localhost", int(port)
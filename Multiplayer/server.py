@@ -0,0 +1,305 @@
+"""Online match server for Tic Tac Toe and Connect Four
+
+One asyncio event loop hosts every match.  Players connect over TCP and
+speak the line-delimited JSON protocol in protocol.py: a "join" puts them in
+the queue for that game and board size, and the next player to join the same
+queue becomes their opponent.  Moves are checked against the same headless
+rules the games use (TicTacToe/position.py and ConnectFour/bitboard.py)
+before they are passed on, so a client can never play out of turn or onto
+an occupied cell.
+
+Each connection is a plain asyncio.Protocol with no task of its own, so an
+idle player costs a socket and a few kilobytes of memory; one core holds
+tens of thousands of them.
+
+    python Multiplayer/server.py --port 8765
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+from protocol import DEFAULT_PORT, GAMES, MAX_BOARD_SIDE, MAX_LINE, decode, encode
+
+# The game rules live next to the games themselves
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "TicTacToe"))
+sys.path.append(os.path.join(ROOT, "ConnectFour"))
+
+from position import Position
+from bitboard import BitboardPosition
+
+MAX_BUFFERED = 64 * 1024  # Output queued for a client that stopped reading before it is dropped
+
+
+class TicTacToeRules:
+    """Headless Tic Tac Toe / k-in-a-row rules for one match"""
+
+    def __init__(self, rows, cols, k):
+        self.position = Position(rows, cols, k)
+
+    def to_move(self):
+        """Player whose turn it is"""
+        return self.position.to_move()
+
+    def make_move(self, move):
+        """Mark cell `move` for the player to move; False if it is not legal"""
+        position = self.position
+        if position.is_over() or not 0 <= move < position.cells or not position.is_empty(move):
+            return False
+        position.play(move)
+        return True
+
+    def check_winner(self):
+        """Player with k in a row, or 0"""
+        return self.position.winner()
+
+    def is_board_full(self):
+        """Check if no empty cell is left"""
+        return self.position.full()
+
+
+class ConnectFourRules:
+    """Headless Connect Four / connect-N rules for one match"""
+
+    def __init__(self, rows, cols, connect):
+        self.position = BitboardPosition(rows, cols, connect)
+        self.winner = 0
+
+    def to_move(self):
+        """Player whose turn it is"""
+        return 1 + self.position.moves_played % 2
+
+    def make_move(self, move):
+        """Drop a piece into column `move` for the player to move; False if it is not legal"""
+        if self.winner or not self.position.can_play(move):
+            return False
+        player = self.to_move()
+        self.position.make_move(move, player)
+        if self.position.is_win(player):
+            self.winner = player
+        return True
+
+    def check_winner(self):
+        """Player who connected N, or 0"""
+        return self.winner
+
+    def is_board_full(self):
+        """Check if every column is full"""
+        return self.position.is_full()
+
+
+RULES = {"tictactoe": TicTacToeRules, "connectfour": ConnectFourRules}
+
+
+def parse_variant(message):
+    """(game, board parameters...) for a join message; ValueError if it is not playable"""
+    game = message.get("game")
+    if game not in GAMES:
+        raise ValueError(f"unknown game {game!r}, expected one of {', '.join(GAMES)}")
+
+    params = []
+    for name, default in GAMES[game].items():
+        value = message.get(name, default)
+        if type(value) is not int or not 2 <= value <= MAX_BOARD_SIDE:
+            raise ValueError(f"{name} must be a whole number from 2 to {MAX_BOARD_SIDE}")
+        params.append(value)
+    rows, cols, length = params
+    if length > max(rows, cols):
+        raise ValueError(f"cannot get {length} in a row on a {rows}x{cols} board")
+    return (game, rows, cols, length)
+
+
+class Match:
+    def __init__(self, variant, first, second):
+        game, rows, cols, length = variant
+        self.variant = variant
+        self.rules = RULES[game](rows, cols, length)
+        self.players = [None, first, second]  # Indexed by player number
+
+    def start(self):
+        """Tell both players the match is on and who they are"""
+        game, rows, cols, length = self.variant
+        names = list(GAMES[game])
+        for player in (1, 2):
+            client = self.players[player]
+            client.match = self
+            client.player = player
+            client.send({"type": "start", "player": player, "game": game,
+                         names[0]: rows, names[1]: cols, names[2]: length})
+
+    def broadcast(self, message):
+        """Send a message to both players"""
+        self.players[1].send(message)
+        self.players[2].send(message)
+
+    def finish(self, winner, reason):
+        """Announce the result and free both players to join again"""
+        self.broadcast({"type": "over", "winner": winner, "reason": reason})
+        for client in self.players[1:]:
+            client.match = None
+            client.player = 0
+
+
+class ClientProtocol(asyncio.Protocol):
+    """One connected player"""
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.buffer = b""
+        self.match = None
+        self.player = 0
+        self.queue = None  # Variant this client is waiting for an opponent in
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.server.connections += 1
+
+    def connection_lost(self, exc):
+        self.server.connections -= 1
+        self.server.leave(self)
+
+    def data_received(self, data):
+        self.buffer += data
+        while not self.transport.is_closing():
+            end = self.buffer.find(b"\n")
+            if end < 0:
+                break
+            line = self.buffer[:end]
+            self.buffer = self.buffer[end + 1:]
+            if line.strip():
+                self.server.handle_line(self, line)
+
+        if len(self.buffer) > MAX_LINE:
+            self.send({"type": "error", "message": "message too long"})
+            self.transport.close()
+
+    def send(self, message):
+        """Queue a message for this client, dropping clients that stopped reading"""
+        if self.transport.is_closing():
+            return
+        self.transport.write(encode(message))
+        if self.transport.get_write_buffer_size() > MAX_BUFFERED:
+            self.transport.abort()
+
+    def error(self, text):
+        """Refuse a request without dropping the connection"""
+        self.send({"type": "error", "message": text})
+
+
+class MatchServer:
+    def __init__(self):
+        self.waiting = {}  # variant -> client waiting for an opponent
+        self.connections = 0
+        self.matches_started = 0
+
+    def handle_line(self, client, line):
+        """Dispatch one message from a client"""
+        if len(line) > MAX_LINE:
+            client.error("message too long")
+            return
+        try:
+            message = decode(line)
+        except ValueError as exc:
+            client.error(str(exc))
+            return
+
+        kind = message["type"]
+        if kind == "join":
+            self.join(client, message)
+        elif kind == "move":
+            self.move(client, message)
+        elif kind == "leave":
+            self.leave(client)
+        else:
+            client.error(f"unknown message type {kind!r}")
+
+    def join(self, client, message):
+        """Pair the client with a waiting opponent, or queue it"""
+        if client.match is not None:
+            client.error("already playing a match")
+            return
+        try:
+            variant = parse_variant(message)
+        except ValueError as exc:
+            client.error(str(exc))
+            return
+
+        self.leave(client)  # Joining again switches queues
+        opponent = self.waiting.pop(variant, None)
+        if opponent is None:
+            self.waiting[variant] = client
+            client.queue = variant
+            client.send({"type": "waiting"})
+            return
+
+        opponent.queue = None
+        self.matches_started += 1
+        Match(variant, opponent, client).start()
+
+    def move(self, client, message):
+        """Play a move for the client if it is legal and their turn"""
+        match = client.match
+        move = message.get("move")
+        if match is None:
+            client.error("not in a match")
+        elif match.rules.to_move() != client.player:
+            client.error("not your turn")
+        elif type(move) is not int or not match.rules.make_move(move):
+            client.error("illegal move")
+        else:
+            match.broadcast({"type": "move", "player": client.player, "move": move})
+            winner = match.rules.check_winner()
+            if winner:
+                match.finish(winner, "line")
+            elif match.rules.is_board_full():
+                match.finish(0, "full")
+
+    def leave(self, client):
+        """Take the client out of its queue, or forfeit its match"""
+        if client.queue is not None:
+            if self.waiting.get(client.queue) is client:
+                del self.waiting[client.queue]
+            client.queue = None
+
+        match = client.match
+        if match is not None:
+            opponent = match.players[3 - client.player]
+            match.finish(opponent.player, "opponent_left")
+
+    async def serve(self, host, port):
+        """Accept players until the process is stopped"""
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(lambda: ClientProtocol(self), host, port, backlog=4096)
+        print(f"Match server listening on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def raise_file_limit():
+    """Let the process open as many sockets as the hard limit allows"""
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or hard > soft:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        except (ValueError, OSError):
+            pass
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Online match server for Tic Tac Toe and Connect Four")
+    parser.add_argument('--host', default="0.0.0.0")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    raise_file_limit()
+    try:
+        asyncio.run(MatchServer().serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
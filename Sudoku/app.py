@@ -1,10 +1,10 @@
 import tkinter as tk
 from tkinter import messagebox, filedialog
-import cv2
-import numpy as np
-from PIL import Image, ImageTk
-import pytesseract
-import os
+import queue
+import threading
+from solver import solve
+import digits
+import ocr
 
 class SudokuGUI:
     def __init__(self, master):
@@ -13,6 +13,8 @@ class SudokuGUI:
         master.geometry("470x570") 
 
         self.cells = {}
+        self.import_results = queue.Queue()  # Boards read by the image import thread
+        self.digit_model = digits.load_model()  # Built-in recognizer; None falls back to tesseract alone
         self.create_grid()
         self.create_buttons()
 
@@ -74,7 +76,7 @@ class SudokuGUI:
         button_frame = tk.Frame(self.master)
         button_frame.pack(pady=10)
 
-        upload_button = tk.Button(
+        self.upload_button = tk.Button(
             button_frame,
             text="Upload Image",
             font=('Arial', 14),
@@ -82,7 +84,7 @@ class SudokuGUI:
             bg='lightblue',
             fg='darkblue'
         )
-        upload_button.pack(side=tk.LEFT, padx=10)
+        self.upload_button.pack(side=tk.LEFT, padx=10)
 
         solve_button = tk.Button(
             button_frame,
@@ -198,53 +200,18 @@ class SudokuGUI:
                             seen.add(num)
         return True
 
-    # --- Sudoku Solving Algorithm (Backtracking) ---
-    def find_empty_location(self, board):
-        for r in range(9):
-            for c in range(9):
-                if board[r][c] == 0:
-                    return (r, c)
-        return None
-
-    def is_safe(self, board, row, col, num):
-        # Check row
-        for c in range(9):
-            if board[row][c] == num:
-                return False
-        # Check column
-        for r in range(9):
-            if board[r][col] == num:
-                return False
-        # Check 3x3 box
-        start_row, start_col = 3 * (row // 3), 3 * (col // 3)
-        for r in range(3):
-            for c in range(3):
-                if board[start_row + r][start_col + c] == num:
-                    return False
-        return True
-
+    # --- Sudoku Solving Algorithm (constraint propagation, see solver.py) ---
     def solve_sudoku_algorithm(self, board):
-        empty_loc = self.find_empty_location(board)
-        if not empty_loc:
-            return True
-
-        row, col = empty_loc
-
-        for num in range(1, 10):
-            if self.is_safe(board, row, col, num):
-                board[row][col] = num
-                if self.solve_sudoku_algorithm(board):
-                    return True
-                board[row][col] = 0 # Backtrack
-        return False
+        solution = solve(board)
+        if solution is None:
+            return False
+        board[:] = solution
+        return True
 
     def upload_image(self):
         """Upload and process an image of a sudoku puzzle"""
-        # Check if tesseract is available
-        try:
-            import subprocess
-            subprocess.run(['tesseract', '--version'], capture_output=True, check=True)
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        # The built-in recognizer needs no tesseract; without it tesseract is required
+        if self.digit_model is None and not ocr.tesseract_available():
             messagebox.showerror(
                 "Tesseract Not Found",
                 "Tesseract OCR is not installed on your system.\n\n"
@@ -264,85 +231,40 @@ class SudokuGUI:
         )
         
         if file_path:
-            try:
-                board = self.extract_sudoku_from_image(file_path)
-                if board:
-                    self.set_board_from_image(board)
-                    messagebox.showinfo("Success", "Sudoku board loaded from image!")
-                else:
-                    messagebox.showerror("Error", "Could not extract sudoku board from image. Please try a clearer image.")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to process image: {str(e)}")
+            # Read the image on a worker thread so the window keeps responding
+            self.upload_button.config(state=tk.DISABLED, text="Reading...")
+            worker = threading.Thread(target=self.run_image_import, args=(file_path,), daemon=True)
+            worker.start()
+            self.master.after(100, self.check_image_import)
+
+    def run_image_import(self, file_path):
+        """Worker thread: read the board and queue the result for the Tk thread"""
+        try:
+            self.import_results.put((self.extract_sudoku_from_image(file_path), None))
+        except Exception as e:
+            self.import_results.put((None, e))
+
+    def check_image_import(self):
+        """Show the result of the image import once the worker is done"""
+        try:
+            board, error = self.import_results.get_nowait()
+        except queue.Empty:
+            self.master.after(100, self.check_image_import)
+            return
+
+        self.upload_button.config(state=tk.NORMAL, text="Upload Image")
+        if error is not None:
+            messagebox.showerror("Error", f"Failed to process image: {str(error)}")
+        elif board:
+            self.set_board_from_image(board)
+            messagebox.showinfo("Success", "Sudoku board loaded from image!")
+        else:
+            messagebox.showerror("Error", "Could not extract sudoku board from image. Please try a clearer image.")
 
     def extract_sudoku_from_image(self, image_path):
-        """Extract sudoku numbers from an image using OCR"""
+        """Extract sudoku numbers from an image using OCR (see ocr.py)"""
         try:
-            # Read and preprocess the image
-            image = cv2.imread(image_path)
-            if image is None:
-                return None
-                
-            # Convert to grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
-            # Apply threshold to get binary image
-            _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-            
-            # Find contours to locate the sudoku grid
-            contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            # Find the largest rectangular contour (should be the sudoku grid)
-            largest_contour = max(contours, key=cv2.contourArea)
-            
-            # Get bounding rectangle
-            x, y, w, h = cv2.boundingRect(largest_contour)
-            
-            # Extract the sudoku grid region
-            sudoku_region = gray[y:y+h, x:x+w]
-            
-            # Resize to a standard size for better OCR
-            sudoku_region = cv2.resize(sudoku_region, (450, 450))
-            
-            # Apply additional preprocessing
-            sudoku_region = cv2.GaussianBlur(sudoku_region, (5, 5), 0)
-            _, sudoku_region = cv2.threshold(sudoku_region, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-            
-            # Initialize the board
-            board = [[0 for _ in range(9)] for _ in range(9)]
-            
-            # Divide the image into 9x9 cells
-            cell_height = sudoku_region.shape[0] // 9
-            cell_width = sudoku_region.shape[1] // 9
-            
-            for row in range(9):
-                for col in range(9):
-                    # Extract cell
-                    y1 = row * cell_height
-                    y2 = (row + 1) * cell_height
-                    x1 = col * cell_width
-                    x2 = (col + 1) * cell_width
-                    
-                    cell = sudoku_region[y1:y2, x1:x2]
-                    
-                    # Add padding to improve OCR
-                    cell = cv2.copyMakeBorder(cell, 10, 10, 10, 10, cv2.BORDER_CONSTANT, value=0)
-                    
-                    # Use OCR to extract number
-                    try:
-                        # Configure tesseract for single digit recognition
-                        custom_config = r'--oem 3 --psm 10 -c tessedit_char_whitelist=123456789'
-                        text = pytesseract.image_to_string(cell, config=custom_config).strip()
-                        
-                        # Validate and store the number
-                        if text.isdigit() and 1 <= int(text) <= 9:
-                            board[row][col] = int(text)
-                        else:
-                            board[row][col] = 0
-                    except:
-                        board[row][col] = 0
-            
-            return board
-            
+            return ocr.extract_board(image_path, self.digit_model)
         except Exception as e:
             print(f"Error processing image: {e}")
             return None
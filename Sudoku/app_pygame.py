@@ -1,15 +1,20 @@
+import argparse
 import pygame
 import sys
-import random
+from solver import solve
+import generator
+from puzzle_pool import DEFAULT_DEPTH, PuzzlePool
+from conflicts import ConflictTracker
 
 # Initialize Pygame
 pygame.init()
 
 class SudokuGame:
-    def __init__(self):
+    def __init__(self, pool_depth=DEFAULT_DEPTH):
         # Game constants
         self.CELL_SIZE = 50
         self.GRID_SIZE = 9
+        self.BOX_SIZE = 3
         self.BOARD_WIDTH = self.GRID_SIZE * self.CELL_SIZE
         self.BOARD_HEIGHT = self.GRID_SIZE * self.CELL_SIZE
         self.WINDOW_WIDTH = self.BOARD_WIDTH + 40
@@ -42,8 +47,14 @@ class SudokuGame:
         self.font_medium = pygame.font.Font(None, 32)
         self.font_small = pygame.font.Font(None, 24)
         
+        # Ready-made puzzles, topped up in the background
+        self.pool = PuzzlePool(depth=pool_depth)
+        self.pool.load()
+        
         # Game state
+        self.difficulty = "Medium"
         self.reset_game()
+        self.pool.start()
         self.running = True
         self.selected_cell = None
         self.show_errors = True
@@ -86,78 +97,49 @@ class SudokuGame:
             'action': 'hint'
         }
         
+        buttons['difficulty'] = {
+            'rect': pygame.Rect(20, 60 + self.BOARD_HEIGHT + 10, 150, 30),
+            'text': f'Level: {self.difficulty}',
+            'action': 'difficulty'
+        }
+        
         return buttons
         
     def reset_game(self):
         """Reset game to initial state"""
-        self.board = [[0 for _ in range(9)] for _ in range(9)]
-        self.original_board = [[0 for _ in range(9)] for _ in range(9)]
-        self.errors = set()
+        self.board = [[0 for _ in range(self.GRID_SIZE)] for _ in range(self.GRID_SIZE)]
+        self.original_board = [[0 for _ in range(self.GRID_SIZE)] for _ in range(self.GRID_SIZE)]
+        self.conflicts = ConflictTracker(self.GRID_SIZE)
+        self.errors = self.conflicts.errors  # Kept up to date as numbers are placed
         self.completed = False
-        self.generate_puzzle()
+        self.generate_puzzle(self.difficulty)
         
     def generate_puzzle(self, difficulty="Medium"):
-        """Generate a new Sudoku puzzle"""
-        # Start with a valid complete board
-        self.board = [[0 for _ in range(9)] for _ in range(9)]
-        self.fill_board()
-        
-        # Remove numbers to create puzzle
-        if difficulty == "Easy":
-            cells_to_remove = 40
-        elif difficulty == "Medium":
-            cells_to_remove = 50
-        else:  # Hard
-            cells_to_remove = 60
-            
-        # Copy the complete board
-        complete_board = [row[:] for row in self.board]
-        
-        # Remove cells
-        positions = [(r, c) for r in range(9) for c in range(9)]
-        random.shuffle(positions)
+        """Take the next puzzle with exactly one solution from the pool"""
+        puzzle, self.solution, self.rating = self.pool.take(difficulty)
+        self.board = [row[:] for row in puzzle]
         
-        for i in range(min(cells_to_remove, len(positions))):
-            r, c = positions[i]
-            self.board[r][c] = 0
-            
         # Store original state
         self.original_board = [row[:] for row in self.board]
-        
-    def fill_board(self):
-        """Fill board with a valid solution using backtracking"""
-        numbers = list(range(1, 10))
-        
-        for row in range(9):
-            for col in range(9):
-                if self.board[row][col] == 0:
-                    random.shuffle(numbers)
-                    for num in numbers:
-                        if self.is_valid_move(row, col, num):
-                            self.board[row][col] = num
-                            if self.fill_board():
-                                return True
-                            self.board[row][col] = 0
-                    return False
-        return True
+        self.conflicts.load(self.board)
         
     def is_valid_move(self, row, col, num):
         """Check if placing num at (row, col) is valid"""
         # Check row
-        for c in range(9):
+        for c in range(self.GRID_SIZE):
             if self.board[row][c] == num:
                 return False
                 
         # Check column
-        for r in range(9):
+        for r in range(self.GRID_SIZE):
             if self.board[r][col] == num:
                 return False
                 
-        # Check 3x3 box
-        box_row = (row // 3) * 3
-        box_col = (col // 3) * 3
-        for r in range(box_row, box_row + 3):
-            for c in range(box_col, box_col + 3):
+        # Check box
+        box_row = (row // self.BOX_SIZE) * self.BOX_SIZE
+        box_col = (col // self.BOX_SIZE) * self.BOX_SIZE
+        for r in range(box_row, box_row + self.BOX_SIZE):
+            for c in range(box_col, box_col + self.BOX_SIZE):
                 if self.board[r][c] == num:
                     return False
                     
@@ -192,6 +174,8 @@ class SudokuGame:
                     self.new_puzzle()
                 elif event.key == pygame.K_h:
                     self.show_hint()
+                elif event.key == pygame.K_d:
+                    self.cycle_difficulty()
                     
     def handle_click(self, pos):
         """Handle mouse clicks"""
@@ -207,7 +191,7 @@ class SudokuGame:
             if pos[0] >= 20 and pos[0] < 20 + self.BOARD_WIDTH:
                 col = (pos[0] - 20) // self.CELL_SIZE
                 row = (pos[1] - board_start_y) // self.CELL_SIZE
-                if 0 <= row < 9 and 0 <= col < 9:
+                if 0 <= row < self.GRID_SIZE and 0 <= col < self.GRID_SIZE:
                     self.selected_cell = (row, col)
                     
     def handle_button_click(self, action):
@@ -222,7 +206,16 @@ class SudokuGame:
             self.validate_board()
         elif action == 'hint':
             self.show_hint()
+        elif action == 'difficulty':
+            self.cycle_difficulty()
             
+    def cycle_difficulty(self):
+        """Switch to the next difficulty; it applies from the next puzzle"""
+        index = generator.DIFFICULTIES.index(self.difficulty)
+        self.difficulty = generator.DIFFICULTIES[(index + 1) % len(generator.DIFFICULTIES)]
+        self.buttons['difficulty']['text'] = f'Level: {self.difficulty}'
+        self.pool.prefer(self.difficulty)
+        
     def new_puzzle(self):
         """Generate a new puzzle"""
         self.reset_game()
@@ -230,45 +223,25 @@ class SudokuGame:
         
     def solve_puzzle(self):
         """Solve the current puzzle"""
-        if self.solve_backtrack():
+        solution = solve(self.board)
+        if solution is not None:
+            self.board = solution
+            self.conflicts.load(self.board)
             self.completed = True
         
-    def solve_backtrack(self):
-        """Solve using backtracking algorithm"""
-        for row in range(9):
-            for col in range(9):
-                if self.board[row][col] == 0:
-                    for num in range(1, 10):
-                        if self.is_valid_move(row, col, num):
-                            self.board[row][col] = num
-                            if self.solve_backtrack():
-                                return True
-                            self.board[row][col] = 0
-                    return False
-        return True
-        
     def clear_user_entries(self):
         """Clear all user entries, keep original numbers"""
-        for row in range(9):
-            for col in range(9):
+        for row in range(self.GRID_SIZE):
+            for col in range(self.GRID_SIZE):
                 if self.original_board[row][col] == 0:
                     self.board[row][col] = 0
-        self.errors.clear()
+                    self.conflicts.set(row, col, 0)
         self.completed = False
         
     def validate_board(self):
-        """Check for errors in current board state"""
-        self.errors.clear()
+        """Recheck the whole board for errors"""
+        self.conflicts.load(self.board)
         
-        for row in range(9):
-            for col in range(9):
-                if self.board[row][col] != 0:
-                    num = self.board[row][col]
-                    self.board[row][col] = 0  # Temporarily remove
-                    if not self.is_valid_move(row, col, num):
-                        self.errors.add((row, col))
-                    self.board[row][col] = num  # Put back
-                    
     def show_hint(self):
         """Show a hint for the selected cell"""
         if not self.selected_cell:
@@ -278,7 +251,7 @@ class SudokuGame:
         if self.original_board[row][col] != 0:  # Can't hint for given numbers
             return
             
-        for num in range(1, 10):
+        for num in range(1, self.GRID_SIZE + 1):
             if self.is_valid_move(row, col, num):
                 self.place_number(row, col, num)
                 break
@@ -289,7 +262,7 @@ class SudokuGame:
             return
             
         self.board[row][col] = num
-        self.validate_board()
+        self.conflicts.set(row, col, num)
         
         # Check if puzzle is complete
         if self.is_complete():
@@ -297,11 +270,7 @@ class SudokuGame:
             
     def is_complete(self):
         """Check if puzzle is complete and valid"""
-        for row in range(9):
-            for col in range(9):
-                if self.board[row][col] == 0:
-                    return False
-        return len(self.errors) == 0
+        return self.conflicts.is_complete()
         
     def draw_board(self):
         """Draw the Sudoku board"""
@@ -309,8 +278,8 @@ class SudokuGame:
         board_start_y = 60
         
         # Draw cells
-        for row in range(9):
-            for col in range(9):
+        for row in range(self.GRID_SIZE):
+            for col in range(self.GRID_SIZE):
                 x = board_start_x + col * self.CELL_SIZE
                 y = board_start_y + row * self.CELL_SIZE
                 
@@ -342,11 +311,11 @@ class SudokuGame:
                     self.screen.blit(text, text_rect)
                     
         # Draw grid lines
-        for i in range(10):
+        for i in range(self.GRID_SIZE + 1):
             # Vertical lines
             x = board_start_x + i * self.CELL_SIZE
-            thickness = 3 if i % 3 == 0 else 1
-            color = self.colors['grid_thick'] if i % 3 == 0 else self.colors['grid_thin']
+            thickness = 3 if i % self.BOX_SIZE == 0 else 1
+            color = self.colors['grid_thick'] if i % self.BOX_SIZE == 0 else self.colors['grid_thin']
             pygame.draw.line(self.screen, color, 
                            (x, board_start_y), (x, board_start_y + self.BOARD_HEIGHT), thickness)
             
@@ -373,6 +342,12 @@ class SudokuGame:
             text_rect = text_surface.get_rect(center=button['rect'].center)
             self.screen.blit(text_surface, text_rect)
             
+        # Rating of the current puzzle, by the techniques it needs
+        level_button = self.buttons['difficulty']['rect']
+        rating_surface = self.font_small.render(f"This puzzle: {self.rating}", True, (100, 100, 100))
+        rating_rect = rating_surface.get_rect(midleft=(level_button.right + 15, level_button.centery))
+        self.screen.blit(rating_surface, rating_rect)
+        
         # Game status
         status_y = self.WINDOW_HEIGHT - 60
         
@@ -409,9 +384,17 @@ class SudokuGame:
             pygame.display.flip()
             self.clock.tick(60)  # 60 FPS
             
+        self.pool.close()
         pygame.quit()
         sys.exit()
 
 if __name__ == '__main__':
-    game = SudokuGame()
+    parser = argparse.ArgumentParser(description="Sudoku - Pygame Edition")
+    parser.add_argument('--pool-depth', type=int, default=DEFAULT_DEPTH,
+                        help="ready puzzles to keep per difficulty, 0 to generate each one on demand")
+    args = parser.parse_args()
+    if args.pool_depth < 0:
+        parser.error("--pool-depth cannot be negative")
+        
+    game = SudokuGame(args.pool_depth)
     game.run()
\ No newline at end of file
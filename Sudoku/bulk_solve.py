@@ -0,0 +1,192 @@
+"""Solve files of one-line Sudoku puzzles across a process pool
+
+Puzzles are read one per line in the usual 81-character format (digits row
+by row, 0 or . for an empty cell; 16-character 4x4 puzzles work too).
+Blank lines and lines starting with # are skipped, and anything after the
+first whitespace on a line is ignored.  Every puzzle gets one output line,
+in input order: its solution, or the reason it failed:
+
+    malformed    not a puzzle in the one-line format
+    invalid      a digit repeats in a row, column or box (the check the
+                 Tk window makes before solving)
+    unsolvable   the givens are consistent but no solution exists
+
+Lines are sent to the workers in chunks, and only a fixed number of chunks
+is in flight at a time, so memory stays flat however long the file is.
+Timings go into a fixed-size histogram for the same reason.  The summary
+(puzzles/sec, solve time percentiles, failures) goes to stderr.
+
+    python Sudoku/bulk_solve.py puzzles.txt -o solutions.txt
+    cat puzzles.txt | python Sudoku/bulk_solve.py --workers 4 > solutions.txt
+"""
+
+import argparse
+import collections
+import itertools
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+from solver import format_grid, parse_puzzle, solve, tables
+
+FAILURES = ("malformed", "invalid", "unsolvable")
+CHUNK_SIZE = 256
+CHUNKS_PER_WORKER = 4  # Chunks in flight per worker: enough to keep them busy, few enough to bound memory
+MAX_REPORTED = 10  # Failures listed by line number in the summary
+
+
+def has_repeats(grid):
+    """Check if a digit appears twice in some row, column or box"""
+    size = len(grid)
+    units, _, _ = tables(size)
+    cells = [value for row in grid for value in row]
+    for unit in units:
+        seen = 0
+        for cell in unit:
+            if cells[cell]:
+                bit = 1 << cells[cell]
+                if seen & bit:
+                    return True
+                seen |= bit
+    return False
+
+
+def solve_line(text):
+    """(output line, status) for one puzzle; status is "solved" or one of FAILURES"""
+    try:
+        grid = parse_puzzle(text)
+    except ValueError:
+        return "malformed", "malformed"
+    if has_repeats(grid):
+        return "invalid", "invalid"
+    solution = solve(grid)
+    if solution is None:
+        return "unsolvable", "unsolvable"
+    return format_grid(solution), "solved"
+
+
+def solve_chunk(chunk):
+    """Worker: solve a list of (line number, text) pairs, timing each puzzle"""
+    results = []
+    for number, text in chunk:
+        start = time.perf_counter()
+        line, status = solve_line(text)
+        results.append((number, line, status, time.perf_counter() - start))
+    return results
+
+
+def read_puzzles(stream):
+    """Yield (line number, puzzle text) for every puzzle line, lazily"""
+    for number, line in enumerate(stream, 1):
+        text = line.strip()
+        if text and not text.startswith("#"):
+            yield number, text.split()[0]
+
+
+def chunked(items, size):
+    """Yield lists of up to `size` items, lazily"""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class LatencyHistogram:
+    """Solve times in log-spaced buckets, 2% wide, for percentiles in constant memory"""
+
+    STEP = math.log(1.02)
+    FLOOR = 1e-7  # Seconds; anything faster shares the first bucket
+
+    def __init__(self):
+        self.buckets = collections.Counter()
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+
+    def add(self, seconds):
+        self.buckets[int(math.log(max(seconds, self.FLOOR) / self.FLOOR) / self.STEP)] += 1
+        self.count += 1
+        self.total += seconds
+        self.slowest = max(self.slowest, seconds)
+
+    def percentile(self, fraction):
+        """Upper edge of the bucket holding the given fraction of samples, in seconds"""
+        if not self.count:
+            return 0.0
+        wanted = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= wanted:
+                return min(self.FLOOR * math.exp((bucket + 1) * self.STEP), self.slowest)
+        return self.slowest
+
+
+def run(stream, out, workers, chunk_size, report=sys.stderr):
+    """Solve every puzzle in `stream`, writing one line per puzzle to `out`; returns the status counts"""
+    counts = collections.Counter()
+    latency = LatencyHistogram()
+    failed = []
+    started = time.perf_counter()
+
+    def collect(results):
+        out.write("".join(line + "\n" for _, line, _, _ in results))
+        for number, _, status, seconds in results:
+            counts[status] += 1
+            if status == "solved":
+                latency.add(seconds)
+            elif len(failed) < MAX_REPORTED:
+                failed.append((number, status))
+
+    chunks = chunked(read_puzzles(stream), chunk_size)
+    if workers == 1:
+        for chunk in chunks:
+            collect(solve_chunk(chunk))
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            # A bounded window of pending chunks, collected in submission order
+            pending = collections.deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(solve_chunk, (chunk,)))
+                if len(pending) >= workers * CHUNKS_PER_WORKER:
+                    collect(pending.popleft().get())
+            while pending:
+                collect(pending.popleft().get())
+    out.flush()
+
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(f"{total} puzzles in {elapsed:.2f}s ({total / max(elapsed, 1e-9):,.0f} puzzles/sec, {workers} workers)",
+          file=report)
+    if latency.count:
+        print("solve time  mean {:.3f} ms  p50 {:.3f}  p90 {:.3f}  p99 {:.3f}  max {:.3f}".format(
+            latency.total / latency.count * 1000, *(latency.percentile(p) * 1000 for p in (0.5, 0.9, 0.99)),
+            latency.slowest * 1000), file=report)
+    print(f"solved {counts['solved']}, " + ", ".join(f"{kind} {counts[kind]}" for kind in FAILURES), file=report)
+    for number, status in failed:
+        print(f"  line {number}: {status}", file=report)
+    if len(failed) < total - counts['solved']:
+        print(f"  ... and {total - counts['solved'] - len(failed)} more", file=report)
+    return counts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Solve one-line Sudoku puzzles in bulk")
+    parser.add_argument('file', nargs='?', help="puzzles, one per line (default: stdin)")
+    parser.add_argument('-o', '--output', help="where to write the solutions (default: stdout)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="solver processes")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="puzzles sent to a worker at a time")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+
+    stream = open(args.file) if args.file else sys.stdin
+    out = open(args.output, 'w') if args.output else sys.stdout
+    with stream, out:
+        run(stream, out, args.workers, args.chunk_size)
@@ -0,0 +1,76 @@
+"""Incremental conflict tracking for a Sudoku board being filled in
+
+For every row, column and box the tracker remembers which cells hold each
+digit.  A cell is in conflict when its digit appears in another cell of one
+of its three units, which is exactly what checking every cell with
+is_valid_move finds.  Changing one cell only touches the cells that share a
+unit and a digit with it, so an edit costs a handful of set operations on
+any board size instead of a rescan of the whole grid.
+"""
+
+import math
+
+
+class ConflictTracker:
+    def __init__(self, size=9):
+        self.size = size
+        self.box = math.isqrt(size)
+        self.values = {}  # (row, col) -> digit, filled cells only
+        # holders[unit][digit] is the set of cells in that unit holding the digit;
+        # units are the rows, then the columns, then the boxes
+        self.holders = [[set() for _ in range(size + 1)] for _ in range(3 * size)]
+        self.errors = set()
+
+    def units(self, row, col):
+        """Indices of the row, column and box of a cell"""
+        size, box = self.size, self.box
+        return (row, size + col, 2 * size + (row // box) * box + col // box)
+
+    def load(self, board):
+        """Start over from a whole board"""
+        self.values.clear()
+        for unit in self.holders:
+            for cells in unit:
+                cells.clear()
+        self.errors.clear()
+        for row, values in enumerate(board):
+            for col, num in enumerate(values):
+                if num:
+                    self.set(row, col, num)
+
+    def set(self, row, col, num):
+        """Put `num` (0 to erase) in a cell and update the conflicts it touches"""
+        cell = (row, col)
+        old = self.values.get(cell, 0)
+        if old == num:
+            return
+
+        units = self.units(row, col)
+        touched = [cell]
+        if old:
+            del self.values[cell]
+            for unit in units:
+                holders = self.holders[unit][old]
+                holders.discard(cell)
+                touched.extend(holders)
+        if num:
+            self.values[cell] = num
+            for unit in units:
+                holders = self.holders[unit][num]
+                touched.extend(holders)
+                holders.add(cell)
+
+        for other in touched:
+            self.refresh(other)
+
+    def refresh(self, cell):
+        """Recheck whether one cell's digit is repeated in any of its units"""
+        num = self.values.get(cell, 0)
+        if num and any(len(self.holders[unit][num]) > 1 for unit in self.units(*cell)):
+            self.errors.add(cell)
+        else:
+            self.errors.discard(cell)
+
+    def is_complete(self):
+        """Check if every cell is filled with no conflicts"""
+        return len(self.values) == self.size * self.size and not self.errors
@@ -0,0 +1,187 @@
+"""Built-in printed digit recognizer for Sudoku image import
+
+A small k-nearest-neighbour classifier that needs nothing but NumPy.  Every
+cell is normalized the way MNIST digits are: grid line remnants and stray
+specks are dropped, the ink is cropped to its bounding box, scaled to fit
+20x20 with its aspect ratio kept, centred in a 28x28 crop and softened a
+little.  Each crop becomes a unit vector, so one matrix product against the stored
+samples gives the cosine similarity of every cell to every sample, and all
+81 cells are classified in a single pass.
+
+The model is a compressed .npz of rendered samples of 1-9 in a few fonts,
+sizes, stroke weights and slants.  Rebuild it (pygame renders the digits)
+with:
+
+    python Sudoku/digits.py --build --font Lato-Regular.ttf --font SourceCodePro-Bold.ttf
+
+Each prediction comes with a confidence; ocr.py sends only the cells below
+MIN_CONFIDENCE to tesseract, when tesseract is installed.
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+CROP = 28
+DIGIT_BOX = 20  # The digit is scaled to fit this square inside the crop
+EDGE_TRIM = 0.08  # Fraction of each cell edge dropped before looking for the digit
+LINE_INK = 0.7  # Rows or columns with more ink than this are grid lines, not digit strokes
+SPECK_NEIGHBOURS = 3  # Ink pixels with fewer inked neighbours than this are noise
+K = 5
+MIN_CONFIDENCE = 0.75
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'digit_model.npz')
+
+
+def resize(image, height, width, samples=4):
+    """Area-averaged resize of a 2D float array, by supersampling"""
+    h, w = image.shape
+    offsets = (np.arange(samples) + 0.5) / samples
+    rows = np.minimum(((np.arange(height)[:, None] + offsets) * h / height).astype(int), h - 1).ravel()
+    cols = np.minimum(((np.arange(width)[:, None] + offsets) * w / width).astype(int), w - 1).ravel()
+    return image[np.ix_(rows, cols)].reshape(height, samples, width, samples).mean(axis=(1, 3))
+
+
+def normalize(cell):
+    """28x28 float crop of the digit in a cell (ink bright on dark), or None if there is no ink"""
+    ink = np.asarray(cell) > 127
+    h, w = ink.shape
+    dy, dx = int(h * EDGE_TRIM), int(w * EDGE_TRIM)
+    ink = ink[dy:h - dy, dx:w - dx].copy()
+    ink[ink.mean(axis=1) > LINE_INK, :] = False
+    ink[:, ink.mean(axis=0) > LINE_INK] = False
+
+    # Drop specks: strokes have inked neighbours, stray pixels do not
+    padded = np.pad(ink, 1).astype(np.int8)
+    neighbours = sum(padded[y:y + ink.shape[0], x:x + ink.shape[1]] for y in range(3) for x in range(3)) - ink
+    ink &= neighbours >= SPECK_NEIGHBOURS
+
+    rows = np.flatnonzero(ink.any(axis=1))
+    cols = np.flatnonzero(ink.any(axis=0))
+    if not len(rows):
+        return None
+    digit = ink[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1].astype(np.float32)
+
+    scale = DIGIT_BOX / max(digit.shape)
+    height = max(1, round(digit.shape[0] * scale))
+    width = max(1, round(digit.shape[1] * scale))
+    crop = np.zeros((CROP, CROP), dtype=np.float32)
+    top, left = (CROP - height) // 2, (CROP - width) // 2
+    crop[top:top + height, left:left + width] = resize(digit, height, width)
+    return crop
+
+
+def vectorize(cells):
+    """Unit-length rows for a list of cells; blank cells give zero rows"""
+    crops = np.zeros((len(cells), CROP, CROP), dtype=np.float32)
+    for index, cell in enumerate(cells):
+        crop = normalize(cell)
+        if crop is not None:
+            crops[index] = crop
+
+    # A 3x3 box blur, on all crops at once, makes small shifts and stroke differences matter less
+    padded = np.pad(crops, ((0, 0), (1, 1), (1, 1)))
+    crops = sum(padded[:, y:y + CROP, x:x + CROP] for y in range(3) for x in range(3))
+    vectors = crops.reshape(len(cells), CROP * CROP)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-6)
+
+
+class DigitModel:
+    def __init__(self, vectors, labels):
+        self.vectors = vectors.astype(np.float32)
+        self.labels = labels.astype(np.int64)
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_PATH):
+        """Model saved by save()"""
+        with np.load(path) as data:
+            # Samples are stored as 8-bit crops to keep the file small
+            crops = data['crops'].reshape(len(data['labels']), -1).astype(np.float32)
+            norms = np.linalg.norm(crops, axis=1, keepdims=True)
+            return cls(crops / np.maximum(norms, 1e-6), data['labels'])
+
+    def save(self, path=DEFAULT_MODEL_PATH):
+        """Write the samples as a compressed .npz"""
+        crops = self.vectors / self.vectors.max(axis=1, keepdims=True)
+        np.savez_compressed(path, crops=np.round(crops * 255).astype(np.uint8).reshape(-1, CROP, CROP),
+                            labels=self.labels.astype(np.uint8))
+
+    def classify(self, cells):
+        """(digits, confidences) for a list of cells, as arrays; blank cells get 0 and confidence 0"""
+        if not len(cells):
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        vectors = vectorize(cells)
+        similarity = vectors @ self.vectors.T
+
+        # Similarity-weighted vote of the K nearest samples
+        nearest = np.argpartition(-similarity, K - 1, axis=1)[:, :K]
+        weights = np.take_along_axis(similarity, nearest, axis=1).clip(min=0)
+        votes = np.zeros((len(cells), 10))
+        np.add.at(votes, (np.arange(len(cells))[:, None], self.labels[nearest]), weights)
+
+        digits = votes.argmax(axis=1)
+        share = votes.max(axis=1) / np.maximum(votes.sum(axis=1), 1e-6)
+        confidence = share * weights.max(axis=1)
+        blank = ~vectors.any(axis=1)
+        digits[blank] = 0
+        confidence[blank] = 0
+        return digits, confidence
+
+
+def load_model(path=DEFAULT_MODEL_PATH):
+    """The shipped model, or None if it is missing or unreadable"""
+    try:
+        return DigitModel.load(path)
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def render_samples(font_paths, cell=50):
+    """(cells, labels): every digit rendered white on black in cells like ocr.py cuts out"""
+    import pygame
+    pygame.font.init()
+
+    cells, labels = [], []
+    for font_path in [None] + list(font_paths):  # None is pygame's bundled FreeSans Bold
+        for size in (32, 44):
+            font = pygame.font.Font(font_path, size)
+            for digit in range(1, 10):
+                for slant in (-6, 0, 6):
+                    for thicken in (0, 1):
+                        glyph = pygame.transform.rotate(font.render(str(digit), True, (255, 255, 255)), slant)
+                        surface = pygame.Surface((cell, cell))
+                        surface.blit(glyph, glyph.get_rect(center=(cell // 2, cell // 2)))
+                        pixels = pygame.surfarray.array3d(surface)[:, :, 0].T.copy()
+                        if thicken:
+                            # Heavier strokes, as blur and thresholding often leave them
+                            pixels[1:, :] = np.maximum(pixels[1:, :], pixels[:-1, :])
+                            pixels[:, 1:] = np.maximum(pixels[:, 1:], pixels[:, :-1])
+                        cells.append(pixels)
+                        labels.append(digit)
+    return cells, np.array(labels)
+
+
+def build_model(font_paths):
+    """DigitModel trained on rendered samples of every font"""
+    cells, labels = render_samples(font_paths)
+    return DigitModel(vectorize(cells), labels)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the built-in Sudoku digit recognizer")
+    parser.add_argument('--build', action='store_true', help="render samples and write the model")
+    parser.add_argument('--font', action='append', default=[], help="extra .ttf/.otf font to learn (repeatable)")
+    parser.add_argument('--output', default=DEFAULT_MODEL_PATH)
+    args = parser.parse_args()
+    if not args.build:
+        parser.error("nothing to do; pass --build to write a model")
+    for font_path in args.font:
+        if not os.path.isfile(font_path):
+            parser.error(f"font not found: {font_path}")
+
+    model = build_model(args.font)
+    model.save(args.output)
+    print(f"{len(model.labels)} samples from {len(args.font) + 1} fonts written to {args.output} "
+          f"({os.path.getsize(args.output) / 1024:.0f} KB)")
@@ -0,0 +1,263 @@
+"""Dancing Links (Knuth's Algorithm X) Sudoku engine for counting solutions
+
+Sudoku is an exact cover problem.  Every (cell, digit) choice is a row
+that covers four constraint columns: the cell is filled, and the digit
+appears in its row, its column and its box.  A solution picks one row per
+cell so that every column is covered exactly once.
+
+The sparse matrix is kept as doubly linked lists in flat integer arrays,
+built once per board size and copied for each puzzle.  Search always
+branches on the column with the fewest remaining rows.  Unlike solver.py,
+which stops at the first solution, this engine enumerates every solution,
+so it can count them or prove that a puzzle is unique.
+
+    python Sudoku/dlx.py puzzles.txt   # Compare against solver.py, one puzzle per line
+"""
+
+import argparse
+import itertools
+import math
+import sys
+import time
+
+from solver import check_grid, format_grid, parse_puzzle
+import solver
+
+# Per-size matrix templates: (left, right, up, down, column, sizes, row ids, first node of every row)
+_MATRIX_CACHE = {}
+
+
+def matrix(size):
+    """Linked exact cover matrix for an empty board of `size` x `size`"""
+    if size not in _MATRIX_CACHE:
+        box = math.isqrt(size)
+        cells = size * size
+        columns = 4 * cells
+
+        # Node 0 is the root; nodes 1..columns are the column headers
+        left = [columns] + list(range(columns))
+        right = list(range(1, columns + 1)) + [0]
+        up = list(range(columns + 1))
+        down = list(range(columns + 1))
+        column = list(range(columns + 1))
+        sizes = [0] * (columns + 1)
+        row_ids = [-1] * (columns + 1)
+        row_starts = []
+
+        for r in range(size):
+            for c in range(size):
+                b = (r // box) * box + c // box
+                for d in range(size):
+                    first = len(left)
+                    row_starts.append(first)
+                    constraints = (1 + r * size + c,
+                                   1 + cells + r * size + d,
+                                   1 + 2 * cells + c * size + d,
+                                   1 + 3 * cells + b * size + d)
+                    for k, col in enumerate(constraints):
+                        node = first + k
+                        column.append(col)
+                        row_ids.append((r * size + c) * size + d)
+                        # Append to the bottom of the column
+                        up.append(up[col])
+                        down.append(col)
+                        down[up[col]] = node
+                        up[col] = node
+                        sizes[col] += 1
+                        # Circular link through the four nodes of the row
+                        left.append(first + (k - 1) % 4)
+                        right.append(first + (k + 1) % 4)
+
+        _MATRIX_CACHE[size] = (left, right, up, down, column, sizes, row_ids, row_starts)
+    return _MATRIX_CACHE[size]
+
+
+class ExactCover:
+    """One puzzle's copy of the matrix, with the givens already chosen"""
+
+    def __init__(self, grid):
+        self.size = check_grid(grid)
+        left, right, up, down, column, sizes, row_ids, row_starts = matrix(self.size)
+        self.left = left[:]
+        self.right = right[:]
+        self.up = up[:]
+        self.down = down[:]
+        self.sizes = sizes[:]
+        self.column = column
+        self.row_ids = row_ids
+        self.givens = []
+        self.consistent = True
+
+        size = self.size
+        for r, row in enumerate(grid):
+            for c, digit in enumerate(row):
+                if not digit:
+                    continue
+                row_id = (r * size + c) * size + digit - 1
+                if not self.choose(row_starts[row_id]):
+                    self.consistent = False  # Two givens clash
+                    return
+                self.givens.append(row_id)
+
+    def cover(self, col):
+        """Take a column and every row that touches it out of the matrix"""
+        left, right, up, down, column, sizes = self.left, self.right, self.up, self.down, self.column, self.sizes
+        left[right[col]] = left[col]
+        right[left[col]] = right[col]
+        i = down[col]
+        while i != col:
+            j = right[i]
+            while j != i:
+                up[down[j]] = up[j]
+                down[up[j]] = down[j]
+                sizes[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, col):
+        """Undo cover(col), relinking in exactly the reverse order"""
+        left, right, up, down, column, sizes = self.left, self.right, self.up, self.down, self.column, self.sizes
+        i = up[col]
+        while i != col:
+            j = left[i]
+            while j != i:
+                sizes[column[j]] += 1
+                up[down[j]] = j
+                down[up[j]] = j
+                j = left[j]
+            i = up[i]
+        left[right[col]] = col
+        right[left[col]] = col
+
+    def choose(self, node):
+        """Cover every column of the row holding `node`; False if one is already covered"""
+        j = node
+        while True:
+            col = self.column[j]
+            if self.right[self.left[col]] != col:
+                return False
+            j = self.right[j]
+            if j == node:
+                break
+        while True:
+            self.cover(self.column[j])
+            j = self.right[j]
+            if j == node:
+                return True
+
+    def search(self, chosen):
+        """Yield `chosen` (row ids of the current partial solution) at every complete cover"""
+        right, down, left, column, sizes = self.right, self.down, self.left, self.column, self.sizes
+        col = right[0]
+        if col == 0:
+            yield chosen
+            return
+
+        # Branch on the column with the fewest rows left
+        best = col
+        best_size = sizes[col]
+        col = right[col]
+        while col and best_size > 1:
+            if sizes[col] < best_size:
+                best, best_size = col, sizes[col]
+            col = right[col]
+        if best_size == 0:
+            return
+
+        self.cover(best)
+        r = down[best]
+        while r != best:
+            chosen.append(self.row_ids[r])
+            j = right[r]
+            while j != r:
+                self.cover(column[j])
+                j = right[j]
+
+            yield from self.search(chosen)
+
+            j = left[r]
+            while j != r:
+                self.uncover(column[j])
+                j = left[j]
+            chosen.pop()
+            r = down[r]
+        self.uncover(best)
+
+    def to_grid(self, chosen):
+        """Board with the givens and the chosen rows filled in"""
+        size = self.size
+        values = [0] * (size * size)
+        for row_id in itertools.chain(self.givens, chosen):
+            values[row_id // size] = row_id % size + 1
+        return [values[r * size:(r + 1) * size] for r in range(size)]
+
+
+def solutions(grid):
+    """Yield every solution of `grid` as a new board, lazily"""
+    problem = ExactCover(grid)
+    if not problem.consistent:
+        return
+    for chosen in problem.search([]):
+        yield problem.to_grid(chosen)
+
+
+def count_solutions(grid, limit=None):
+    """Number of solutions of `grid`, stopping early once `limit` are found"""
+    problem = ExactCover(grid)
+    if not problem.consistent:
+        return 0
+    found = problem.search([])
+    if limit is not None:
+        found = itertools.islice(found, limit)
+    return sum(1 for _ in found)
+
+
+def has_unique_solution(grid):
+    """Check that `grid` has exactly one solution"""
+    return count_solutions(grid, 2) == 1
+
+
+def solve(grid):
+    """First solution of `grid`, or None; same contract as solver.solve"""
+    return next(solutions(grid), None)
+
+
+def compare(puzzles):
+    """Solve every (number, grid) puzzle with both engines, check they agree and time them"""
+    totals = {"solver.py": 0.0, "dlx.py": 0.0}
+    mismatches = 0
+    for number, grid in puzzles:
+        start = time.perf_counter()
+        fast = solver.solve(grid)
+        totals["solver.py"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = list(itertools.islice(solutions(grid), 2))
+        totals["dlx.py"] += time.perf_counter() - start
+
+        # A unique puzzle has one right answer; otherwise any valid solution will do
+        if (fast is None) != (not found) or (len(found) == 1 and fast != found[0]):
+            mismatches += 1
+            print(f"puzzle {number}: engines disagree on {format_grid(grid)}")
+    return totals, mismatches
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare the DLX engine with the propagation solver")
+    parser.add_argument('file', nargs='?', help="puzzles in the one-line format (default: stdin)")
+    args = parser.parse_args()
+
+    stream = open(args.file) if args.file else sys.stdin
+    puzzles = []
+    with stream:
+        for number, line in enumerate((line for line in stream if line.strip()), 1):
+            try:
+                puzzles.append((number, parse_puzzle(line)))
+            except ValueError as exc:
+                # Skip the bad line and keep going, like bulk_solve.py
+                print(f"puzzle {number}: {exc}", file=sys.stderr)
+
+    totals, mismatches = compare(puzzles)
+    for engine, seconds in totals.items():
+        print(f"{engine:10s} {seconds:8.3f}s total, {seconds / max(len(puzzles), 1) * 1000:8.3f} ms per puzzle")
+    print(f"{len(puzzles)} puzzles, {mismatches} disagreements")
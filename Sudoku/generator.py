@@ -0,0 +1,274 @@
+"""Unique-solution Sudoku generator with a technique-based difficulty rating
+
+A puzzle is rated by the hardest technique a person needs to solve it, not
+by how many cells are blank.  The rater works like a careful human: it keeps
+pencil marks (candidate bitmasks), always tries the easiest technique first
+and starts over from the easiest one after every step.
+
+    Easy      singles (naked and hidden)
+    Medium    locked candidates (pointing / claiming), naked and hidden pairs
+    Hard      naked and hidden triples, X-wing, swordfish
+    Expert    none of the above is enough
+
+The generator fills a random solution grid, then blanks cells in random
+order.  A blank is kept only while the puzzle still has exactly one
+solution (solver.count_solutions, stopping at 2) and, below Expert, while
+the techniques of the requested level still solve it.  Puzzles that come
+out easier than requested are thrown away and the next grid is tried.
+"""
+
+import itertools
+import random
+import time
+
+import solver
+
+DIFFICULTIES = ["Easy", "Medium", "Hard", "Expert"]
+EXPERT = len(DIFFICULTIES) - 1
+
+SIZE = 9
+BOX = 3
+FULL = (1 << SIZE) - 1
+UNITS, PEERS, CELL_UNITS = solver.tables(SIZE)
+ROWS, COLS, BOXES = UNITS[:SIZE], UNITS[SIZE:2 * SIZE], UNITS[2 * SIZE:]
+
+# Where a box crosses a row or column: (segment, rest of the line, rest of the box)
+SEGMENTS = []
+for _box in BOXES:
+    for _line in ROWS + COLS:
+        _segment = [cell for cell in _box if cell in _line]
+        if _segment:
+            SEGMENTS.append((_segment,
+                             [cell for cell in _line if cell not in _segment],
+                             [cell for cell in _box if cell not in _segment]))
+
+
+class Pencil:
+    """Candidates and placed digits of a puzzle being solved by hand"""
+
+    def __init__(self, grid):
+        state = solver.start(grid)
+        if state is None:
+            raise ValueError("the givens break the Sudoku rules")
+        self.candidates, self.values = state[0], state[1]
+        self.broken = False  # Set when a technique runs into a contradiction
+
+    def solved(self):
+        """Check if every cell holds a digit"""
+        return all(self.values)
+
+    def place(self, cell, bit):
+        """Fill in a digit and clear it from the cell's peers"""
+        if not solver.assign(self.candidates, self.values, PEERS, cell, bit):
+            self.broken = True
+
+    def remove(self, cells, digits):
+        """Erase `digits` from the pencil marks of `cells`; True if anything changed"""
+        if not digits:
+            return False
+        changed = False
+        for cell in cells:
+            mask = self.candidates[cell]
+            if mask & digits and not self.values[cell]:
+                mask &= ~digits
+                self.candidates[cell] = mask
+                changed = True
+                if not mask:
+                    self.broken = True
+                elif not mask & (mask - 1):
+                    self.place(cell, mask)
+        return changed
+
+
+def locked_candidates(pencil):
+    candidates = pencil.candidates
+    for segment, line_rest, box_rest in SEGMENTS:
+        inside = line = box = 0
+        for cell in segment:
+            inside |= candidates[cell]
+        for cell in line_rest:
+            line |= candidates[cell]
+        for cell in box_rest:
+            box |= candidates[cell]
+
+        # Pointing: a digit confined to this segment of the box leaves the rest of the line
+        if pencil.remove(line_rest, inside & ~box & line):
+            return True
+        # Claiming: a digit confined to this segment of the line leaves the rest of the box
+        if pencil.remove(box_rest, inside & ~line & box):
+            return True
+    return False
+
+
+def naked_subset(pencil, size):
+    """`size` cells of a unit that share `size` candidates between them"""
+    for unit in UNITS:
+        open_cells = [cell for cell in unit if not pencil.values[cell]
+                      and solver.bit_count(pencil.candidates[cell]) <= size]
+        for group in itertools.combinations(open_cells, size):
+            digits = 0
+            for cell in group:
+                digits |= pencil.candidates[cell]
+            if solver.bit_count(digits) == size:
+                if pencil.remove([cell for cell in unit if cell not in group], digits):
+                    return True
+    return False
+
+
+def hidden_subset(pencil, size):
+    """`size` digits of a unit that only fit in the same `size` cells"""
+    for unit in UNITS:
+        places = {}
+        for bit in (1 << d for d in range(SIZE)):
+            where = [cell for cell in unit if pencil.candidates[cell] & bit and not pencil.values[cell]]
+            if 2 <= len(where) <= size:
+                places[bit] = where
+        for group in itertools.combinations(places, size):
+            cells = set()
+            for bit in group:
+                cells.update(places[bit])
+            if len(cells) == size:
+                digits = sum(group)
+                if pencil.remove(cells, FULL & ~digits):
+                    return True
+    return False
+
+
+def fish(pencil, size):
+    """X-wing (size 2) and swordfish (size 3) on rows and on columns"""
+    for bases, covers in ((ROWS, COLS), (COLS, ROWS)):
+        for bit in (1 << d for d in range(SIZE)):
+            # Cover-line indices where the digit can go, for every base line
+            spots = {}
+            for index, line in enumerate(bases):
+                where = frozenset(i for i, cell in enumerate(line)
+                                  if pencil.candidates[cell] & bit and not pencil.values[cell])
+                if 2 <= len(where) <= size:
+                    spots[index] = where
+            for group in itertools.combinations(spots, size):
+                cover = frozenset().union(*(spots[index] for index in group))
+                if len(cover) == size:
+                    targets = [cell for i in cover for cell in covers[i] if cell not in
+                               [bases[index][i] for index in group]]
+                    if pencil.remove(targets, bit):
+                        return True
+    return False
+
+
+# (level, name, technique), easiest first
+TECHNIQUES = [
+    (1, "Locked candidates", locked_candidates),
+    (1, "Naked pair", lambda pencil: naked_subset(pencil, 2)),
+    (1, "Hidden pair", lambda pencil: hidden_subset(pencil, 2)),
+    (2, "Naked triple", lambda pencil: naked_subset(pencil, 3)),
+    (2, "Hidden triple", lambda pencil: hidden_subset(pencil, 3)),
+    (2, "X-wing", lambda pencil: fish(pencil, 2)),
+    (2, "Swordfish", lambda pencil: fish(pencil, 3)),
+]
+
+
+def logical_solve(grid, max_level=EXPERT - 1):
+    """(level reached, techniques used, solved) using techniques up to `max_level`"""
+    pencil = Pencil(grid)
+    candidates, values = pencil.candidates, pencil.values
+    level = 0
+    used = set()
+    while True:
+        # Singles are cheap and always allowed, so run them to a standstill first
+        placed = values.count(0)
+        if not solver.propagate(candidates, values, UNITS, PEERS, FULL):
+            return level, used, False
+        if values.count(0) != placed:
+            used.add("Singles")
+        if pencil.solved():
+            return level, used, True
+
+        for technique_level, name, technique in TECHNIQUES:
+            if technique_level > max_level:
+                return level, used, False
+            if technique(pencil):
+                if pencil.broken:
+                    return level, used, False
+                level = max(level, technique_level)
+                used.add(name)
+                break
+        else:
+            return level, used, False
+
+
+def rate(grid):
+    """(difficulty name, set of techniques needed) for a puzzle with one solution"""
+    level, used, solved = logical_solve(grid)
+    return DIFFICULTIES[level if solved else EXPERT], used
+
+
+def random_solution(rng):
+    """Random complete grid: three independent random boxes on the diagonal, then solved"""
+    grid = [[0] * SIZE for _ in range(SIZE)]
+    for b in range(BOX):
+        digits = rng.sample(range(1, SIZE + 1), SIZE)
+        for i, digit in enumerate(digits):
+            grid[b * BOX + i // BOX][b * BOX + i % BOX] = digit
+    grid = solver.solve(grid)
+
+    # Shuffle the rows within bands and the bands themselves, so the seeded boxes move around
+    bands = rng.sample(range(BOX), BOX)
+    rows = [band * BOX + r for band in bands for r in rng.sample(range(BOX), BOX)]
+    stacks = rng.sample(range(BOX), BOX)
+    cols = [stack * BOX + c for stack in stacks for c in rng.sample(range(BOX), BOX)]
+    return [[grid[r][c] for c in cols] for r in rows]
+
+
+def carve(solution, level, rng):
+    """Blank cells of `solution` in random order, keeping each blank only while
+    the puzzle still has exactly one solution and, below Expert, while
+    techniques up to `level` still solve it"""
+    puzzle = [row[:] for row in solution]
+    cells = list(range(SIZE * SIZE))
+    rng.shuffle(cells)
+    for cell in cells:
+        r, c = divmod(cell, SIZE)
+        digit = puzzle[r][c]
+        puzzle[r][c] = 0
+        # The uniqueness check is cheap and rejects most blanks, so it goes before the rater
+        keep = solver.count_solutions(puzzle, 2) == 1
+        if keep and level < EXPERT:
+            keep = logical_solve(puzzle, level)[2]
+        if not keep:
+            puzzle[r][c] = digit
+    return puzzle
+
+
+def generate(difficulty="Medium", rng=None, time_budget=None):
+    """(puzzle, solution, rating) for a puzzle with exactly one solution, rated
+    `difficulty`.  With a `time_budget` in seconds, the closest rating found
+    within it is returned instead of waiting for an exact match"""
+    if difficulty not in DIFFICULTIES:
+        raise ValueError(f"difficulty must be one of {', '.join(DIFFICULTIES)}")
+    rng = rng or random.Random()
+    target = DIFFICULTIES.index(difficulty)
+    started = time.perf_counter()
+    slowest = 0.0
+
+    best = None
+    while True:
+        attempt_started = time.perf_counter()
+        solution = random_solution(rng)
+        puzzle = carve(solution, target, rng)
+        # Carving keeps the solution unique; check anyway rather than ever hand out a broken puzzle
+        if solver.count_solutions(puzzle, 2) == 1:
+            rating, _ = rate(puzzle)
+            distance = abs(DIFFICULTIES.index(rating) - target)
+            if best is None or distance < best[0]:
+                best = (distance, puzzle, solution, rating)
+            if distance == 0:
+                break
+
+        # Stop before an attempt that would likely run past the budget
+        now = time.perf_counter()
+        slowest = max(slowest, now - attempt_started)
+        if best is not None and time_budget is not None and now + slowest - started > time_budget:
+            break
+
+    _, puzzle, solution, rating = best
+    return puzzle, solution, rating
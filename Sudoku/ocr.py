@@ -0,0 +1,174 @@
+"""Read a Sudoku board from a photo or screenshot
+
+The grid is found as the largest contour, straightened to 450x450 pixels
+and binarized (white ink on black), then cut into 81 cells.  Empty cells are
+recognized up front by how little ink is left once the grid lines at the
+cell edges are trimmed off, so tesseract only ever sees the givens.
+
+With the built-in recognizer (digits.py) every given is classified at once
+in NumPy, and only the cells it is unsure of go to tesseract, if tesseract
+is installed at all.  Without it, the givens all go to tesseract in one
+call: every digit is pasted into its own slot of a single tiled image and
+read with image_to_data, whose word boxes say which slot each digit came
+from.  Any digit the tiled pass does not pin to exactly one slot is read
+again on its own, with the single-character calls spread over a thread
+pool (each call is a separate tesseract process).
+"""
+
+import concurrent.futures
+import os
+import subprocess
+
+import cv2
+import numpy as np
+
+from digits import MIN_CONFIDENCE
+
+try:
+    import pytesseract
+except ImportError:  # Optional when the built-in recognizer is used
+    pytesseract = None
+
+GRID_PIXELS = 450
+TRIM = 0.15  # Fraction of each cell edge ignored when measuring ink, to skip grid lines
+EMPTY_INK = 0.03  # Cells with less ink than this fraction of the trimmed area are empty
+SLOT_PIXELS = 90  # Tile slot per digit: the cell plus a wide white gap so digits never touch
+TILE_COLUMNS = 9
+
+DIGIT_CONFIG = r'--oem 3 --psm 10 -c tessedit_char_whitelist=123456789'
+TILE_CONFIG = r'--oem 3 --psm 11 -c tessedit_char_whitelist=123456789'
+
+
+def tesseract_available():
+    """Check if pytesseract and the tesseract binary are both installed"""
+    if pytesseract is None:
+        return False
+    try:
+        subprocess.run(['tesseract', '--version'], capture_output=True, check=True)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+    return True
+
+
+def find_grid(gray):
+    """Binarized GRID_PIXELS square of the largest contour in a grayscale image, or None"""
+    _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+
+    # The largest rectangular contour should be the sudoku grid
+    x, y, w, h = cv2.boundingRect(max(contours, key=cv2.contourArea))
+    region = cv2.resize(gray[y:y+h, x:x+w], (GRID_PIXELS, GRID_PIXELS))
+    region = cv2.GaussianBlur(region, (5, 5), 0)
+    _, region = cv2.threshold(region, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    return region
+
+
+def split_cells(region):
+    """The 81 cells of a grid region, row by row"""
+    size = region.shape[0] // 9
+    return [region[row * size:(row + 1) * size, col * size:(col + 1) * size]
+            for row in range(9) for col in range(9)]
+
+
+def ink(cell):
+    """Fraction of ink pixels in a cell, ignoring the grid lines at its edges"""
+    h, w = cell.shape
+    dy, dx = int(h * TRIM), int(w * TRIM)
+    center = cell[dy:h - dy, dx:w - dx]
+    return np.count_nonzero(center) / center.size
+
+
+def parse_digit(text):
+    """Digit 1-9 from tesseract output, or 0"""
+    text = text.strip()
+    return int(text) if len(text) == 1 and text in "123456789" else 0
+
+
+def read_digit(cell):
+    """Recognize one cell on its own with tesseract"""
+    # Add padding to improve OCR
+    padded = cv2.copyMakeBorder(cell, 10, 10, 10, 10, cv2.BORDER_CONSTANT, value=0)
+    try:
+        return parse_digit(pytesseract.image_to_string(padded, config=DIGIT_CONFIG))
+    except pytesseract.TesseractError:
+        return 0
+
+
+def read_tiled(cells):
+    """One tesseract call for many cells: {index in cells: digit} for every digit placed in exactly one slot"""
+    rows = (len(cells) + TILE_COLUMNS - 1) // TILE_COLUMNS
+    tile = np.full((rows * SLOT_PIXELS, TILE_COLUMNS * SLOT_PIXELS), 255, dtype=np.uint8)
+    for index, cell in enumerate(cells):
+        h, w = cell.shape
+        top = (index // TILE_COLUMNS) * SLOT_PIXELS + (SLOT_PIXELS - h) // 2
+        left = (index % TILE_COLUMNS) * SLOT_PIXELS + (SLOT_PIXELS - w) // 2
+        tile[top:top + h, left:left + w] = cv2.bitwise_not(cell)  # Dark digits on white read best
+
+    data = pytesseract.image_to_data(tile, config=TILE_CONFIG, output_type=pytesseract.Output.DICT)
+    found = {}
+    clashes = set()
+    for text, left, top, width, height in zip(data['text'], data['left'], data['top'],
+                                              data['width'], data['height']):
+        if not text.strip():
+            continue
+        row = (top + height // 2) // SLOT_PIXELS
+        col = (left + width // 2) // SLOT_PIXELS
+        index = row * TILE_COLUMNS + col
+        digit = parse_digit(text)
+        if index >= len(cells) or not digit or index in found:
+            clashes.add(index)
+        else:
+            found[index] = digit
+    for index in clashes:
+        found.pop(index, None)
+    return found
+
+
+def read_digits(cells, workers=None):
+    """Digits for a list of non-empty cells: a tiled pass, then single reads in parallel for the rest"""
+    if not cells:
+        return []
+    try:
+        found = read_tiled(cells)
+    except pytesseract.TesseractError:
+        found = {}
+
+    missing = [index for index in range(len(cells)) if index not in found]
+    if missing:
+        workers = workers or min(8, os.cpu_count() or 1)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            for index, digit in zip(missing, pool.map(read_digit, [cells[index] for index in missing])):
+                found[index] = digit
+    return [found[index] for index in range(len(cells))]
+
+
+def extract_board(image_path, model=None):
+    """9x9 board read from an image file, 0 for empty cells; None if no grid is found.
+    With a digits.DigitModel, tesseract only rereads the cells it is unsure of"""
+    image = cv2.imread(image_path)
+    if image is None:
+        return None
+    region = find_grid(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY))
+    if region is None:
+        return None
+
+    cells = split_cells(region)
+    filled = [index for index, cell in enumerate(cells) if ink(cell) >= EMPTY_INK]
+    filled_cells = [cells[index] for index in filled]
+    if model is None:
+        digits = read_digits(filled_cells)
+    else:
+        digits, confidence = model.classify(filled_cells)
+        digits = digits.tolist()
+        unsure = [i for i in range(len(filled)) if confidence[i] < MIN_CONFIDENCE]
+        if unsure and tesseract_available():
+            for i, digit in zip(unsure, read_digits([filled_cells[i] for i in unsure])):
+                if digit:
+                    digits[i] = digit  # Otherwise keep the recognizer's best guess
+
+    values = [0] * 81
+    for index, digit in zip(filled, digits):
+        values[index] = digit
+    return [values[row * 9:(row + 1) * 9] for row in range(9)]
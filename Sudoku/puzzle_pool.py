@@ -0,0 +1,172 @@
+"""Pool of ready-made Sudoku puzzles, refilled in the background
+
+Generating a rated, unique puzzle takes tens of milliseconds, and Hard ones
+can take seconds, so the game keeps a few of each difficulty ready.  A
+daemon thread tops every difficulty up to `depth` puzzles, starting with
+the one the player last asked for, and the pool is saved between sessions
+so the first puzzle after startup is instant.  Taking a puzzle from an
+empty pool falls back to generating one on the spot.
+
+The pool file is compact binary:
+
+    header   magic b'SDKP', version, number of difficulties
+    per difficulty   difficulty index, puzzle count (uint16), then every
+                     puzzle as 41 bytes, two cells per byte, 0 for empty
+"""
+
+import collections
+import os
+import struct
+import threading
+
+import generator
+import solver
+
+MAGIC = b'SDKP'
+VERSION = 1
+HEADER = struct.Struct('<4sBB')
+SECTION = struct.Struct('<BH')
+CELLS = generator.SIZE * generator.SIZE
+PUZZLE_BYTES = (CELLS + 1) // 2
+
+DEFAULT_POOL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'puzzle_pool.bin')
+DEFAULT_DEPTH = 5
+
+
+def pack_puzzle(puzzle):
+    """41 bytes for a 9x9 board, two cells per byte"""
+    cells = [value for row in puzzle for value in row] + [0]
+    return bytes(cells[i] << 4 | cells[i + 1] for i in range(0, CELLS, 2))
+
+
+def unpack_puzzle(data):
+    """Board from the bytes written by pack_puzzle"""
+    cells = []
+    for byte in data:
+        cells.append(byte >> 4)
+        cells.append(byte & 0xF)
+    size = generator.SIZE
+    return [cells[r * size:(r + 1) * size] for r in range(size)]
+
+
+class PuzzlePool:
+    def __init__(self, path=DEFAULT_POOL_PATH, depth=DEFAULT_DEPTH):
+        self.path = path
+        self.depth = depth
+        self.puzzles = {difficulty: collections.deque() for difficulty in generator.DIFFICULTIES}
+        self.preferred = "Medium"  # Refilled first: the difficulty the player last took
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopped = False
+        self.worker = None
+
+    def load(self):
+        """Read puzzles saved by an earlier session; a missing or damaged file leaves the pool empty"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+
+        try:
+            magic, version, sections = HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{self.path} is not a Sudoku puzzle pool")
+            offset = HEADER.size
+            loaded = {}
+            for _ in range(sections):
+                level, count = SECTION.unpack_from(data, offset)
+                offset += SECTION.size
+                if level >= len(generator.DIFFICULTIES) or offset + count * PUZZLE_BYTES > len(data):
+                    raise ValueError(f"{self.path} is truncated")
+                loaded[generator.DIFFICULTIES[level]] = [
+                    unpack_puzzle(data[start:start + PUZZLE_BYTES])
+                    for start in range(offset, offset + count * PUZZLE_BYTES, PUZZLE_BYTES)]
+                offset += count * PUZZLE_BYTES
+        except (struct.error, ValueError):
+            return
+
+        with self.lock:
+            for difficulty, puzzles in loaded.items():
+                self.puzzles[difficulty].extend(puzzles)
+
+    def save(self):
+        """Write the pool next to the game, replacing the old file in one step"""
+        temp_path = self.path + '.tmp'
+        with self.lock:
+            try:
+                with open(temp_path, 'wb') as f:
+                    f.write(HEADER.pack(MAGIC, VERSION, len(self.puzzles)))
+                    for level, difficulty in enumerate(generator.DIFFICULTIES):
+                        puzzles = self.puzzles[difficulty]
+                        f.write(SECTION.pack(level, len(puzzles)))
+                        for puzzle in puzzles:
+                            f.write(pack_puzzle(puzzle))
+                os.replace(temp_path, self.path)
+            except OSError:
+                pass  # A read-only install just starts with an empty pool next time
+
+    def prefer(self, difficulty):
+        """Have the worker fill `difficulty` first, e.g. as soon as the player picks it"""
+        with self.lock:
+            self.preferred = difficulty
+        self.wake.set()
+
+    def take(self, difficulty):
+        """(puzzle, solution, rating) from the pool, or generated now if it has run dry;
+        the rating is always `difficulty`"""
+        with self.lock:
+            self.preferred = difficulty
+            waiting = self.puzzles[difficulty]
+            while waiting:
+                puzzle = waiting.popleft()
+                # The file could have been edited; only hand out puzzles that are still unique
+                try:
+                    unique = solver.count_solutions(puzzle, 2) == 1
+                except ValueError:
+                    unique = False
+                if unique:
+                    self.wake.set()
+                    return puzzle, solver.solve(puzzle), difficulty
+        self.wake.set()
+        return generator.generate(difficulty)
+
+    def counts(self):
+        """Number of ready puzzles per difficulty"""
+        with self.lock:
+            return {difficulty: len(puzzles) for difficulty, puzzles in self.puzzles.items()}
+
+    def next_to_fill(self):
+        """Difficulty the worker should generate for next, or None if every one is full"""
+        with self.lock:
+            short = [difficulty for difficulty, puzzles in self.puzzles.items() if len(puzzles) < self.depth]
+            if not short:
+                return None
+            return min(short, key=lambda difficulty: (difficulty != self.preferred, len(self.puzzles[difficulty])))
+
+    def start(self):
+        """Start the background refill thread"""
+        if self.worker is None:
+            self.worker = threading.Thread(target=self.refill_loop, daemon=True)
+            self.worker.start()
+
+    def refill_loop(self):
+        """Worker thread: generate puzzles until every difficulty is at depth, then wait to be woken"""
+        while not self.stopped:
+            difficulty = self.next_to_fill()
+            if difficulty is None:
+                self.save()
+                self.wake.wait()
+                self.wake.clear()
+                continue
+            puzzle, _, _ = generator.generate(difficulty)
+            with self.lock:
+                self.puzzles[difficulty].append(puzzle)
+
+    def close(self):
+        """Stop refilling and save whatever is ready"""
+        self.stopped = True
+        self.wake.set()
+        if self.worker is not None:
+            self.worker.join(timeout=0.5)  # A Hard puzzle still being generated is dropped
+        self.save()
@@ -0,0 +1,265 @@
+"""Constraint-propagation Sudoku solver shared by both Sudoku windows
+
+Every cell keeps a bitmask of the digits it can still take (bit d - 1 for
+digit d).  Placing a digit clears it from the cell's peers, and any peer
+left with a single candidate is placed in turn (naked singles).  After that,
+every row, column and box is scanned for digits that fit in only one of its
+cells (hidden singles).  When propagation stalls the solver branches on the
+cell with the fewest candidates, or on a digit that has only two places left
+in a row, column or box if that is a tighter choice, and copies the masks
+for each guess.
+
+Boards are lists of rows with 0 for an empty cell.  Any square board whose
+side is itself a square works: 4x4, 9x9, 16x16 and so on.
+
+    from solver import solve
+    solution = solve(puzzle)  # New grid, or None if there is no solution
+    unique = count_solutions(puzzle, 2) == 1
+"""
+
+import itertools
+import math
+
+# Per-size cell tables: (units, peers, cell_units)
+_TABLE_CACHE = {}
+
+
+def tables(size):
+    """Rows, columns and boxes as cell lists, plus the peers and units of every cell"""
+    if size not in _TABLE_CACHE:
+        box = math.isqrt(size)
+        rows = [[r * size + c for c in range(size)] for r in range(size)]
+        cols = [[r * size + c for r in range(size)] for c in range(size)]
+        boxes = [[(br + r) * size + bc + c for r in range(box) for c in range(box)]
+                 for br in range(0, size, box) for bc in range(0, size, box)]
+        units = rows + cols + boxes
+
+        cell_units = [[] for _ in range(size * size)]
+        for index, unit in enumerate(units):
+            for cell in unit:
+                cell_units[cell].append(index)
+        peers = [tuple(sorted({peer for index in cell_units[cell] for peer in units[index]} - {cell}))
+                 for cell in range(size * size)]
+
+        _TABLE_CACHE[size] = (units, peers, [tuple(indices) for indices in cell_units])
+    return _TABLE_CACHE[size]
+
+
+# Popcounts of every mask up to 16 bits; wider masks are counted in halves
+_BIT_COUNTS = [0] * (1 << 16)
+for _mask in range(1, 1 << 16):
+    _BIT_COUNTS[_mask] = _BIT_COUNTS[_mask >> 1] + (_mask & 1)
+
+
+def bit_count(mask):
+    """Number of set bits in a candidate mask"""
+    if mask < 1 << 16:
+        return _BIT_COUNTS[mask]
+    return bin(mask).count("1")
+
+
+def check_grid(grid):
+    """Board side length; ValueError unless `grid` is a square Sudoku board of digits"""
+    size = len(grid)
+    box = math.isqrt(size)
+    if size == 0 or box * box != size:
+        raise ValueError(f"a Sudoku board needs a square number of rows, not {size}")
+    for row in grid:
+        if len(row) != size:
+            raise ValueError(f"every row needs {size} cells")
+        for value in row:
+            if type(value) is not int or not 0 <= value <= size:
+                raise ValueError(f"cells hold 0 (empty) or a digit from 1 to {size}")
+    return size
+
+
+def assign(candidates, values, peers, cell, bit):
+    """Place `bit` in `cell` and propagate naked singles; False on a contradiction"""
+    pending = [(cell, bit)]
+    while pending:
+        cell, bit = pending.pop()
+        if values[cell]:
+            if values[cell] != bit:
+                return False
+            continue
+        if not candidates[cell] & bit:
+            return False
+
+        values[cell] = bit
+        candidates[cell] = bit
+        for peer in peers[cell]:
+            mask = candidates[peer]
+            if mask & bit:
+                mask ^= bit
+                if not mask:
+                    return False
+                candidates[peer] = mask
+                if not mask & (mask - 1) and not values[peer]:
+                    pending.append((peer, mask))
+    return True
+
+
+def propagate(candidates, values, units, peers, full):
+    """Place hidden singles until none are left; False on a contradiction"""
+    progress = True
+    while progress:
+        progress = False
+        for unit in units:
+            once = twice = 0
+            for cell in unit:
+                mask = candidates[cell]
+                twice |= once & mask
+                once |= mask
+            if once != full:
+                return False  # Some digit has nowhere to go
+
+            hidden = once & ~twice
+            if not hidden:
+                continue
+            for cell in unit:
+                if values[cell]:
+                    continue
+                bit = candidates[cell] & hidden
+                if bit:
+                    if bit & (bit - 1):
+                        return False  # Two digits that must both go in this cell
+                    if not assign(candidates, values, peers, cell, bit):
+                        return False
+                    progress = True
+    return True
+
+
+def choose_branch(candidates, values, units, full):
+    """Guesses to try as (cell, bit): the cell with the fewest candidates, or a
+    digit with only two places in some unit when no cell is down to two"""
+    best_cell = None
+    best_count = full.bit_length() + 1
+    for cell, value in enumerate(values):
+        if not value:
+            count = bit_count(candidates[cell])
+            if count < best_count:
+                best_cell, best_count = cell, count
+                if count == 2:
+                    break
+    if best_cell is None:
+        return None
+
+    if best_count > 2:
+        for unit in units:
+            once = twice = thrice = 0
+            for cell in unit:
+                if not values[cell]:
+                    mask = candidates[cell]
+                    thrice |= twice & mask
+                    twice |= once & mask
+                    once |= mask
+            pairs = twice & ~thrice
+            if pairs:
+                bit = pairs & -pairs
+                return [(cell, bit) for cell in unit if not values[cell] and candidates[cell] & bit]
+
+    guesses = []
+    mask = candidates[best_cell]
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        guesses.append((best_cell, bit))
+    return guesses
+
+
+def search(candidates, values, units, peers, full):
+    """Yield the cell values of every solution, lazily"""
+    if not propagate(candidates, values, units, peers, full):
+        return
+
+    guesses = choose_branch(candidates, values, units, full)
+    if guesses is None:
+        yield values
+        return
+
+    for cell, bit in guesses:
+        trial_candidates = candidates[:]
+        trial_values = values[:]
+        if assign(trial_candidates, trial_values, peers, cell, bit):
+            yield from search(trial_candidates, trial_values, units, peers, full)
+
+
+def start(grid):
+    """Search arguments (candidates, values, units, peers, full mask) for a board, or None if its givens clash"""
+    size = check_grid(grid)
+    units, peers, cell_units = tables(size)
+    full = (1 << size) - 1
+    values = [1 << (digit - 1) if digit else 0 for row in grid for digit in row]
+
+    # Digits already given in every unit; a repeat means the givens clash
+    used = []
+    for unit in units:
+        seen = 0
+        for cell in unit:
+            bit = values[cell]
+            if seen & bit:
+                return None
+            seen |= bit
+        used.append(seen)
+
+    candidates = values[:]
+    singles = []
+    for cell, value in enumerate(values):
+        if not value:
+            a, b, c = cell_units[cell]
+            mask = full & ~(used[a] | used[b] | used[c])
+            candidates[cell] = mask
+            if not mask & (mask - 1):
+                singles.append((cell, mask))
+    for cell, bit in singles:
+        if not assign(candidates, values, peers, cell, bit):
+            return None
+    return candidates, values, units, peers, full
+
+
+def to_grid(values, size):
+    """Board from solved cell values"""
+    return [[values[r * size + c].bit_length() for c in range(size)] for r in range(size)]
+
+
+def solve(grid):
+    """Solved copy of `grid`, or None if the puzzle has no solution"""
+    state = start(grid)
+    if state is None:
+        return None
+    values = next(search(*state), None)
+    return to_grid(values, len(grid)) if values is not None else None
+
+
+def count_solutions(grid, limit=2):
+    """Number of solutions of `grid`, stopping at `limit`; 1 means the puzzle is unique"""
+    state = start(grid)
+    if state is None:
+        return 0
+    return sum(1 for _ in itertools.islice(search(*state), limit))
+
+
+def parse_puzzle(line):
+    """Board from the one-line format: digits row by row, with 0 or . for an empty cell"""
+    text = line.strip()
+    size = math.isqrt(len(text))
+    if size * size != len(text) or size > 9:
+        raise ValueError(f"expected 16 or 81 cells on one line, got {len(text)}")
+    grid = []
+    for r in range(size):
+        row = []
+        for ch in text[r * size:(r + 1) * size]:
+            if ch in ".0":
+                row.append(0)
+            elif ch.isdigit() and int(ch) <= size:
+                row.append(int(ch))
+            else:
+                raise ValueError(f"unexpected character {ch!r} in puzzle")
+        grid.append(row)
+    check_grid(grid)
+    return grid
+
+
+def format_grid(grid):
+    """One-line form of a board, with . for empty cells"""
+    return "".join(str(value) if value else "." for row in grid for value in row)
@@ -0,0 +1,24 @@
+"""Tests for the Sudoku generator: python -m pytest Sudoku"""
+
+import random
+
+import pytest
+
+import generator
+import solver
+
+
+@pytest.mark.parametrize("difficulty", generator.DIFFICULTIES)
+def test_generate_returns_requested_difficulty(difficulty):
+    for seed in range(3):
+        puzzle, solution, rating = generator.generate(difficulty, random.Random(seed))
+        assert rating == difficulty
+        assert generator.rate(puzzle)[0] == difficulty
+        assert solver.count_solutions(puzzle, 2) == 1
+        assert solver.solve(puzzle) == solution
+
+
+def test_time_budget_returns_closest_unique_puzzle():
+    puzzle, _, rating = generator.generate("Hard", random.Random(0), time_budget=0)
+    assert rating in generator.DIFFICULTIES
+    assert solver.count_solutions(puzzle, 2) == 1
@@ -0,0 +1,96 @@
+"""Headless batch analysis of 3x3 tic-tac-toe positions
+
+Scores any number of positions against the perfect-play table without
+pygame or a game window.  Positions are given by their base-3 encoding
+(see perfect_play), or as 9-character strings read row by row with
+"X", "O" and "." / "-" / " " for empty cells:
+
+    >>> from analysis import analyze
+    >>> list(analyze(["X...O....", 0]))
+    [(1, 0, 7), (0, 0, 9)]
+
+Each result is (best cell, value, distance) for the side to move: best cell
+is row * 3 + col (-1 once the game is over), value is 1 win / 0 draw / -1
+loss with perfect play, and distance is the number of plies until the game
+ends.  Lookups are done a chunk at a time with NumPy fancy indexing, so a
+million positions take a fraction of a second.
+"""
+
+import itertools
+
+import numpy as np
+
+import perfect_play
+
+UNREACHABLE = -2  # Value stored for boards that cannot occur in a game
+
+VALUES = np.array([UNREACHABLE if value is None else value for value in perfect_play.VALUES], dtype=np.int8)
+BEST_MOVES = np.array(perfect_play.BEST_MOVES, dtype=np.int8)
+DISTANCES = np.array(perfect_play.DISTANCES, dtype=np.int8)
+
+# Character code -> base-3 digit for string encodings; anything else is invalid
+_DIGITS = np.full(256, -1, dtype=np.int32)
+_DIGITS[[ord("."), ord("-"), ord(" ")]] = 0
+_DIGITS[[ord("X"), ord("x")]] = 1
+_DIGITS[[ord("O"), ord("o")]] = 2
+_POWERS = np.array(perfect_play.POWERS, dtype=np.int32)
+
+
+def encode_strings(boards):
+    """Base-3 indices of a sequence of 9-character board strings"""
+    if not boards:
+        return np.zeros(0, dtype=np.int32)
+    try:
+        raw = np.frombuffer("".join(boards).encode("ascii"), dtype=np.uint8)
+    except UnicodeEncodeError:
+        raise ValueError("board strings may only contain X, O and . - or space")
+    if raw.size != len(boards) * perfect_play.CELLS:
+        raise ValueError("every board string needs exactly 9 cells")
+    digits = _DIGITS[raw].reshape(len(boards), perfect_play.CELLS)
+    if (digits < 0).any():
+        raise ValueError("board strings may only contain X, O and . - or space")
+    return digits @ _POWERS
+
+
+def analyze_indices(indices):
+    """(best cells, values, distances) arrays for an array of base-3 indices"""
+    indices = np.asarray(indices, dtype=np.int64)
+    if indices.size and (indices.min() < 0 or indices.max() >= perfect_play.TABLE_SIZE):
+        raise ValueError(f"encodings must lie in 0..{perfect_play.TABLE_SIZE - 1}")
+
+    values = VALUES[indices]
+    unreachable = values == UNREACHABLE
+    if unreachable.any():
+        bad = int(indices[np.argmax(unreachable)])
+        raise ValueError(f"board {bad} cannot be reached in a legal game")
+    return BEST_MOVES[indices], values, DISTANCES[indices]
+
+
+def analyze(encodings, chunk_size=1 << 16):
+    """Stream (best cell, value, distance) for every board encoding in `encodings`"""
+    if isinstance(encodings, np.ndarray):
+        # Already indices: slice instead of iterating element by element
+        for start in range(0, len(encodings), chunk_size):
+            moves, values, distances = analyze_indices(encodings[start:start + chunk_size])
+            yield from zip(moves.tolist(), values.tolist(), distances.tolist())
+        return
+
+    encodings = iter(encodings)
+    while True:
+        chunk = list(itertools.islice(encodings, chunk_size))
+        if not chunk:
+            return
+
+        if all(isinstance(encoding, str) for encoding in chunk):
+            indices = encode_strings(chunk)
+        elif not any(isinstance(encoding, str) for encoding in chunk):
+            indices = np.asarray(chunk, dtype=np.int64)
+        else:
+            # Mixed chunk: convert the strings on their own
+            strings = [i for i, encoding in enumerate(chunk) if isinstance(encoding, str)]
+            indices = np.array([0 if isinstance(encoding, str) else encoding for encoding in chunk],
+                               dtype=np.int64)
+            indices[strings] = encode_strings([chunk[i] for i in strings])
+
+        moves, values, distances = analyze_indices(indices)
+        yield from zip(moves.tolist(), values.tolist(), distances.tolist())
@@ -1,15 +1,25 @@
 import tkinter as tk
 from tkinter import messagebox
+import argparse
+from position import Position
 
 class TicTacToeGUI:
-    def __init__(self, master):
+    def __init__(self, master, rows=3, cols=3, k=3):
         self.master = master
-        master.title("Tic Tac Toe")
-        master.geometry("400x500")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        
+        if (rows, cols, k) == (3, 3, 3):
+            master.title("Tic Tac Toe")
+            master.geometry("400x500")
+        else:
+            # Bigger boards size the window to fit the grid
+            master.title(f"{k} in a Row ({rows}x{cols})")
         master.resizable(False, False)
         
         self.current_player = "X"
-        self.board = [["" for _ in range(3)] for _ in range(3)]
+        self.position = Position(rows, cols, k)
         self.buttons = {}
         self.game_over = False
         
@@ -39,7 +49,7 @@ class TicTacToeGUI:
         self.status_label.pack(pady=10)
         
     def create_grid(self):
-        """Create the 3x3 game grid"""
+        """Create the game grid"""
         grid_frame = tk.Frame(self.master)
         grid_frame.pack(pady=20)
         
@@ -47,14 +57,17 @@ class TicTacToeGUI:
         outer_frame = tk.Frame(grid_frame, bd=3, relief=tk.SOLID, bg="black")
         outer_frame.pack()
         
-        for i in range(3):
-            for j in range(3):
+        # Shrink the marks on bigger boards so the grid stays on screen
+        font_size = max(8, 36 * 3 // max(self.rows, self.cols))
+        
+        for i in range(self.rows):
+            for j in range(self.cols):
                 button = tk.Button(
                     outer_frame,
                     text="",
-                    font=('Arial', 36, 'bold'),
-                    width=4,
-                    height=2,
+                    font=('Arial', font_size, 'bold'),
+                    width=4 if font_size >= 18 else 2,
+                    height=2 if font_size >= 18 else 1,
                     command=lambda row=i, col=j: self.make_move(row, col),
                     bg='lightgray',
                     fg='darkblue',
@@ -93,11 +106,12 @@ class TicTacToeGUI:
         
     def make_move(self, row, col):
         """Handle a player move"""
-        if self.game_over or self.board[row][col] != "":
+        cell = row * self.cols + col
+        if self.game_over or not self.position.is_empty(cell):
             return
             
         # Make the move
-        self.board[row][col] = self.current_player
+        self.position.play(cell)
         self.buttons[(row, col)].config(
             text=self.current_player,
             state='disabled',
@@ -132,27 +146,11 @@ class TicTacToeGUI:
             
     def check_winner(self):
         """Check if current player has won"""
-        # Check rows
-        for row in self.board:
-            if all(cell == self.current_player for cell in row):
-                return True
-                
-        # Check columns
-        for col in range(3):
-            if all(self.board[row][col] == self.current_player for row in range(3)):
-                return True
-                
-        # Check diagonals
-        if all(self.board[i][i] == self.current_player for i in range(3)):
-            return True
-        if all(self.board[i][2-i] == self.current_player for i in range(3)):
-            return True
-            
-        return False
+        return self.position.winner() != 0
         
     def check_tie(self):
         """Check if the game is a tie"""
-        return all(self.board[i][j] != "" for i in range(3) for j in range(3))
+        return self.position.full()
         
     def disable_all_buttons(self):
         """Disable all game buttons"""
@@ -162,7 +160,7 @@ class TicTacToeGUI:
     def new_game(self):
         """Start a new game"""
         self.current_player = "X"
-        self.board = [["" for _ in range(3)] for _ in range(3)]
+        self.position = Position(self.rows, self.cols, self.k)
         self.game_over = False
         
         # Reset all buttons
@@ -181,6 +179,14 @@ class TicTacToeGUI:
         )
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Tic Tac Toe and bigger k-in-a-row games")
+    parser.add_argument('--rows', type=int, default=3)
+    parser.add_argument('--cols', type=int, default=3)
+    parser.add_argument('--k', type=int, default=3, help="marks in a row needed to win")
+    args = parser.parse_args()
+    if not 2 <= args.k <= max(args.rows, args.cols):
+        parser.error(f"cannot get {args.k} in a row on a {args.rows}x{args.cols} board")
+        
     root = tk.Tk()
-    app = TicTacToeGUI(root)
+    app = TicTacToeGUI(root, args.rows, args.cols, args.k)
     root.mainloop()
\ No newline at end of file
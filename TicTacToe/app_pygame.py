@@ -1,20 +1,44 @@
 import pygame
 import sys
 import random
+import argparse
+import threading
+import os
+from position import Position, line_tables
+from engine import TicTacToeEngine
+
+# The online client is shared with Connect Four
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Multiplayer"))
+from client import ServerConnection
+from protocol import parse_address
 
 # Initialize Pygame
 pygame.init()
 
+# AI turns: the delay timer fires AI_TURN_EVENT, the worker thread answers with AI_MOVE_EVENT
+AI_TURN_EVENT = pygame.USEREVENT + 1
+AI_MOVE_EVENT = pygame.USEREVENT + 2
+
+# Messages from the match server, posted by the connection's reader thread
+SERVER_EVENT = pygame.USEREVENT + 3
+
 class TicTacToeGame:
-    def __init__(self):
+    def __init__(self, rows=3, cols=3, k=3):
         # Game constants
-        self.CELL_SIZE = 150
-        self.GRID_SIZE = 3
-        self.BOARD_WIDTH = self.GRID_SIZE * self.CELL_SIZE
-        self.BOARD_HEIGHT = self.GRID_SIZE * self.CELL_SIZE
-        self.WINDOW_WIDTH = self.BOARD_WIDTH + 40
+        self.ROWS = rows
+        self.COLS = cols
+        self.WIN_LENGTH = k
+        self.CELL_SIZE = min(150, 600 // max(rows, cols))  # Shrink cells so big boards fit on screen
+        self.LINE_WIDTH = max(3, self.CELL_SIZE * 8 // 150)
+        self.BOARD_WIDTH = self.COLS * self.CELL_SIZE
+        self.BOARD_HEIGHT = self.ROWS * self.CELL_SIZE
+        self.WINDOW_WIDTH = max(self.BOARD_WIDTH + 40, 510)  # Room for the buttons
         self.WINDOW_HEIGHT = self.BOARD_HEIGHT + 200
         
+        # Cells on the most lines are the strongest: center, then corners, then edges on 3x3
+        _, _, cell_lines = line_tables(rows, cols, k)
+        self.preferred_cells = sorted(range(rows * cols), key=lambda cell: -len(cell_lines[cell]))
+        
         # Colors
         self.colors = {
             'background': (240, 240, 240),
@@ -30,17 +54,38 @@ class TicTacToeGame:
         
         # Initialize display
         self.screen = pygame.display.set_mode((self.WINDOW_WIDTH, self.WINDOW_HEIGHT))
-        pygame.display.set_caption("❌⭕ Tic Tac Toe - Pygame Edition")
+        title = "Tic Tac Toe" if (rows, cols, k) == (3, 3, 3) else f"{k} in a Row ({rows}x{cols})"
+        pygame.display.set_caption(f"❌⭕ {title} - Pygame Edition")
         self.clock = pygame.time.Clock()
         
         # Initialize fonts
         self.font_large = pygame.font.Font(None, 72)
         self.font_medium = pygame.font.Font(None, 48)
         self.font_small = pygame.font.Font(None, 32)
+        self.font_controls = pygame.font.Font(None, 24)
+        
+        # Event-driven rendering: sleep in pygame.event.wait while nothing moves, and
+        # only redraw when something on screen would change
+        self.event_driven = True
+        self.text_cache = {}
+        self.drawn = None  # Frame state last drawn; None forces a redraw
         
         # Animation (initialize before reset_game)
         self.winning_line_animation = {'active': False, 'progress': 0}
         
+        # Hard AI search (initialize before reset_game)
+        self.engine = TicTacToeEngine(rows, cols, k)
+        
+        # Background AI turn state (initialize before reset_game)
+        self.ai_thinking = False
+        self.ai_search_id = 0
+        self.ai_cancel = threading.Event()
+        self.ai_lock = threading.Lock()  # One search at a time on the shared engine
+        self.ai_move_delay_ms = 500  # Small delay for better UX; 0 for automated play
+        
+        # Online play against another window through the match server
+        self.online = None  # ServerConnection while connected
+        
         # Game state
         self.reset_game()
         self.running = True
@@ -83,20 +128,48 @@ class TicTacToeGame:
         
     def reset_game(self):
         """Reset game to initial state"""
-        self.board = [["" for _ in range(3)] for _ in range(3)]
+        self.cancel_ai_search()
+        self.position = Position(self.ROWS, self.COLS, self.WIN_LENGTH)  # Shared with the AI
         self.current_player = "X"
         self.game_over = False
         self.winner = None
         self.winning_positions = []
         self.moves_count = 0
         self.winning_line_animation['active'] = False
-        
-    def handle_events(self):
+        # A cancelled search may still be finishing; let it stop before clearing its cache
+        with self.ai_lock:
+            self.engine.reset()
+        self.online_player = None  # "X" or "O" once an online match has started
+        self.online_status = None  # Replaces the status line while not in an online match
+        self.move_sent = False  # Our online move is waiting for the server to confirm it
+        
+    def handle_events(self, events=None):
         """Handle pygame events"""
-        for event in pygame.event.get():
+        if events is None:
+            events = pygame.event.get()
+        for event in events:
             if event.type == pygame.QUIT:
                 self.running = False
                 
+            elif event.type == AI_TURN_EVENT:
+                # The move delay is over; timers left from a cancelled turn are ignored
+                if event.search_id == self.ai_search_id and self.ai_thinking:
+                    self.start_ai_search()
+                    
+            elif event.type == AI_MOVE_EVENT:
+                # Results of searches cancelled by a restart are ignored
+                if event.search_id == self.ai_search_id:
+                    self.ai_thinking = False
+                    if event.move is not None:
+                        self.make_move(*event.move)
+                        
+            elif event.type == SERVER_EVENT:
+                self.handle_server_message(event.message)
+                
+            elif event.type == pygame.VIDEOEXPOSE:
+                # The window contents were lost, so repaint it
+                self.drawn = None
+                
             elif event.type == pygame.MOUSEMOTION:
                 self.mouse_pos = event.pos
                 
@@ -111,12 +184,12 @@ class TicTacToeGame:
                     self.restart_game()
                 elif event.key == pygame.K_n:
                     self.new_game()
-                elif event.key >= pygame.K_1 and event.key <= pygame.K_9:
+                elif event.key >= pygame.K_1 and event.key <= pygame.K_9 and (self.ROWS, self.COLS) == (3, 3):
                     # Number keys 1-9 for grid positions
                     key_num = event.key - pygame.K_1
                     row = key_num // 3
                     col = key_num % 3
-                    self.make_move(row, col)
+                    self.play_cell(row, col)
                     
     def handle_click(self, pos):
         """Handle mouse clicks"""
@@ -133,8 +206,8 @@ class TicTacToeGame:
                 if pos[0] >= 20 and pos[0] < 20 + self.BOARD_WIDTH:
                     col = (pos[0] - 20) // self.CELL_SIZE
                     row = (pos[1] - board_start_y) // self.CELL_SIZE
-                    if 0 <= row < 3 and 0 <= col < 3:
-                        self.make_move(row, col)
+                    if 0 <= row < self.ROWS and 0 <= col < self.COLS:
+                        self.play_cell(row, col)
                         
     def handle_button_click(self, action):
         """Handle button clicks"""
@@ -149,17 +222,31 @@ class TicTacToeGame:
             
     def new_game(self):
         """Start a completely new game"""
-        self.reset_game()
+        if self.online is not None:
+            self.join_online_match()
+        else:
+            self.reset_game()
         
     def restart_game(self):
         """Restart with same settings"""
-        self.reset_game()
+        if self.online is not None:
+            self.join_online_match()
+        else:
+            self.reset_game()
         
     def toggle_ai(self):
         """Toggle AI mode"""
+        if self.online is not None:
+            return  # The opponent is the other player on the server
         self.ai_enabled = not self.ai_enabled
         self.buttons['ai_toggle']['text'] = f"AI: {'ON' if self.ai_enabled else 'OFF'}"
         
+        # Hand O's turn over to the AI, or take it back
+        if not self.ai_enabled:
+            self.cancel_ai_search()
+        elif self.current_player == "O" and not self.game_over and not self.ai_thinking:
+            self.schedule_ai_move()
+        
     def cycle_difficulty(self):
         """Cycle through AI difficulties"""
         difficulties = ["Easy", "Medium", "Hard"]
@@ -167,12 +254,26 @@ class TicTacToeGame:
         self.ai_difficulty = difficulties[(current_index + 1) % len(difficulties)]
         self.buttons['difficulty']['text'] = self.ai_difficulty
         
+    def play_cell(self, row, col):
+        """Move for the player at this window: directly, or through the server when online"""
+        if self.online is None:
+            return self.make_move(row, col)
+            
+        cell = row * self.COLS + col
+        if (self.game_over or self.move_sent or self.current_player != self.online_player
+                or not self.position.is_empty(cell)):
+            return False
+        self.online.send({"type": "move", "move": cell})
+        self.move_sent = True  # The board changes once the server echoes the move
+        return True
+        
     def make_move(self, row, col):
         """Make a move at the specified position"""
-        if self.game_over or self.board[row][col] != "":
+        cell = row * self.COLS + col
+        if self.game_over or self.ai_thinking or not self.position.is_empty(cell):
             return False
             
-        self.board[row][col] = self.current_player
+        self.position.play(cell)
         self.moves_count += 1
         
         # Check for win
@@ -190,157 +291,141 @@ class TicTacToeGame:
             
             # AI move
             if self.ai_enabled and self.current_player == "O" and not self.game_over:
-                pygame.time.wait(500)  # Small delay for better UX
-                self.ai_move()
+                self.schedule_ai_move()
                 
         return True
         
-    def ai_move(self):
-        """Make an AI move"""
-        if self.game_over:
-            return
+    def schedule_ai_move(self):
+        """Start the AI turn once the move delay has passed, without blocking the event loop"""
+        self.cancel_ai_search()
+        self.ai_cancel = threading.Event()
+        self.ai_thinking = True
+        
+        if self.ai_move_delay_ms > 0:
+            turn = pygame.event.Event(AI_TURN_EVENT, search_id=self.ai_search_id)
+            pygame.time.set_timer(turn, self.ai_move_delay_ms, loops=1)
+        else:
+            self.start_ai_search()
+            
+    def start_ai_search(self):
+        """Search on a worker thread; the move comes back as AI_MOVE_EVENT"""
+        worker = threading.Thread(target=self.run_ai_search,
+                                  args=(self.ai_search_id, self.position.copy(), self.ai_cancel),
+                                  daemon=True)
+        worker.start()
+        
+    def run_ai_search(self, search_id, position, cancel):
+        """Worker thread: search a copy of the position, then post the result"""
+        with self.ai_lock:
+            if cancel.is_set():
+                return
+            move = self.get_ai_move(position, cancel)
+        if not cancel.is_set():
+            pygame.event.post(pygame.event.Event(AI_MOVE_EVENT, search_id=search_id, move=move))
+            
+    def cancel_ai_search(self):
+        """Drop a pending AI turn and abandon any search that is still running"""
+        pygame.time.set_timer(AI_TURN_EVENT, 0)
+        self.ai_cancel.set()
+        self.ai_search_id += 1
+        self.ai_thinking = False
+        
+    def get_ai_move(self, position=None, cancel=None):
+        """AI move as (row, col) for the current difficulty, or None if the game is over"""
+        if position is None:
+            position = self.position
+        if position.is_over():
+            return None
             
         if self.ai_difficulty == "Easy":
-            move = self.ai_easy()
+            return self.ai_easy(position)
         elif self.ai_difficulty == "Medium":
-            move = self.ai_medium()
+            return self.ai_medium(position)
         else:  # Hard
-            move = self.ai_hard()
-            
-        if move:
-            row, col = move
-            self.make_move(row, col)
+            return self.ai_hard(position, cancel)
             
-    def ai_easy(self):
+    def ai_easy(self, position):
         """Easy AI - random valid moves"""
-        empty_cells = [(r, c) for r in range(3) for c in range(3) if self.board[r][c] == ""]
-        return random.choice(empty_cells) if empty_cells else None
+        empty_cells = position.legal_moves()
+        return divmod(random.choice(empty_cells), self.COLS) if empty_cells else None
         
-    def ai_medium(self):
+    def ai_medium(self, position):
         """Medium AI - basic strategy"""
-        # Check if AI can win
-        for r in range(3):
-            for c in range(3):
-                if self.board[r][c] == "":
-                    self.board[r][c] = "O"
-                    if self.check_winner():
-                        self.board[r][c] = ""
-                        return (r, c)
-                    self.board[r][c] = ""
-                    
-        # Check if need to block player
-        for r in range(3):
-            for c in range(3):
-                if self.board[r][c] == "":
-                    self.board[r][c] = "X"
-                    if self.check_winner():
-                        self.board[r][c] = ""
-                        return (r, c)
-                    self.board[r][c] = ""
-                    
-        # Prefer center, then corners, then edges
-        preferences = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2), (0, 1), (1, 0), (1, 2), (2, 1)]
-        for r, c in preferences:
-            if self.board[r][c] == "":
-                return (r, c)
-        return None
-        
-    def ai_hard(self):
-        """Hard AI - minimax algorithm"""
-        _, move = self.minimax(self.board, "O", True)
-        return move
-        
-    def minimax(self, board, player, is_maximizing):
-        """Minimax algorithm"""
-        # Check terminal states
-        winner = self.get_winner(board)
-        if winner == "O":
-            return 1, None
-        elif winner == "X":
-            return -1, None
-        elif self.is_full(board):
-            return 0, None
-            
-        best_move = None
-        
-        if is_maximizing:
-            best_score = float('-inf')
-            for r in range(3):
-                for c in range(3):
-                    if board[r][c] == "":
-                        board[r][c] = "O"
-                        score, _ = self.minimax(board, "X", False)
-                        board[r][c] = ""
+        player = position.to_move()
+        
+        # Check if AI can win, then if need to block player; a threat count of zero skips the scan
+        for side in (player, 3 - player):
+            if position.has_threat(side):
+                for cell in position.legal_moves():
+                    if position.is_winning_move(cell, side):
+                        return divmod(cell, self.COLS)
                         
-                        if score > best_score:
-                            best_score = score
-                            best_move = (r, c)
-        else:
-            best_score = float('inf')
-            for r in range(3):
-                for c in range(3):
-                    if board[r][c] == "":
-                        board[r][c] = "X"
-                        score, _ = self.minimax(board, "O", True)
-                        board[r][c] = ""
-                        
-                        if score < best_score:
-                            best_score = score
-                            best_move = (r, c)
-                            
-        return best_score, best_move
-        
-    def get_winner(self, board):
-        """Check winner for a given board state"""
-        # Check rows
-        for row in board:
-            if row[0] == row[1] == row[2] != "":
-                return row[0]
-                
-        # Check columns
-        for col in range(3):
-            if board[0][col] == board[1][col] == board[2][col] != "":
-                return board[0][col]
-                
-        # Check diagonals
-        if board[0][0] == board[1][1] == board[2][2] != "":
-            return board[0][0]
-        if board[0][2] == board[1][1] == board[2][0] != "":
-            return board[0][2]
-            
+        # Prefer the cells on the most lines
+        for cell in self.preferred_cells:
+            if position.is_empty(cell):
+                return divmod(cell, self.COLS)
         return None
         
-    def is_full(self, board):
-        """Check if board is full"""
-        return all(board[r][c] != "" for r in range(3) for c in range(3))
+    def ai_hard(self, position, cancel=None):
+        """Hard AI - perfect play on 3x3, alpha-beta search on bigger boards"""
+        cell = self.engine.best_move(position, cancel)
+        return divmod(cell, self.COLS) if cell is not None else None
+        
+    def connect_to_server(self, host, port):
+        """Play online against whoever joins the same game on a match server"""
+        self.online = ServerConnection(host, port, self.post_server_message)
+        self.ai_enabled = False
+        self.buttons['ai_toggle']['text'] = "Online"
+        self.join_online_match()
         
+    def post_server_message(self, message):
+        """Reader thread: hand a server message over to the event loop"""
+        pygame.event.post(pygame.event.Event(SERVER_EVENT, message=message))
+        
+    def join_online_match(self):
+        """Give up the current online match, if any, and queue for the next one"""
+        self.online.send({"type": "leave"})
+        self.reset_game()
+        self.online_status = "Joining..."
+        self.online.send({"type": "join", "game": "tictactoe",
+                          "rows": self.ROWS, "cols": self.COLS, "k": self.WIN_LENGTH})
+        
+    def handle_server_message(self, message):
+        """Apply one message from the match server"""
+        kind = message['type']
+        if kind == 'waiting':
+            self.online_status = "Waiting for an opponent..."
+        elif kind == 'start':
+            self.reset_game()
+            self.online_player = "X" if message['player'] == 1 else "O"
+        elif kind == 'move':
+            # The server has checked the move, so both windows play it the same way
+            self.move_sent = False
+            self.make_move(*divmod(message['move'], self.COLS))
+        elif kind == 'over':
+            # Wins and ties already showed up through the moves
+            if message['reason'] == 'opponent_left' and self.online_player is not None:
+                self.game_over = True
+                self.winner = self.online_player
+                self.online_status = "Opponent left - You Win!"
+        elif kind == 'error':
+            print(f"Server: {message['message']}")
+            self.move_sent = False
+        elif kind == 'disconnected':
+            self.online = None
+            self.game_over = True
+            self.online_status = "Disconnected from server"
+            
     def check_winner(self):
         """Check if current game has a winner"""
-        # Check rows
-        for row in range(3):
-            if (self.board[row][0] == self.board[row][1] == self.board[row][2] != ""):
-                self.winning_positions = [(row, 0), (row, 1), (row, 2)]
-                return True
-                
-        # Check columns
-        for col in range(3):
-            if (self.board[0][col] == self.board[1][col] == self.board[2][col] != ""):
-                self.winning_positions = [(0, col), (1, col), (2, col)]
-                return True
-                
-        # Check diagonals
-        if (self.board[0][0] == self.board[1][1] == self.board[2][2] != ""):
-            self.winning_positions = [(0, 0), (1, 1), (2, 2)]
-            return True
-        if (self.board[0][2] == self.board[1][1] == self.board[2][0] != ""):
-            self.winning_positions = [(0, 2), (1, 1), (2, 0)]
-            return True
-            
-        return False
+        if not self.position.winner():
+            return False
+        self.winning_positions = [divmod(cell, self.COLS) for cell in self.position.winning_cells()]
+        return True
         
     def is_board_full(self):
         """Check if board is full"""
-        return all(self.board[r][c] != "" for r in range(3) for c in range(3))
+        return self.position.full()
         
     def update_animations(self):
         """Update any active animations"""
@@ -349,31 +434,37 @@ class TicTacToeGame:
             if self.winning_line_animation['progress'] >= 100:
                 self.winning_line_animation['progress'] = 100
                 
+    def is_animating(self):
+        """Check if the winning line is still being drawn"""
+        return self.winning_line_animation['active'] and self.winning_line_animation['progress'] < 100
+        
     def draw_board(self):
         """Draw the game board"""
         board_start_x = 20
         board_start_y = 80
         
         # Draw grid lines
-        for i in range(4):
+        for i in range(self.COLS + 1):
             # Vertical lines
             x = board_start_x + i * self.CELL_SIZE
             pygame.draw.line(self.screen, self.colors['grid'], 
                            (x, board_start_y), (x, board_start_y + self.BOARD_HEIGHT), 3)
             
+        for i in range(self.ROWS + 1):
             # Horizontal lines
             y = board_start_y + i * self.CELL_SIZE
             pygame.draw.line(self.screen, self.colors['grid'], 
                            (board_start_x, y), (board_start_x + self.BOARD_WIDTH, y), 3)
         
         # Draw X's and O's
-        for row in range(3):
-            for col in range(3):
-                if self.board[row][col] != "":
+        for row in range(self.ROWS):
+            for col in range(self.COLS):
+                mark = self.position.symbol(row, col)
+                if mark != "":
                     x = board_start_x + col * self.CELL_SIZE + self.CELL_SIZE // 2
                     y = board_start_y + row * self.CELL_SIZE + self.CELL_SIZE // 2
                     
-                    if self.board[row][col] == "X":
+                    if mark == "X":
                         self.draw_x(x, y)
                     else:
                         self.draw_o(x, y)
@@ -386,14 +477,14 @@ class TicTacToeGame:
         """Draw an X at the specified position"""
         size = self.CELL_SIZE // 3
         pygame.draw.line(self.screen, self.colors['x_color'], 
-                        (x - size, y - size), (x + size, y + size), 8)
+                        (x - size, y - size), (x + size, y + size), self.LINE_WIDTH)
         pygame.draw.line(self.screen, self.colors['x_color'], 
-                        (x + size, y - size), (x - size, y + size), 8)
+                        (x + size, y - size), (x - size, y + size), self.LINE_WIDTH)
                         
     def draw_o(self, x, y):
         """Draw an O at the specified position"""
         radius = self.CELL_SIZE // 3
-        pygame.draw.circle(self.screen, self.colors['o_color'], (x, y), radius, 8)
+        pygame.draw.circle(self.screen, self.colors['o_color'], (x, y), radius, self.LINE_WIDTH)
         
     def draw_winning_line(self):
         """Draw animated winning line"""
@@ -418,7 +509,7 @@ class TicTacToeGame:
         current_end_y = start_y + (end_y - start_y) * progress
         
         pygame.draw.line(self.screen, self.colors['winning_line'], 
-                        (start_x, start_y), (current_end_x, current_end_y), 8)
+                        (start_x, start_y), (current_end_x, current_end_y), self.LINE_WIDTH)
                         
     def draw_ui(self):
         """Draw user interface"""
@@ -434,65 +525,137 @@ class TicTacToeGame:
             pygame.draw.rect(self.screen, button_color, button['rect'])
             pygame.draw.rect(self.screen, (0, 0, 0), button['rect'], 2)
             
-            text_surface = self.font_small.render(button['text'], True, (255, 255, 255))
+            text_surface = self.render_text(self.font_small, button['text'], (255, 255, 255))
             text_rect = text_surface.get_rect(center=button['rect'].center)
             self.screen.blit(text_surface, text_rect)
             
         # Game status
         status_y = self.WINDOW_HEIGHT - 80
-        
-        if self.game_over:
-            if self.winner == "Tie":
-                status_text = "It's a Tie!"
-                color = (150, 150, 150)
-            elif self.winner == "X":
-                status_text = "X Wins!"
-                color = self.colors['x_color']
-            else:
-                status_text = f"{'AI' if self.ai_enabled else 'O'} Wins!"
-                color = self.colors['o_color']
-        else:
-            if self.current_player == "X":
-                status_text = "X's Turn"
-                color = self.colors['x_color']
-            else:
-                player_name = "AI" if self.ai_enabled else "O"
-                status_text = f"{player_name}'s Turn"
-                color = self.colors['o_color']
-                
-        status_surface = self.font_medium.render(status_text, True, color)
+        status_text, color = self.status_line()
+        status_surface = self.render_text(self.font_medium, status_text, color)
         status_rect = status_surface.get_rect(center=(self.WINDOW_WIDTH // 2, status_y))
         self.screen.blit(status_surface, status_rect)
         
         # Move counter
         moves_text = f"Moves: {self.moves_count}"
-        moves_surface = self.font_small.render(moves_text, True, self.colors['text'])
+        moves_surface = self.render_text(self.font_small, moves_text, self.colors['text'])
         moves_rect = moves_surface.get_rect(center=(self.WINDOW_WIDTH // 2, status_y + 30))
         self.screen.blit(moves_surface, moves_rect)
         
         # Controls help
-        controls_text = "Click cell to play • 1-9 keys for positions • R to restart • ESC to quit"
-        controls_surface = pygame.font.Font(None, 24).render(controls_text, True, (100, 100, 100))
+        if (self.ROWS, self.COLS) == (3, 3):
+            controls_text = "Click cell to play • 1-9 keys for positions • R to restart • ESC to quit"
+        else:
+            controls_text = "Click cell to play • R to restart • ESC to quit"
+        controls_surface = self.render_text(self.font_controls, controls_text, (100, 100, 100))
         controls_rect = controls_surface.get_rect(center=(self.WINDOW_WIDTH // 2, status_y + 50))
         self.screen.blit(controls_surface, controls_rect)
         
+    def status_line(self):
+        """Status message and its color"""
+        if self.online_status:
+            return self.online_status, self.colors['text']
+        if self.online_player is not None:
+            return self.online_status_line()
+            
+        if self.game_over:
+            if self.winner == "Tie":
+                return "It's a Tie!", (150, 150, 150)
+            elif self.winner == "X":
+                return "X Wins!", self.colors['x_color']
+            else:
+                return f"{'AI' if self.ai_enabled else 'O'} Wins!", self.colors['o_color']
+        elif self.ai_thinking:
+            return "AI is thinking...", self.colors['o_color']
+        elif self.current_player == "X":
+            return "X's Turn", self.colors['x_color']
+        else:
+            player_name = "AI" if self.ai_enabled else "O"
+            return f"{player_name}'s Turn", self.colors['o_color']
+            
+    def online_status_line(self):
+        """Status message and its color during an online match"""
+        color = self.colors['x_color'] if self.online_player == "X" else self.colors['o_color']
+        if self.game_over:
+            if self.winner == "Tie":
+                return "It's a Tie!", (150, 150, 150)
+            return ("You Win!" if self.winner == self.online_player else "You Lose!"), color
+        elif self.current_player == self.online_player:
+            return f"Your Turn ({self.online_player})", color
+        else:
+            return "Opponent's Turn", color
+            
+    def render_text(self, font, text, color):
+        """Rendered text surface, cached so unchanged labels are never re-rendered"""
+        key = (font, text, color)
+        if key not in self.text_cache:
+            self.text_cache[key] = font.render(text, True, color)
+        return self.text_cache[key]
+        
+    def frame_state(self):
+        """Everything that decides what is on screen"""
+        hovered = tuple(button['rect'].collidepoint(self.mouse_pos) for button in self.buttons.values())
+        labels = tuple(button['text'] for button in self.buttons.values())
+        animation = (self.winning_line_animation['active'], self.winning_line_animation['progress'])
+        return (tuple(self.position.masks), animation, hovered, labels, self.status_line(), self.moves_count)
+        
+    def render(self):
+        """Redraw the window if anything on it changed since the last frame"""
+        state = self.frame_state()
+        if state == self.drawn:
+            return
+            
+        self.screen.fill(self.colors['background'])
+        self.draw_board()
+        self.draw_ui()
+        pygame.display.flip()
+        self.drawn = state
+        
     def run(self):
         """Main game loop"""
         while self.running:
-            self.handle_events()
+            if self.event_driven and not self.is_animating():
+                # Nothing moves: sleep until the next event arrives
+                events = [pygame.event.wait()] + pygame.event.get()
+            else:
+                events = pygame.event.get()
+            self.handle_events(events)
             self.update_animations()
             
-            # Draw everything
-            self.screen.fill(self.colors['background'])
-            self.draw_board()
-            self.draw_ui()
-            
-            pygame.display.flip()
-            self.clock.tick(60)  # 60 FPS
+            # Redraw on changes only, or every frame in fixed-FPS mode
+            if not self.event_driven:
+                self.drawn = None
+            self.render()
             
+            if not self.event_driven or self.is_animating():
+                self.clock.tick(60)  # 60 FPS
+                
+        self.cancel_ai_search()
+        if self.online is not None:
+            self.online.close()
         pygame.quit()
         sys.exit()
 
 if __name__ == '__main__':
-    game = TicTacToeGame()
+    parser = argparse.ArgumentParser(description="Tic Tac Toe and bigger k-in-a-row games")
+    parser.add_argument('--rows', type=int, default=3)
+    parser.add_argument('--cols', type=int, default=3)
+    parser.add_argument('--k', type=int, default=3, help="marks in a row needed to win")
+    parser.add_argument('--fixed-fps', action='store_true', help="redraw at 60 FPS instead of only on changes")
+    parser.add_argument('--ai-delay-ms', type=int, default=500, help="pause before the AI moves, 0 for none")
+    parser.add_argument('--server', metavar="HOST:PORT", help="play online through a match server")
+    args = parser.parse_args()
+    if not 2 <= args.k <= max(args.rows, args.cols):
+        parser.error(f"cannot get {args.k} in a row on a {args.rows}x{args.cols} board")
+    if args.ai_delay_ms < 0:
+        parser.error("--ai-delay-ms cannot be negative")
+        
+    game = TicTacToeGame(args.rows, args.cols, args.k)
+    game.event_driven = not args.fixed_fps
+    game.ai_move_delay_ms = args.ai_delay_ms
+    if args.server:
+        try:
+            game.connect_to_server(*parse_address(args.server))
+        except (ValueError, OSError) as exc:
+            parser.error(f"cannot connect to {args.server}: {exc}")
     game.run()
\ No newline at end of file
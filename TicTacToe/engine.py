@@ -0,0 +1,204 @@
+"""Hard AI search for m,n,k-games
+
+3x3 tic-tac-toe is answered from the perfect-play table.  Every other board
+is searched with iterative-deepening negamax and alpha-beta pruning inside a
+time budget, so even 15x15 gomoku gets a move back quickly:
+
+- a transposition table keyed by the canonical hash, so positions that are
+  rotations or reflections of each other share one entry
+- only cells next to existing marks are considered on boards too big to
+  search exhaustively
+- immediate wins are taken and immediate threats blocked without searching
+- moves are ordered by the transposition table move, then by how much they
+  improve the heuristic score
+"""
+
+import time
+
+import perfect_play
+from position import X, O, bit_cells, symmetries
+
+
+class SearchAborted(Exception):
+    """Raised inside negamax when the time budget runs out or the search is cancelled"""
+
+
+# Transposition table bounds
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+class TicTacToeEngine:
+    WIN_SCORE = 1000000  # Search score for a forced win
+    FULL_WIDTH_CELLS = 16  # Boards up to 4x4 consider every empty cell
+
+    def __init__(self, rows=3, cols=3, k=3):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+
+        # Transposition table moves are stored in canonical orientation
+        self.inverse_symmetries = []
+        for perm in symmetries(rows, cols):
+            inverse = [0] * len(perm)
+            for cell, image in enumerate(perm):
+                inverse[image] = cell
+            self.inverse_symmetries.append(inverse)
+
+        self.time_budget_ms = 1000  # Per-move thinking time
+        self.tt_limit = 1 << 18     # Entries kept before the table is cleared
+        self.transposition_table = {}  # canonical hash -> (depth, score, bound, canonical move)
+
+        self.search_deadline = None
+        self.search_cancel = None  # threading.Event that abandons the running search
+        self.search_nodes = 0
+        self.last_search_depth = 0
+
+    def reset(self):
+        """Forget everything cached from the previous game"""
+        self.transposition_table.clear()
+
+    def best_move(self, position, cancel=None):
+        """Best cell for the side to move, or None if the game is over"""
+        if position.is_over():
+            return None
+        if (self.rows, self.cols, self.k) == (3, 3, 3):
+            index = perfect_play.index_of(position.masks[X], position.masks[O])
+            move = perfect_play.BEST_MOVES[index]
+            return move if move != perfect_play.NO_MOVE else None
+        return self.search(position.copy(), cancel)
+
+    # --- Search ---
+
+    def search(self, position, cancel=None):
+        """Iterative deepening negamax within the time budget, until `cancel` is set"""
+        deadline = time.perf_counter() + self.time_budget_ms / 1000
+        max_depth = position.cells - position.moves_played
+        if len(self.transposition_table) > self.tt_limit:
+            self.transposition_table.clear()
+
+        # Nothing to think about with a single sensible reply
+        moves = self.candidate_moves(position)
+        if len(moves) == 1:
+            return moves[0]
+
+        best = moves[0]
+        self.search_cancel = cancel
+        self.search_nodes = 0
+        self.last_search_depth = 0
+        for depth in range(1, max_depth + 1):
+            # The first iteration ignores the clock so there is a move to return
+            self.search_deadline = deadline if depth > 1 else None
+            try:
+                score, move = self.negamax(position, depth, -self.WIN_SCORE * 2, self.WIN_SCORE * 2)
+            except SearchAborted:
+                break
+            best = move
+            self.last_search_depth = depth
+
+            # A proven result will not change with more depth
+            if abs(score) >= self.WIN_SCORE or time.perf_counter() >= deadline:
+                break
+
+        self.search_deadline = None
+        self.search_cancel = None
+        return best
+
+    def negamax(self, position, depth, alpha, beta):
+        """Score and best move for the side to move, with alpha-beta pruning"""
+        self.search_nodes += 1
+        if self.search_nodes % 1024 == 0 and self.search_should_stop():
+            raise SearchAborted()
+
+        player = position.to_move()
+        if position.winner():
+            return -(self.WIN_SCORE + depth), None  # The opponent just won; sooner is worse
+        if position.full():
+            return 0, None
+        if depth == 0:
+            return position.evaluate(player), None
+
+        # Probe the table in canonical orientation
+        key, symmetry = position.canonical()
+        entry = self.transposition_table.get(key)
+        tt_move = None
+        if entry is not None:
+            tt_depth, tt_score, bound, canonical_move = entry
+            tt_move = self.inverse_symmetries[symmetry][canonical_move]
+            if tt_depth >= depth:
+                if bound == EXACT:
+                    return tt_score, tt_move
+                elif bound == LOWER_BOUND:
+                    alpha = max(alpha, tt_score)
+                else:
+                    beta = min(beta, tt_score)
+                if alpha >= beta:
+                    return tt_score, tt_move
+        alpha_orig = alpha
+
+        moves = self.candidate_moves(position)
+
+        # Take an immediate win, and answer an immediate threat by blocking it
+        if position.has_threat(player):
+            for cell in moves:
+                if position.is_winning_move(cell, player):
+                    return self.WIN_SCORE + depth, cell
+        if position.has_threat(3 - player):
+            moves = [cell for cell in moves if position.is_winning_move(cell, 3 - player)]
+
+        moves = self.order_moves(position, moves, player, tt_move)
+
+        best_score = -self.WIN_SCORE * 2
+        best_move = moves[0]
+        for cell in moves:
+            position.play(cell)
+            score, _ = self.negamax(position, depth - 1, -beta, -alpha)
+            position.undo()
+            score = -score
+
+            if score > best_score:
+                best_score = score
+                best_move = cell
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best_score <= alpha_orig:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.transposition_table[key] = (depth, best_score, bound, position.symmetries[symmetry][best_move])
+
+        return best_score, best_move
+
+    def search_should_stop(self):
+        """Check the per-move deadline and the cancel flag of the running search"""
+        if self.search_cancel is not None and self.search_cancel.is_set():
+            return True
+        return self.search_deadline is not None and time.perf_counter() >= self.search_deadline
+
+    def candidate_moves(self, position):
+        """Cells worth searching: all of them on small boards, otherwise those next to a mark"""
+        if position.cells <= self.FULL_WIDTH_CELLS:
+            return position.legal_moves()
+        if position.moves_played == 0:
+            return [(position.rows // 2) * position.cols + position.cols // 2]
+        return bit_cells(position.neighbours())
+
+    def order_moves(self, position, moves, player, tt_move):
+        """Table move first, then moves that gain the most heuristic score"""
+        gain = position.gains[player - 1]
+        x_counts, o_counts = position.line_counts[X], position.line_counts[O]
+        sign = 1 if player == X else -1
+
+        def priority(cell):
+            delta = 0
+            for line in position.cell_lines[cell]:
+                delta += gain[x_counts[line]][o_counts[line]]
+            return (cell == tt_move, sign * delta)
+
+        return sorted(moves, key=priority, reverse=True)
+
@@ -0,0 +1,84 @@
+"""Perfect-play table for 3x3 tic-tac-toe
+
+Every position reachable in a real game (5,478 of them) is solved once when
+the module is imported, which takes a few milliseconds.  Positions are
+indexed by their base-3 encoding: cell i = row * 3 + col contributes 3**i
+times 0 for an empty cell, 1 for X and 2 for O.  X always moves first, so
+the side to move follows from the number of pieces on the board.
+
+For every reachable index the table holds, from the side to move's point of
+view, the game-theoretic value (1 win, 0 draw, -1 loss), the best cell and
+the number of plies until the game ends with best play.  Wins are taken as
+fast as possible and losses dragged out as long as possible.
+"""
+
+SIZE = 3
+CELLS = SIZE * SIZE
+TABLE_SIZE = 3 ** CELLS
+
+POWERS = [3 ** i for i in range(CELLS)]
+
+WIN_LINES = [
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),  # Rows
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),  # Columns
+    (0, 4, 8), (2, 4, 6)              # Diagonals
+]
+
+UNREACHABLE = None  # Value slot of positions that cannot occur in a game
+NO_MOVE = -1        # Best-move slot of finished games
+
+
+def _solve_table():
+    """Solve every reachable position by memoized negamax from the empty board"""
+    values = [UNREACHABLE] * TABLE_SIZE
+    best_moves = [NO_MOVE] * TABLE_SIZE
+    distances = [0] * TABLE_SIZE
+    cells = [0] * CELLS
+
+    def solve(index, moves):
+        if values[index] is not UNREACHABLE:
+            return
+
+        # Only the player who just moved can have a line
+        last = 2 - moves % 2
+        if any(cells[a] == cells[b] == cells[c] == last for a, b, c in WIN_LINES):
+            values[index] = -1
+            return
+        if moves == CELLS:
+            values[index] = 0
+            return
+
+        player = 1 + moves % 2
+        best_key = None
+        for cell in range(CELLS):
+            if cells[cell]:
+                continue
+            child = index + player * POWERS[cell]
+            cells[cell] = player
+            solve(child, moves + 1)
+            cells[cell] = 0
+
+            value = -values[child]
+            distance = distances[child] + 1
+            # Quick wins beat slow ones, slow losses beat quick ones
+            key = (value, -distance if value > 0 else distance)
+            if best_key is None or key > best_key:
+                best_key = key
+                best_moves[index] = cell
+                values[index] = value
+                distances[index] = distance
+
+    solve(0, 0)
+    return values, best_moves, distances
+
+
+VALUES, BEST_MOVES, DISTANCES = _solve_table()
+
+
+# BASE3[mask] spreads the bits of a 9-bit mask out as base-3 digits
+BASE3 = [sum(POWERS[cell] for cell in range(CELLS) if mask >> cell & 1) for mask in range(1 << CELLS)]
+
+
+def index_of(x_mask, o_mask):
+    """Base-3 index of a position given as X and O bitmasks (bit i = cell i)"""
+    return BASE3[x_mask] + 2 * BASE3[o_mask]
@@ -0,0 +1,320 @@
+"""Bitmask position for m,n,k-games (tic-tac-toe and its bigger relatives)
+
+An m,n,k-game is played on a board of `rows` x `cols` cells and won by the
+first player with `k` marks in a row: tic-tac-toe is 3,3,3 and gomoku is
+15,15,5.  Cell `row * cols + col` is bit number `row * cols + col` of each
+player's mask.  X (player 1) always moves first.
+
+Everything that only depends on the board geometry (winning lines, their
+per-cell index, symmetry permutations, Zobrist keys) is built once per
+geometry and shared by every position of that size.
+"""
+
+import random
+
+X, O = 1, 2
+
+
+# Winning lines per geometry: (line masks, line cells, line indices for every cell)
+_LINE_CACHE = {}
+
+
+def line_tables(rows, cols, k):
+    """Every k-in-a-row line as a bitmask and as a cell list, plus the lines through each cell"""
+    geometry = (rows, cols, k)
+    if geometry not in _LINE_CACHE:
+        masks = []
+        cells = []
+        cell_lines = [[] for _ in range(rows * cols)]
+        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]  # (row step, column step)
+
+        for dr, dc in directions:
+            for row in range(rows):
+                for col in range(cols):
+                    end_row = row + (k - 1) * dr
+                    end_col = col + (k - 1) * dc
+                    if not (0 <= end_row < rows and 0 <= end_col < cols):
+                        continue
+                    line = [(row + i * dr) * cols + col + i * dc for i in range(k)]
+                    for cell in line:
+                        cell_lines[cell].append(len(masks))
+                    masks.append(sum(1 << cell for cell in line))
+                    cells.append(tuple(line))
+
+        _LINE_CACHE[geometry] = (masks, cells, [tuple(lines) for lines in cell_lines])
+    return _LINE_CACHE[geometry]
+
+
+# Symmetry permutations per board shape
+_SYMMETRY_CACHE = {}
+
+
+def symmetries(rows, cols):
+    """Cell permutations for the symmetries of the board: 8 if square, otherwise 4"""
+    shape = (rows, cols)
+    if shape not in _SYMMETRY_CACHE:
+        r, c = rows - 1, cols - 1
+        maps = [
+            lambda row, col: (row, col),
+            lambda row, col: (row, c - col),      # Mirror left to right
+            lambda row, col: (r - row, col),      # Mirror top to bottom
+            lambda row, col: (r - row, c - col)   # Rotate 180 degrees
+        ]
+        if rows == cols:
+            maps += [
+                lambda row, col: (col, row),          # Main diagonal
+                lambda row, col: (c - col, r - row),  # Anti-diagonal
+                lambda row, col: (col, r - row),      # Rotate 90 degrees
+                lambda row, col: (c - col, row)       # Rotate 270 degrees
+            ]
+
+        perms = []
+        for transform in maps:
+            perm = [0] * (rows * cols)
+            for row in range(rows):
+                for col in range(cols):
+                    new_row, new_col = transform(row, col)
+                    perm[row * cols + col] = new_row * cols + new_col
+            perms.append(perm)
+        _SYMMETRY_CACHE[shape] = perms
+    return _SYMMETRY_CACHE[shape]
+
+
+# Zobrist keys per board shape, one key set for every symmetry.  The key set
+# of a symmetry hashes a position as if the board had been transformed first,
+# so the hash of every symmetric variant is kept up to date with one XOR.
+_ZOBRIST_CACHE = {}
+
+
+def zobrist_keys(rows, cols):
+    """Random 64-bit keys indexed as keys[symmetry][player][cell], fixed per shape"""
+    shape = (rows, cols)
+    if shape not in _ZOBRIST_CACHE:
+        rng = random.Random(rows * 100 + cols)  # Fixed seed keeps hashes reproducible
+        base = [None] + [[rng.getrandbits(64) for _ in range(rows * cols)] for _ in range(2)]
+        _ZOBRIST_CACHE[shape] = [[None] + [[base[player][perm[cell]] for cell in range(rows * cols)]
+                                           for player in (X, O)]
+                                 for perm in symmetries(rows, cols)]
+    return _ZOBRIST_CACHE[shape]
+
+
+def _line_value(x, o, k):
+    """Heuristic value of one line holding `x` X marks and `o` O marks, for X"""
+    if x and not o:
+        return 4 ** (x - 1) if x < k else 0
+    if o and not x:
+        return -(4 ** (o - 1)) if o < k else 0
+    return 0
+
+
+# Score tables per win length: (x_gain, o_gain), indexed [x][o] by the counts before the move
+_SCORE_CACHE = {}
+
+
+def score_tables(k):
+    """Change of the heuristic score when X or O adds a mark to a line"""
+    if k not in _SCORE_CACHE:
+        size = k + 1
+        x_gain = [[_line_value(x + 1, o, k) - _line_value(x, o, k) if x + o < k else 0
+                   for o in range(size)] for x in range(size)]
+        o_gain = [[_line_value(x, o + 1, k) - _line_value(x, o, k) if x + o < k else 0
+                   for o in range(size)] for x in range(size)]
+        _SCORE_CACHE[k] = (x_gain, o_gain)
+    return _SCORE_CACHE[k]
+
+
+class Position:
+    def __init__(self, rows=3, cols=3, k=3):
+        if k < 2 or k > max(rows, cols):
+            raise ValueError(f"cannot get {k} in a row on a {rows}x{cols} board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.cells = rows * cols
+        self.board_mask = (1 << self.cells) - 1
+
+        # masks[1] / masks[2] hold the marks of X and O (index 0 unused)
+        self.masks = [0, 0, 0]
+        self.moves_played = 0
+        self.history = []
+        self.won_by = 0  # Player who completed a line, 0 while the game is open
+
+        # Per-geometry tables
+        self.lines, self.line_cells, self.cell_lines = line_tables(rows, cols, k)
+        self.symmetries = symmetries(rows, cols)
+        self.zobrist = zobrist_keys(rows, cols)
+        self.gains = score_tables(k)
+
+        # Marks per line for each player, and the heuristic score for X
+        self.line_counts = [None, [0] * len(self.lines), [0] * len(self.lines)]
+        self.score = 0
+
+        # Unblocked lines one mark short of k for each player
+        self.threats = [None, 0, 0]
+
+        # One hash per symmetry: the hash of the position seen through that symmetry
+        self.hashes = [0] * len(self.symmetries)
+
+        # Columns masks keep neighbour shifts from wrapping between rows
+        self.not_left = self.board_mask & ~sum(1 << (row * cols) for row in range(rows))
+        self.not_right = self.board_mask & ~sum(1 << (row * cols + cols - 1) for row in range(rows))
+
+    def copy(self):
+        """Return an independent copy of this position"""
+        clone = Position.__new__(Position)
+        clone.__dict__.update(self.__dict__)
+        clone.masks = self.masks[:]
+        clone.history = self.history[:]
+        clone.line_counts = [None, self.line_counts[1][:], self.line_counts[2][:]]
+        clone.threats = self.threats[:]
+        clone.hashes = self.hashes[:]
+        return clone
+
+    def to_move(self):
+        """Player to move: X (1) always starts"""
+        return 1 + self.moves_played % 2
+
+    def occupied(self):
+        """Mask of every marked cell"""
+        return self.masks[X] | self.masks[O]
+
+    def play(self, cell):
+        """Mark `cell` for the player to move"""
+        player = self.to_move()
+        self.masks[player] |= 1 << cell
+        self.moves_played += 1
+        self.history.append(cell)
+
+        for i, keys in enumerate(self.zobrist):
+            self.hashes[i] ^= keys[player][cell]
+
+        gain = self.gains[player - 1]
+        own_counts = self.line_counts[player]
+        opp_counts = self.line_counts[3 - player]
+        x_counts, o_counts = self.line_counts[X], self.line_counts[O]
+        k = self.k
+        delta = 0
+        for line in self.cell_lines[cell]:
+            delta += gain[x_counts[line]][o_counts[line]]
+            own = own_counts[line] + 1
+            own_counts[line] = own
+            opp = opp_counts[line]
+            if opp == 0:
+                if own == k - 1:
+                    self.threats[player] += 1
+                elif own == k:
+                    self.threats[player] -= 1
+                    self.won_by = player
+            elif own == 1 and opp == k - 1:
+                self.threats[3 - player] -= 1  # Blocked
+        self.score += delta
+
+    def undo(self):
+        """Take back the last move"""
+        cell = self.history.pop()
+        self.moves_played -= 1
+        player = self.to_move()
+        self.masks[player] &= ~(1 << cell)
+        self.won_by = 0
+
+        for i, keys in enumerate(self.zobrist):
+            self.hashes[i] ^= keys[player][cell]
+
+        gain = self.gains[player - 1]
+        own_counts = self.line_counts[player]
+        opp_counts = self.line_counts[3 - player]
+        x_counts, o_counts = self.line_counts[X], self.line_counts[O]
+        k = self.k
+        delta = 0
+        for line in self.cell_lines[cell]:
+            own = own_counts[line]
+            own_counts[line] = own - 1
+            delta += gain[x_counts[line]][o_counts[line]]
+            opp = opp_counts[line]
+            if opp == 0:
+                if own == k - 1:
+                    self.threats[player] -= 1
+                elif own == k:
+                    self.threats[player] += 1
+            elif own == 1 and opp == k - 1:
+                self.threats[3 - player] += 1
+        self.score -= delta
+
+    def winner(self):
+        """Player who has k in a row, or 0"""
+        return self.won_by
+
+    def full(self):
+        """Check if every cell is marked"""
+        return self.moves_played == self.cells
+
+    def is_over(self):
+        """Check if the game is won or drawn"""
+        return self.won_by != 0 or self.moves_played == self.cells
+
+    def is_empty(self, cell):
+        """Check if nobody has marked `cell`"""
+        return not (self.occupied() >> cell) & 1
+
+    def symbol(self, row, col):
+        """"X", "O" or "" for the mark at (row, col)"""
+        bit = 1 << (row * self.cols + col)
+        if self.masks[X] & bit:
+            return "X"
+        return "O" if self.masks[O] & bit else ""
+
+    def legal_moves(self):
+        """Empty cells in index order"""
+        return bit_cells(self.board_mask & ~self.occupied())
+
+    def has_threat(self, player):
+        """Check if `player` has a line that one more mark would complete"""
+        return self.threats[player] > 0
+
+    def is_winning_move(self, cell, player):
+        """Check if marking the empty `cell` would give `player` k in a row"""
+        own_counts = self.line_counts[player]
+        opp_counts = self.line_counts[3 - player]
+        for line in self.cell_lines[cell]:
+            if own_counts[line] == self.k - 1 and opp_counts[line] == 0:
+                return True
+        return False
+
+    def winning_cells(self):
+        """Cells of the completed line through the last move, in order along the line"""
+        if not self.won_by:
+            return []
+        counts = self.line_counts[self.won_by]
+        for line in self.cell_lines[self.history[-1]]:
+            if counts[line] == self.k:
+                return list(self.line_cells[line])
+        return []
+
+    def neighbours(self):
+        """Empty cells next to a mark in any of the eight directions"""
+        occupied = self.occupied()
+        cols = self.cols
+        left = (occupied >> 1) & self.not_right   # Cell to the left of a mark
+        right = (occupied << 1) & self.not_left   # Cell to the right of a mark
+        spread = occupied | left | right
+        near = spread | (spread << cols) | (spread >> cols)
+        return near & self.board_mask & ~occupied
+
+    def canonical(self):
+        """(key, symmetry) with the smallest hash over all board symmetries"""
+        key = min(self.hashes)
+        return key, self.hashes.index(key)
+
+    def evaluate(self, player):
+        """Heuristic score from `player`'s point of view"""
+        return self.score if player == X else -self.score
+
+
+def bit_cells(mask):
+    """Indices of the set bits of `mask`, lowest first"""
+    cells = []
+    while mask:
+        low = mask & -mask
+        cells.append(low.bit_length() - 1)
+        mask ^= low
+    return cells